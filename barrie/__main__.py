@@ -0,0 +1,5 @@
+import sys
+
+from barrie.cli import main
+
+sys.exit(main())
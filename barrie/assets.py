@@ -0,0 +1,70 @@
+import os
+import shutil
+import threading
+
+from barrie import net
+from barrie.paths import resource_path
+
+DEFAULT_ASSETS = {
+    "logo.png": "https://i.postimg.cc/6px5gGRg/logo.png",
+    "logo.ico": "https://raw.githubusercontent.com/firearz/Barrie-Launcher-Improved/refs/heads/main/icon.ico",
+    "github.png": "https://img.icons8.com/?size=512&id=bVGqATNwfhYq&format=png",
+    "youtube.png": "https://img.icons8.com/?size=512&id=szxM3fi4e37N&format=png",
+    "instagram.png": "https://img.icons8.com/?size=512&id=YtpeVQhQ8USm&format=png"
+}
+
+# Files shipped next to main.py (or inside the PyInstaller bundle) used until a download lands
+BUNDLED_FALLBACKS = {
+    "logo.ico": "icon.ico",
+    "logo.png": "icon.ico"
+}
+
+
+def asset_path(assets_dir, name):
+    # Downloaded copy if present, otherwise the bundled fallback, otherwise None
+    path = os.path.join(assets_dir, name)
+    if os.path.exists(path):
+        return path
+    fallback = BUNDLED_FALLBACKS.get(name)
+    if fallback:
+        path = resource_path(fallback)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def download_asset(assets_dir, name, url):
+    path = os.path.join(assets_dir, name)
+    r = net.get(url, stream=True)
+    if r.status_code != 200:
+        return None
+    # Write to a temp name so a half-finished download never shadows the fallback
+    tmp_path = path + ".part"
+    with open(tmp_path, "wb") as f:
+        shutil.copyfileobj(r.raw, f)
+    os.replace(tmp_path, path)
+    return path
+
+
+def fetch_missing_assets(assets_dir, on_ready, assets=None):
+    # Starts one daemon thread per missing asset and returns immediately.
+    # on_ready(name, path) is called from the download thread once a file is in place.
+    os.makedirs(assets_dir, exist_ok=True)
+    assets = DEFAULT_ASSETS if assets is None else assets
+
+    def fetch(name, url):
+        try:
+            path = download_asset(assets_dir, name, url)
+            if path:
+                on_ready(name, path)
+        except Exception as e:
+            print(f"Failed to download {name}: {e}")
+
+    threads = []
+    for name, url in assets.items():
+        if os.path.exists(os.path.join(assets_dir, name)):
+            continue
+        thread = threading.Thread(target=fetch, args=(name, url), name=f"asset-{name}", daemon=True)
+        thread.start()
+        threads.append(thread)
+    return threads
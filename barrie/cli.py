@@ -0,0 +1,384 @@
+import os
+import re
+import sys
+import time
+import argparse
+
+from barrie import gamelog, installer, instances, jvm, launch, modrinth, mods, processes, tracing, version_index, versions
+from barrie.paths import get_minecraft_directory
+from barrie.settings import get_settings
+
+MODES = ("vanilla", "fabric", "forge")
+
+
+def _log(text):
+    # Progress and timings go to stderr so stdout stays parseable in scripts
+    print(text, file=sys.stderr, flush=True)
+
+
+class Phase:
+    # Times one step of a command; --timings prints each one as it finishes.
+    # Commands that carry a trace (args.trace) also record the step as a span.
+    def __init__(self, args, name):
+        self.args = args
+        self.name = name
+        self.span = tracing.span(getattr(args, "trace", None), name)
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        self.span.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        self.span.__exit__(*exc)
+        if self.args.timings:
+            _log(f"[timing] {self.name}: {(time.perf_counter() - self.started) * 1000:.1f} ms")
+        return False
+
+
+def progress_callback(quiet=False):
+    state = {"max": 0, "last": -1}
+
+    def set_status(text):
+        if not quiet:
+            _log(text)
+
+    def set_progress(value):
+        # One line per 10% so logs in CI stay readable
+        if quiet or not state["max"]:
+            return
+        percent = value * 100 // state["max"]
+        if percent // 10 != state["last"] // 10 or value == state["max"]:
+            state["last"] = percent
+            _log(f"  {value}/{state['max']} ({percent}%)")
+
+    def set_max(value):
+        state["max"] = value
+        state["last"] = -1
+
+    return {"setStatus": set_status, "setProgress": set_progress, "setMax": set_max}
+
+
+def _profile_key(version_id):
+    # "fabric-loader-0.15.11-1.20.1" -> (0, 15, 11, 1, 20, 1): profile ids of one Minecraft version
+    # differ only in the loader version, which has to compare as numbers (0.15.11 > 0.15.9)
+    return tuple(int(part) for part in re.findall(r"\d+", version_id))
+
+
+def resolve_profile(mc_dir, version_id, edition):
+    # Accepts either an installed Fabric/Forge profile id or a Minecraft version one is built
+    # on; for a Minecraft version the newest installed loader wins
+    index = version_index.get_index(mc_dir)
+    index.invalidate()
+    installed = index.get(version_id)
+    if installed is not None and installed.edition == edition:
+        return version_id
+    candidates = index.versions(edition, base_version=version_id)
+    if not candidates:
+        raise launch.LaunchError(f"No {edition.title()} profile is installed for {version_id}")
+    return max(candidates, key=lambda v: _profile_key(v.id)).id
+
+
+def cmd_list(args):
+    mc_dir = args.minecraft_dir
+    if args.installed:
+        for v in version_index.get_index(mc_dir).versions(args.edition):
+            print(f"{v.id}\t{v.edition}\t{v.base_version}")
+        return 0
+
+    cache = versions.load_manifest_cache()
+    if args.refresh or not versions.is_fresh(cache, get_settings().version_cache_ttl):
+        with Phase(args, "manifest"):
+            try:
+                cache, _ = versions.refresh_manifest(cache)
+            except Exception as e:
+                if cache is None:
+                    raise
+                _log(f"Using cached version list: {e}")
+    for v in cache["versions"]:
+        if args.type == "all" or v.get("type", "release") == args.type:
+            print(f"{v['id']}\t{v.get('type', 'release')}")
+    return 0
+
+
+def cmd_install(args):
+    with Phase(args, "install"):
+        installed_id = launch.install_version(args.mode, args.version, args.minecraft_dir, callback=progress_callback(args.quiet))
+    print(installed_id)
+    return 0
+
+
+def cmd_launch(args):
+    args.trace = tracing.Trace("launch", version=args.version, mode=args.mode, frontend="cli")
+    try:
+        exit_code = _launch(args)
+    except BaseException as e:
+        args.trace.finish("cancelled" if isinstance(e, KeyboardInterrupt) else "error", error=str(e))
+        _trace_summary(args)
+        raise
+    args.trace.finish("ok" if exit_code == 0 else "error", exit_code=exit_code)
+    _trace_summary(args)
+    return exit_code
+
+
+def _trace_summary(args):
+    # On stderr like the other timings, so stdout stays the pid / command
+    if args.timings or tracing.summary_enabled():
+        _log(args.trace.summary())
+
+
+def _launch(args):
+    mc_dir = args.minecraft_dir
+    with Phase(args, "settings"):
+        settings = get_settings()
+    username = args.username or settings.username
+    if not username:
+        _log("A username is required (--username or the launcher settings).")
+        return 2
+    heap_mb = args.ram or settings.heap_mb
+
+    version_id = args.version
+    if not args.no_install:
+        with Phase(args, "install"):
+            version_id = launch.install_version(args.mode, version_id, mc_dir, callback=progress_callback(args.quiet))
+
+    if args.mode != "vanilla":
+        version_id = resolve_profile(mc_dir, version_id, args.mode)
+
+    # The game runs from the shared directory, or from an instance linked out of it
+    game_dir = mc_dir
+    if args.instance:
+        with Phase(args, "instance"):
+            instance, stats = instances.create_instance(args.instance, version_id, mc_dir, callback=progress_callback(args.quiet))
+        game_dir = instance.path
+        if args.timings:
+            _log(f"[instance] {instance.path}: " + ", ".join(f"{count} {method}" for method, count in stats.items() if count))
+
+    env = None
+    mods_dir = None
+    if args.mode == "fabric":
+        env = launch.fabric_env(game_dir, version_id)
+        mods_dir = env["FABRIC_MODS_DIR"]
+        with Phase(args, "prelaunch"):
+            launch.install_customskinloader(game_dir, version_id)
+
+    with Phase(args, "jvm_options"):
+        options = jvm.apply_to_options(
+            launch.offline_options(username), game_dir, version_id, heap_mb, args.gc or settings.gc_preset, mods_dir,
+            java_dir=mc_dir
+        )
+    with Phase(args, "command_build"):
+        command = launch.build_command(version_id, game_dir, options)
+    if args.print_command:
+        print(" ".join(command))
+        return 0
+
+    with Phase(args, "spawn"):
+        # A detached game keeps its own stdout; nothing would be left to drain a pipe
+        process = launch.spawn(command, env=env, capture=not args.detach)
+    print(process.pid, flush=True)
+    if args.detach:
+        return 0
+
+    log = gamelog.GameLog(process.stdout)
+    log.subscribe(lambda event, value: _echo_log(args, log, event, value))
+    log.start()
+    exit_code = process.wait()
+    log.join(5)
+    args.trace.event("exit", exit_code=exit_code)
+    if args.timings and log.time_to_main_menu() is not None:
+        _log(f"[timing] main menu: {log.time_to_main_menu() * 1000:.0f} ms")
+    return exit_code
+
+
+def _echo_log(args, log, event, value):
+    if event == "line":
+        if log.total == 1:
+            args.trace.event("first_log_line")
+        print(value, flush=True)
+        return
+    name, elapsed = value
+    if name in processes.TRACE_MILESTONES:
+        args.trace.event(processes.TRACE_MILESTONES[name], since_spawn_ms=round(elapsed * 1000))
+    if args.timings:
+        _log(f"[milestone] {name}: {elapsed * 1000:.0f} ms")
+
+
+def cmd_instance_list(args):
+    for instance in instances.list_instances(args.minecraft_dir):
+        print(f"{instance.name}\t{instance.version_id}\t{instance.path}")
+    return 0
+
+
+def cmd_instance_create(args):
+    with Phase(args, "instance"):
+        instance, stats = instances.create_instance(args.name, args.version, args.minecraft_dir, callback=progress_callback(args.quiet))
+    _log(", ".join(f"{count} {method}" for method, count in stats.items() if count))
+    print(instance.path)
+    return 0
+
+
+def _mods_target(args):
+    # (mods folder, game version, loader) for a profile: the mods/<version> folder its
+    # FABRIC_MODS_DIR points at, and what the profile is built on
+    mc_dir = args.minecraft_dir
+    installed = version_index.get_index(mc_dir).get(args.version)
+    game_version = args.game_version or (installed.base_version if installed else args.version)
+    loader = args.loader or (installed.edition if installed and installed.edition in mods.LOADERS else None)
+    if loader is None:
+        raise launch.LaunchError(f"Cannot tell the mod loader of {args.version}; pass --loader")
+    return args.dir or os.path.join(mc_dir, "mods", args.version), game_version, loader
+
+
+def cmd_mods_install(args):
+    mods_dir, game_version, loader = _mods_target(args)
+    client = modrinth.get_client()
+    with Phase(args, "resolve"):
+        plan = client.plan(args.projects, game_version, loader, mods_dir, max_workers=args.jobs)
+    for mod in plan:
+        reason = f"required by {mod.required_by}" if mod.required_by else "requested"
+        print(f"{mod.project_id}\t{mod.version.get('version_number', '?')}\t{mod.file['filename']}\t{reason}")
+    if args.dry_run:
+        return 0
+    with Phase(args, "download"):
+        client.install_plan(plan, mods_dir, callback=progress_callback(args.quiet), max_workers=args.jobs)
+    if not args.quiet:
+        _log(f"Installed {len(plan)} mod(s) into {mods_dir}")
+    return 0
+
+
+def cmd_mods_updates(args):
+    # Checks mods/<version> (or --dir) against Modrinth for the profile's game version and loader
+    mods_dir, game_version, loader = _mods_target(args)
+    client = modrinth.get_client()
+    with Phase(args, "update check"):
+        updates, unknown = client.check_updates(mods_dir, game_version, loader)
+    current = {mod.path: mod.version for mod in mods.get_index().scan(mods_dir)}
+    for update in updates:
+        print(f"{os.path.basename(update.path)}\t{current.get(update.path, '?')}\t{update.version.get('version_number', '?')}")
+    if not args.quiet:
+        _log(f"{len(updates)} update(s), {len(unknown)} mod(s) without a {loader.title()} {game_version} build on Modrinth")
+    if updates and args.apply:
+        with Phase(args, "update"):
+            for update in updates:
+                client.apply_update(update)
+    return 0
+
+
+def cmd_prefetch(args):
+    # Metadata only: the manifest plus each version's JSON and asset index, so a
+    # later install on this machine does not wait on the slow round trips
+    mc_dir = args.minecraft_dir
+    with Phase(args, "manifest"):
+        cache, _ = versions.refresh_manifest(versions.load_manifest_cache())
+    for version_id in args.versions:
+        with Phase(args, f"metadata {version_id}"):
+            version_json = installer.load_version_json(version_id, mc_dir)
+            installer.load_asset_index(version_json, mc_dir)
+        if not args.quiet:
+            _log(f"Prefetched {version_id}")
+    return 0
+
+
+def cmd_verify(args):
+    mc_dir = args.minecraft_dir
+    failed = False
+    for version_id in args.versions:
+        with Phase(args, f"verify {version_id}"):
+            broken = installer.verify_version(version_id, mc_dir, max_workers=args.jobs)
+        for task in broken:
+            print(f"{version_id}\t{task.path}")
+        if broken and args.repair:
+            with Phase(args, f"repair {version_id}"):
+                installer.download_all(broken, callback=progress_callback(args.quiet))
+        elif broken:
+            failed = True
+        if not args.quiet:
+            _log(f"{version_id}: {len(broken)} missing or corrupt file(s)")
+    return 1 if failed else 0
+
+
+def build_parser():
+    # Shared options are accepted before or after the subcommand
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--minecraft-dir", default=argparse.SUPPRESS, help="Minecraft directory")
+    common.add_argument("--timings", action="store_true", default=argparse.SUPPRESS, help="print how long each phase took")
+    common.add_argument("-q", "--quiet", action="store_true", default=argparse.SUPPRESS, help="only print results")
+
+    parser = argparse.ArgumentParser(prog="python -m barrie", description="Barrie Launcher without the GUI", parents=[common])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("list", parents=[common], help="list available or installed versions")
+    p.add_argument("--installed", action="store_true", help="list installed versions instead")
+    p.add_argument("--edition", choices=version_index.EDITIONS, help="with --installed, only this edition")
+    p.add_argument("--type", default="release", choices=("release", "snapshot", "old_beta", "old_alpha", "all"))
+    p.add_argument("--refresh", action="store_true", help="revalidate the version list even if the cache is fresh")
+    p.set_defaults(func=cmd_list)
+
+    p = sub.add_parser("install", parents=[common], help="install a version")
+    p.add_argument("version")
+    p.add_argument("--mode", default="vanilla", choices=MODES)
+    p.set_defaults(func=cmd_install)
+
+    p = sub.add_parser("launch", parents=[common], help="install if needed and start the game")
+    p.add_argument("version")
+    p.add_argument("--mode", default="vanilla", choices=MODES)
+    p.add_argument("-u", "--username")
+    p.add_argument("--ram", type=int, help="heap size in MB (default: launcher setting)")
+    p.add_argument("--gc", choices=tuple(jvm.PRESET_LABELS), help="GC preset (default: launcher setting)")
+    p.add_argument("--no-install", action="store_true", help="launch what is already installed")
+    p.add_argument("--detach", action="store_true", help="return once the game has started")
+    p.add_argument("--print-command", action="store_true", help="print the java command instead of running it")
+    p.add_argument("--instance", metavar="NAME", help="run from instances/NAME, created or updated from the shared install")
+    p.set_defaults(func=cmd_launch)
+
+    p = sub.add_parser("instance", parents=[common], help="list or create isolated instances")
+    instance_sub = p.add_subparsers(dest="action", required=True)
+    q = instance_sub.add_parser("list", parents=[common], help="list instances")
+    q.set_defaults(func=cmd_instance_list)
+    q = instance_sub.add_parser("create", parents=[common], help="create or update an instance from an installed version")
+    q.add_argument("name")
+    q.add_argument("version")
+    q.set_defaults(func=cmd_instance_create)
+
+    p = sub.add_parser("mods", parents=[common], help="manage the mods of an installed profile")
+    mods_sub = p.add_subparsers(dest="action", required=True)
+    target = argparse.ArgumentParser(add_help=False)
+    target.add_argument("version", help="installed profile whose mods/<version> folder to use")
+    target.add_argument("--dir", help="use this folder instead")
+    target.add_argument("--game-version", help="Minecraft version to look for (default: the profile's)")
+    target.add_argument("--loader", choices=mods.LOADERS, help="mod loader to look for (default: the profile's)")
+    q = mods_sub.add_parser("install", parents=[common, target], help="install Modrinth projects and their dependencies")
+    q.add_argument("projects", nargs="+", metavar="PROJECT", help="Modrinth project id or slug")
+    q.add_argument("--dry-run", action="store_true", help="print the plan without downloading")
+    q.add_argument("-j", "--jobs", type=int, default=modrinth.FETCH_WORKERS, help="parallel lookups and downloads")
+    q.set_defaults(func=cmd_mods_install)
+    q = mods_sub.add_parser("updates", parents=[common, target], help="look up newer builds of installed mods on Modrinth")
+    q.add_argument("--apply", action="store_true", help="replace outdated jars with the newer builds")
+    q.set_defaults(func=cmd_mods_updates)
+
+    p = sub.add_parser("prefetch", parents=[common], help="download the version list and version metadata")
+    p.add_argument("versions", nargs="*")
+    p.set_defaults(func=cmd_prefetch)
+
+    p = sub.add_parser("verify", parents=[common], help="check installed files against their sizes and hashes")
+    p.add_argument("versions", nargs="+")
+    p.add_argument("--repair", action="store_true", help="download whatever is missing or corrupt")
+    p.add_argument("-j", "--jobs", type=int, help="hashing processes (default: one per CPU)")
+    p.set_defaults(func=cmd_verify)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    # Filled in here rather than as parser defaults, which the subcommand would overwrite
+    for key, value in (("minecraft_dir", get_minecraft_directory()), ("timings", False), ("quiet", False)):
+        if not hasattr(args, key):
+            setattr(args, key, value)
+    try:
+        return args.func(args)
+    except KeyboardInterrupt:
+        return 130
+    except Exception as e:
+        _log(f"Error: {e}")
+        return 1
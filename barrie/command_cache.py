@@ -0,0 +1,167 @@
+import os
+import json
+import time
+import atexit
+import hashlib
+import threading
+
+from barrie.paths import get_appdata_path
+
+COMMAND_CACHE_FILE = os.path.join(get_appdata_path(), "command_cache.json")
+CACHE_FORMAT = 1
+MAX_ENTRIES = 32
+# Hits only move an entry's used_at, so they are written in batches rather than per launch
+SAVE_DELAY_SECONDS = 5
+
+
+def _stat(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def inheritance_chain(version_id, mc_dir):
+    # Paths of every version JSON the profile pulls in through inheritsFrom
+    paths = []
+    seen = set()
+    while version_id and version_id not in seen:
+        seen.add(version_id)
+        path = os.path.join(mc_dir, "versions", version_id, f"{version_id}.json")
+        paths.append(path)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                version_id = json.load(f).get("inheritsFrom")
+        except (OSError, ValueError):
+            break
+    return paths
+
+
+def command_files(command):
+    # Files whose change would alter the resolved command: classpath entries and the java binary
+    files = []
+    for flag in ("-cp", "-classpath"):
+        if flag in command:
+            classpath = command[command.index(flag) + 1]
+            files.extend(entry for entry in classpath.split(os.pathsep) if entry)
+    if command and os.path.isabs(command[0]):
+        files.append(command[0])
+    return files
+
+
+def cache_key(version_id, mc_dir, options):
+    blob = json.dumps([version_id, os.path.abspath(mc_dir), options], sort_keys=True)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+
+class CommandCache:
+    # Resolved argv per (version, directory, options). An entry is reused while every
+    # version JSON in its inheritance chain, every classpath entry, the java binary
+    # and the runtime folder still have the size/mtime they had when it was built.
+    def __init__(self, path=COMMAND_CACHE_FILE, max_entries=MAX_ENTRIES, save_delay=SAVE_DELAY_SECONDS):
+        self.path = path
+        self.max_entries = max_entries
+        self.save_delay = save_delay
+        self._lock = threading.Lock()
+        self._timer = None
+        self._entries = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get("format") != CACHE_FORMAT:
+            return {}
+        return data.get("entries", {})
+
+    def _save(self):
+        # Called with the lock held; writes everything, including any batched hits
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"format": CACHE_FORMAT, "entries": self._entries}, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Could not write command cache: {e}")
+
+    def _schedule_save(self):
+        # Not pushed back by later hits, so a steady stream of launches still gets written
+        if self._timer is None:
+            self._timer = threading.Timer(self.save_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        with self._lock:
+            self._save()
+
+    def flush_if_pending(self):
+        if self._timer is not None:
+            self.flush()
+
+    def _fingerprint(self, paths, mc_dir):
+        # The runtime folder decides which java minecraft_launcher_lib picks
+        paths = paths + [os.path.join(mc_dir, "runtime")]
+        return [[path, _stat(path)] for path in paths]
+
+    def _is_valid(self, entry):
+        for path, recorded in entry["fingerprint"]:
+            if _stat(path) != recorded:
+                return False
+        return True
+
+    def get_command(self, version_id, mc_dir, options):
+        key = cache_key(version_id, mc_dir, options)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and self._is_valid(entry):
+            with self._lock:
+                # Kept on disk so eviction follows real use across runs
+                entry["used_at"] = time.time()
+                self._schedule_save()
+            return list(entry["command"])
+
+        import minecraft_launcher_lib
+        command = minecraft_launcher_lib.command.get_minecraft_command(version_id, mc_dir, options)
+        paths = inheritance_chain(version_id, mc_dir) + command_files(command)
+        entry = {
+            "version_id": version_id,
+            "command": command,
+            "fingerprint": self._fingerprint(paths, mc_dir),
+            "used_at": time.time()
+        }
+        with self._lock:
+            self._entries[key] = entry
+            if len(self._entries) > self.max_entries:
+                oldest = sorted(self._entries, key=lambda k: self._entries[k]["used_at"])
+                for stale in oldest[:len(self._entries) - self.max_entries]:
+                    del self._entries[stale]
+            self._save()
+        return list(command)
+
+    def invalidate(self, version_id=None):
+        with self._lock:
+            if version_id is None:
+                self._entries = {}
+            else:
+                self._entries = {k: v for k, v in self._entries.items() if v["version_id"] != version_id}
+            self._save()
+
+
+_cache = None
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        _cache = CommandCache()
+        # Hits still waiting for their batched write are saved on the way out
+        atexit.register(_cache.flush_if_pending)
+    return _cache
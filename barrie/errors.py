@@ -0,0 +1,10 @@
+# Exceptions shared across modules. Kept free of imports so low-level code such as
+# tracing can catch them without pulling in the installer and launch machinery.
+
+
+class LaunchError(Exception):
+    pass
+
+
+class LaunchCancelled(Exception):
+    pass
@@ -0,0 +1,149 @@
+import re
+import time
+import threading
+from collections import deque
+
+MAX_LINES = 5000
+
+# First match of each pattern is recorded as a milestone, timed from process start
+MILESTONES = (
+    ("setting_user", re.compile(r"Setting user: ")),
+    ("lwjgl", re.compile(r"LWJGL Version|Backend library: LWJGL")),
+    ("sound_engine", re.compile(r"Sound engine started|OpenAL initialized")),
+    ("resources_loaded", re.compile(r"Loaded \d+ recipes|Created: \d+x\d+x\d+ minecraft:textures/atlas/blocks")),
+    # A singleplayer world ("<name> joined the game" from the integrated server) or a server
+    ("world", re.compile(r"joined the game|Connecting to \S+, \d+")),
+    ("crash", re.compile(r"Game crashed!|---- Minecraft Crash Report ----|This crash report has been saved to|Exception in thread \"main\"")),
+    ("stopping", re.compile(r"Stopping!"))
+)
+# The main menu is up once the sound engine has started
+MAIN_MENU_MILESTONE = "sound_engine"
+
+_EVENT_START = re.compile(r'<log4j:Event\b[^>]*\blevel="(?P<level>[^"]*)"[^>]*\bthread="(?P<thread>[^"]*)"')
+_TIMESTAMP = re.compile(r'\btimestamp="(?P<timestamp>\d+)"')
+
+
+class Log4jXmlDecoder:
+    # Versions whose JSON carries a logging config print log4j XML events to stdout.
+    # This turns them back into "[time] [thread/LEVEL]: message" lines; plain lines pass through.
+    def __init__(self):
+        self.header = None
+        self.message = None
+        self.tag = None
+
+    def feed(self, line):
+        stripped = line.strip()
+        if self.tag is not None:
+            # An event tag broken over several lines is put back together before it is read
+            self.tag = f"{self.tag} {stripped}"
+            if ">" not in stripped:
+                return []
+            stripped, self.tag = self.tag, None
+        elif self.message is None and stripped.startswith("<log4j:Event") and ">" not in stripped:
+            self.tag = stripped
+            return []
+        if self.message is not None:
+            # Inside a multi-line CDATA block, e.g. a stack trace
+            if "]]>" in line:
+                # "]]>" alone on the closing line does not add an empty line
+                tail = line.split("]]>", 1)[0]
+                if tail:
+                    self.message.append(tail)
+                lines = self._emit(self.message)
+                self.message = None
+                return lines
+            self.message.append(line)
+            return []
+
+        match = _EVENT_START.search(stripped)
+        if match:
+            timestamp = _TIMESTAMP.search(stripped)
+            clock = time.strftime("%H:%M:%S", time.localtime(int(timestamp.group("timestamp")) / 1000)) if timestamp else "--:--:--"
+            self.header = f"[{clock}] [{match.group('thread')}/{match.group('level')}]: "
+            return []
+        if stripped.startswith("<log4j:Message><![CDATA["):
+            body = stripped[len("<log4j:Message><![CDATA["):]
+            if "]]>" in body:
+                return self._emit([body.split("]]>", 1)[0]])
+            self.message = [body]
+            return []
+        if stripped.startswith("<log4j:Throwable><![CDATA["):
+            self.header = ""
+            self.message = [stripped[len("<log4j:Throwable><![CDATA["):]]
+            return []
+        if stripped.startswith(("</log4j:Event>", "</log4j:Message>", "</log4j:Throwable>")) or not stripped:
+            return []
+        return [line]
+
+    def _emit(self, parts):
+        header = self.header or ""
+        return [header + parts[0]] + parts[1:]
+
+
+class GameLog:
+    # Drains a game's stdout on a reader thread into a bounded ring buffer.
+    # Readers tail it with lines_since(); milestones are matched as lines arrive.
+    def __init__(self, stream, started_at=None, max_lines=MAX_LINES):
+        self.stream = stream
+        self.started_at = started_at or time.time()
+        self.lines = deque(maxlen=max_lines)
+        self.total = 0
+        self.milestones = {}
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._decoder = Log4jXmlDecoder()
+        self._thread = threading.Thread(target=self._read, name="game-log", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def join(self, timeout=None):
+        self._thread.join(timeout)
+
+    def subscribe(self, listener):
+        # listener(event, value): ("line", text) or ("milestone", (name, seconds)), on the reader thread
+        self._listeners.append(listener)
+
+    def _notify(self, event, value):
+        for listener in list(self._listeners):
+            try:
+                listener(event, value)
+            except Exception as e:
+                print(f"Log listener failed: {e}")
+
+    def _read(self):
+        try:
+            for raw in iter(self.stream.readline, b""):
+                text = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+                for line in self._decoder.feed(text):
+                    self._append(line)
+        except (OSError, ValueError):
+            pass
+        finally:
+            try:
+                self.stream.close()
+            except OSError:
+                pass
+
+    def _append(self, line):
+        with self._lock:
+            self.lines.append(line)
+            self.total += 1
+        self._notify("line", line)
+        for name, pattern in MILESTONES:
+            if name not in self.milestones and pattern.search(line):
+                elapsed = time.time() - self.started_at
+                self.milestones[name] = elapsed
+                self._notify("milestone", (name, elapsed))
+
+    def lines_since(self, seen):
+        # Returns (total, new lines) for a reader that has already seen `seen` lines;
+        # lines that fell out of the buffer in between are skipped
+        with self._lock:
+            first = self.total - len(self.lines)
+            start = max(seen, first)
+            return self.total, list(self.lines)[start - first:]
+
+    def time_to_main_menu(self):
+        return self.milestones.get(MAIN_MENU_MILESTONE)
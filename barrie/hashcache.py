@@ -0,0 +1,82 @@
+import os
+import sqlite3
+import threading
+
+from barrie.paths import get_appdata_path
+
+HASH_CACHE_FILE = os.path.join(get_appdata_path(), "hash_cache.sqlite")
+
+
+class HashCache:
+    # Remembers the sha1 of every file hashed before, keyed by (path, size, mtime_ns), so a
+    # file is only read again once it changes. Loaded into memory on first use; new hashes are
+    # buffered and written in one transaction by flush().
+    def __init__(self, path=HASH_CACHE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = None
+        self._pending = {}
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        connection = sqlite3.connect(self.path)
+        connection.execute("CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, sha1 TEXT)")
+        return connection
+
+    def _load(self):
+        if self._entries is not None:
+            return
+        self._entries = {}
+        try:
+            connection = self._connect()
+            try:
+                for path, size, mtime_ns, sha1 in connection.execute("SELECT path, size, mtime_ns, sha1 FROM files"):
+                    self._entries[path] = (size, mtime_ns, sha1)
+            finally:
+                connection.close()
+        except sqlite3.Error as e:
+            print(f"Ignoring unreadable hash cache: {e}")
+
+    def get(self, path, stat):
+        # The cached sha1 if the file still has the size and mtime it had when hashed
+        with self._lock:
+            self._load()
+            entry = self._entries.get(os.path.abspath(path))
+        if entry is not None and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+            return entry[2]
+        return None
+
+    def put(self, path, stat, sha1):
+        path = os.path.abspath(path)
+        with self._lock:
+            self._load()
+            entry = (stat.st_size, stat.st_mtime_ns, sha1)
+            if self._entries.get(path) != entry:
+                self._entries[path] = entry
+                self._pending[path] = entry
+
+    def flush(self):
+        with self._lock:
+            if not self._pending:
+                return
+            rows = [(path, size, mtime_ns, sha1) for path, (size, mtime_ns, sha1) in self._pending.items()]
+            self._pending = {}
+        try:
+            connection = self._connect()
+            try:
+                with connection:
+                    connection.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)", rows)
+            finally:
+                connection.close()
+        except sqlite3.Error as e:
+            print(f"Could not write hash cache: {e}")
+
+
+_cache = None
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        _cache = HashCache()
+    return _cache
@@ -0,0 +1,460 @@
+import os
+import sys
+import json
+import hashlib
+import platform
+import zipfile
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from barrie import hashcache, net, versions
+
+LIBRARIES_URL = "https://libraries.minecraft.net/"
+RESOURCES_URL = "https://resources.download.minecraft.net/"
+JVM_MANIFEST_URL = "https://launchermeta.mojang.com/v1/products/java-runtime/2ec0cc96c44e5a76b9c8b7c39df7210883d12871/all.json"
+DEFAULT_WORKERS = 16
+CHUNK_SIZE = 64 * 1024
+# Below this many files to hash, starting a process pool costs more than it saves
+PARALLEL_HASH_MIN = 32
+
+DownloadTask = namedtuple("DownloadTask", "url path sha1 size")
+
+
+class InstallError(Exception):
+    pass
+
+
+def _callback(callback, key, value):
+    if callback and key in callback:
+        callback[key](value)
+
+
+def os_name():
+    if os.name == "nt":
+        return "windows"
+    if platform.system() == "Darwin":
+        return "osx"
+    return "linux"
+
+
+def os_arch_bits():
+    return "64" if platform.architecture()[0] == "64bit" else "32"
+
+
+def jvm_platform():
+    # The platform key of Mojang's Java runtime manifest
+    system = platform.system()
+    bits = platform.architecture()[0]
+    if system == "Windows":
+        return "windows-x86" if bits == "32bit" else "windows-x64"
+    if system == "Linux":
+        return "linux-i386" if bits == "32bit" else "linux"
+    if system == "Darwin":
+        return "mac-os-arm64" if platform.machine() == "arm64" else "mac-os"
+    return "gamecore"
+
+
+def rules_allow(rules):
+    if not rules:
+        return True
+    allowed = False
+    for rule in rules:
+        # Feature-gated rules only apply to game arguments
+        if "features" in rule:
+            continue
+        os_rule = rule.get("os", {})
+        if "name" in os_rule and os_rule["name"] != os_name():
+            continue
+        if "arch" in os_rule and os_rule["arch"] == "x86" and os_arch_bits() != "32":
+            continue
+        allowed = rule.get("action") == "allow"
+    return allowed
+
+
+def library_path(name):
+    # "group:artifact:version[:classifier]" -> group/path/artifact/version/artifact-version[-classifier].jar
+    parts = name.split(":")
+    group, artifact, version = parts[0], parts[1], parts[2]
+    classifier = f"-{parts[3]}" if len(parts) > 3 else ""
+    extension = "jar"
+    if "@" in version:
+        version, extension = version.split("@", 1)
+    return "/".join(group.split(".") + [artifact, version, f"{artifact}-{version}{classifier}.{extension}"])
+
+
+def sha1_of(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cached_sha1(path, stat=None):
+    # The file's sha1, read from the hash cache while its size and mtime are unchanged
+    stat = stat or os.stat(path)
+    cache = hashcache.get_cache()
+    digest = cache.get(path, stat)
+    if digest is None:
+        digest = sha1_of(path)
+        cache.put(path, stat, digest)
+    return digest
+
+
+def is_installed(task):
+    try:
+        stat = os.stat(task.path)
+    except OSError:
+        return False
+    if task.size is not None and stat.st_size != task.size:
+        return False
+    return task.sha1 is None or cached_sha1(task.path, stat) == task.sha1
+
+
+def download_file(task, session=None):
+    os.makedirs(os.path.dirname(task.path), exist_ok=True)
+    getter = session or net.session()
+    tmp_path = task.path + ".part"
+    digest = hashlib.sha1()
+    with getter.get(task.url, stream=True) as r:
+        r.raise_for_status()
+        with open(tmp_path, "wb") as f:
+            for chunk in r.iter_content(CHUNK_SIZE):
+                digest.update(chunk)
+                f.write(chunk)
+    if task.sha1 is not None and digest.hexdigest() != task.sha1:
+        os.remove(tmp_path)
+        raise InstallError(f"Checksum mismatch for {task.url}")
+    os.replace(tmp_path, task.path)
+    # Hashed on the way in, so the next check does not read it again
+    hashcache.get_cache().put(task.path, os.stat(task.path), digest.hexdigest())
+
+
+def download_all(tasks, callback=None, max_workers=DEFAULT_WORKERS, session=None):
+    # Downloads every task that is missing or corrupt on a bounded pool.
+    # The callback follows minecraft_launcher_lib's setStatus/setProgress/setMax shape.
+    if session is None:
+        session = net.session()
+    _callback(callback, "setMax", len(tasks))
+    done = 0
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = [executor.submit(_ensure, task, session) for task in tasks]
+        for future in as_completed(futures):
+            future.result()
+            done += 1
+            _callback(callback, "setProgress", done)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        hashcache.get_cache().flush()
+    return done
+
+
+def _ensure(task, session):
+    if not is_installed(task):
+        download_file(task, session)
+
+
+def load_version_json(version_id, mc_dir, session=None):
+    version_dir = os.path.join(mc_dir, "versions", version_id)
+    json_path = os.path.join(version_dir, f"{version_id}.json")
+
+    # An installed JSON is used as is, so reinstalling or verifying works offline. Only a
+    # missing file, or one the cached manifest gives another hash for, is fetched.
+    cache = versions.load_manifest_cache()
+    entry = versions.find_version(cache, version_id)
+    if os.path.exists(json_path) and (entry is None or not entry.get("sha1") or cached_sha1(json_path) == entry["sha1"]):
+        with open(json_path, "r") as f:
+            return json.load(f)
+    if entry is None or "url" not in entry:
+        cache, _ = versions.refresh_manifest(cache)
+        entry = versions.find_version(cache, version_id)
+    if entry is None:
+        raise InstallError(f"Unknown Minecraft version {version_id}")
+
+    task = DownloadTask(entry["url"], json_path, entry.get("sha1"), None)
+    if not is_installed(task):
+        download_file(task, session)
+    with open(json_path, "r") as f:
+        return json.load(f)
+
+
+def load_asset_index(version_json, mc_dir, session=None):
+    # Very old versions have no asset index at all
+    index = version_json.get("assetIndex")
+    if index is None:
+        return {"objects": {}}
+    index_path = os.path.join(mc_dir, "assets", "indexes", f"{version_json.get('assets', index['id'])}.json")
+    task = DownloadTask(index["url"], index_path, index.get("sha1"), index.get("size"))
+    if not is_installed(task):
+        download_file(task, session)
+    with open(index_path, "r") as f:
+        return json.load(f)
+
+
+def library_tasks(version_json, mc_dir):
+    tasks = []
+    natives = []
+    libraries_dir = os.path.join(mc_dir, "libraries")
+    for lib in version_json.get("libraries", []):
+        if not rules_allow(lib.get("rules")):
+            continue
+        downloads = lib.get("downloads", {})
+        artifact = downloads.get("artifact")
+        if artifact:
+            path = os.path.join(libraries_dir, artifact.get("path") or library_path(lib["name"]))
+            tasks.append(DownloadTask(artifact["url"], path, artifact.get("sha1"), artifact.get("size")))
+        elif "downloads" not in lib and "name" in lib:
+            # Loader-style entry: maven coordinates plus an optional repository url
+            relative = library_path(lib["name"])
+            url = lib.get("url", LIBRARIES_URL).rstrip("/") + "/" + relative
+            tasks.append(DownloadTask(url, os.path.join(libraries_dir, relative), lib.get("sha1"), lib.get("size")))
+
+        classifier = lib.get("natives", {}).get(os_name())
+        if classifier:
+            classifier = classifier.replace("${arch}", os_arch_bits())
+            native = downloads.get("classifiers", {}).get(classifier)
+            if native:
+                path = os.path.join(libraries_dir, native["path"])
+                tasks.append(DownloadTask(native["url"], path, native.get("sha1"), native.get("size")))
+                natives.append((path, lib.get("extract", {}).get("exclude", [])))
+    return tasks, natives
+
+
+def asset_tasks(asset_index, mc_dir, resources_url=RESOURCES_URL):
+    tasks = []
+    objects_dir = os.path.join(mc_dir, "assets", "objects")
+    seen = set()
+    for obj in asset_index.get("objects", {}).values():
+        digest = obj["hash"]
+        if digest in seen:
+            continue
+        seen.add(digest)
+        tasks.append(DownloadTask(
+            f"{resources_url}{digest[:2]}/{digest}",
+            os.path.join(objects_dir, digest[:2], digest),
+            digest,
+            obj.get("size")
+        ))
+    return tasks
+
+
+def _runtime_dir(component, mc_dir):
+    return os.path.join(mc_dir, "runtime", component, jvm_platform())
+
+
+def runtime_installed(component, mc_dir):
+    # True if the runtime was installed completely (the .version file is written last) and
+    # every file in its <component>.sha1 list still matches, checked through the hash cache
+    runtime_dir = _runtime_dir(component, mc_dir)
+    if not os.path.exists(os.path.join(runtime_dir, ".version")):
+        return False
+    tasks = []
+    try:
+        with open(os.path.join(runtime_dir, f"{component}.sha1"), "r", encoding="utf-8") as f:
+            for line in f:
+                # "<path> /#// <sha1> <ctime in ns>", as Mojang's launcher writes it
+                path, separator, rest = line.rstrip("\n").partition(" /#// ")
+                if separator:
+                    tasks.append(DownloadTask(None, os.path.join(runtime_dir, component, path), rest.split(" ")[0], None))
+    except OSError:
+        return False
+    return bool(tasks) and not verify_tasks(tasks)
+
+
+def _json(session, url):
+    with session.get(url) as r:
+        r.raise_for_status()
+        return r.json()
+
+
+def install_runtime(component, mc_dir, callback=None, max_workers=DEFAULT_WORKERS, session=None):
+    # Installs Mojang's Java runtime component under <mc_dir>/runtime in the layout the official
+    # launcher uses. An intact install is left alone without touching the network; otherwise
+    # its files go through download_all like any other install.
+    if runtime_installed(component, mc_dir):
+        return
+    session = session or net.session()
+    runtime_dir = _runtime_dir(component, mc_dir)
+    builds = _json(session, JVM_MANIFEST_URL).get(jvm_platform(), {})
+    if component not in builds:
+        raise InstallError(f"Java runtime {component} is not available for {jvm_platform()}")
+    if not builds[component]:
+        return
+    build = builds[component][0]
+    files = _json(session, build["manifest"]["url"])["files"]
+
+    base = os.path.join(runtime_dir, component)
+    tasks = []
+    executables = []
+    links = []
+    for name, entry in files.items():
+        path = os.path.normpath(os.path.join(base, name))
+        if os.path.commonpath([base, path]) != base:
+            raise InstallError(f"Java runtime file outside its folder: {name}")
+        if entry["type"] == "directory":
+            os.makedirs(path, exist_ok=True)
+        elif entry["type"] == "file":
+            raw = entry["downloads"]["raw"]
+            tasks.append(DownloadTask(raw["url"], path, raw["sha1"], raw.get("size")))
+            if entry.get("executable"):
+                executables.append(path)
+        elif entry["type"] == "link":
+            links.append((path, entry["target"]))
+    download_all(tasks, callback=callback, max_workers=max_workers, session=session)
+
+    for path in executables:
+        os.chmod(path, os.stat(path).st_mode | 0o111)
+    for path, target in links:
+        if os.path.lexists(path):
+            continue
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            os.symlink(target, path)
+        except OSError:
+            pass
+    with open(os.path.join(runtime_dir, f"{component}.sha1"), "w", encoding="utf-8") as f:
+        for task in tasks:
+            f.write(f"{os.path.relpath(task.path, base).replace(os.sep, '/')} /#// {task.sha1} {os.stat(task.path).st_ctime_ns}\n")
+    with open(os.path.join(runtime_dir, ".version"), "w", encoding="utf-8") as f:
+        f.write(build["version"]["name"])
+
+
+def extract_natives(natives, natives_dir):
+    os.makedirs(natives_dir, exist_ok=True)
+    for jar_path, exclude in natives:
+        with zipfile.ZipFile(jar_path) as jar:
+            for member in jar.namelist():
+                if member.endswith("/") or any(member.startswith(prefix) for prefix in exclude):
+                    continue
+                jar.extract(member, natives_dir)
+
+
+def install_version(version_id, mc_dir, callback=None, max_workers=DEFAULT_WORKERS, resources_url=RESOURCES_URL):
+    import minecraft_launcher_lib
+    session = net.session()
+    _callback(callback, "setStatus", f"Reading version {version_id}")
+    version_json = load_version_json(version_id, mc_dir, session)
+    if "inheritsFrom" in version_json:
+        # Modded profiles are still installed by minecraft_launcher_lib
+        minecraft_launcher_lib.install.install_minecraft_version(version_id, mc_dir, callback=callback)
+        return
+
+    version_dir = os.path.join(mc_dir, "versions", version_id)
+    tasks, natives = library_tasks(version_json, mc_dir)
+
+    client = version_json.get("downloads", {}).get("client")
+    if client:
+        tasks.append(DownloadTask(client["url"], os.path.join(version_dir, f"{version_id}.jar"), client.get("sha1"), client.get("size")))
+
+    logging_file = version_json.get("logging", {}).get("client", {}).get("file")
+    if logging_file:
+        path = os.path.join(mc_dir, "assets", "log_configs", logging_file["id"])
+        tasks.append(DownloadTask(logging_file["url"], path, logging_file.get("sha1"), logging_file.get("size")))
+
+    _callback(callback, "setStatus", "Downloading asset index")
+    asset_index = load_asset_index(version_json, mc_dir, session)
+    tasks.extend(asset_tasks(asset_index, mc_dir, resources_url))
+
+    _callback(callback, "setStatus", f"Downloading {len(tasks)} files")
+    download_all(tasks, callback=callback, max_workers=max_workers, session=session)
+
+    if natives:
+        _callback(callback, "setStatus", "Extracting natives")
+        extract_natives(natives, os.path.join(version_dir, "natives"))
+
+    java_version = version_json.get("javaVersion")
+    if java_version:
+        _callback(callback, "setStatus", "Checking Java runtime")
+        install_runtime(java_version["component"], mc_dir, callback=callback, max_workers=max_workers, session=session)
+
+
+def local_version_chain(version_id, mc_dir):
+    # The installed version JSONs for version_id and everything it inherits from
+    chain = []
+    while version_id and version_id not in [v.get("id") for v in chain]:
+        json_path = os.path.join(mc_dir, "versions", version_id, f"{version_id}.json")
+        if not os.path.exists(json_path):
+            raise InstallError(f"Version {version_id} is not installed")
+        with open(json_path, "r") as f:
+            version_json = json.load(f)
+        version_json.setdefault("id", version_id)
+        chain.append(version_json)
+        version_id = version_json.get("inheritsFrom")
+    return chain
+
+
+def version_tasks(version_id, mc_dir, resources_url=RESOURCES_URL):
+    # Every file an installed version needs, rebuilt from the JSONs on disk
+    tasks = []
+    for version_json in local_version_chain(version_id, mc_dir):
+        tasks.extend(library_tasks(version_json, mc_dir)[0])
+        client = version_json.get("downloads", {}).get("client")
+        if client:
+            jar_path = os.path.join(mc_dir, "versions", version_json["id"], f"{version_json['id']}.jar")
+            tasks.append(DownloadTask(client["url"], jar_path, client.get("sha1"), client.get("size")))
+        index = version_json.get("assetIndex")
+        if index is not None:
+            index_path = os.path.join(mc_dir, "assets", "indexes", f"{version_json.get('assets', index['id'])}.json")
+            if os.path.exists(index_path):
+                with open(index_path, "r") as f:
+                    tasks.extend(asset_tasks(json.load(f), mc_dir, resources_url))
+            tasks.append(DownloadTask(index["url"], index_path, index.get("sha1"), index.get("size")))
+    return tasks
+
+
+def hash_files(paths, max_workers=None):
+    # sha1 of each path, in order. Large batches are spread over a process pool, since
+    # hashing is CPU-bound; frozen builds hash inline rather than re-launching the executable.
+    if len(paths) < PARALLEL_HASH_MIN or getattr(sys, "frozen", False):
+        yield from map(sha1_of, paths)
+        return
+    workers = max_workers or os.cpu_count() or 1
+    # Many files per round trip so tiny asset objects are not dominated by pickling
+    chunksize = max(1, min(256, len(paths) // (workers * 4)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(sha1_of, paths, chunksize=chunksize)
+
+
+def verify_tasks(tasks, callback=None, max_workers=None):
+    # Returns the tasks whose file is missing or does not match its size/sha1. Only files the
+    # hash cache has not seen at their current size and mtime are read.
+    cache = hashcache.get_cache()
+    unique = list({task.path: task for task in tasks}.values())
+    _callback(callback, "setMax", len(unique))
+    broken = []
+    to_hash = []
+    done = 0
+    for task in unique:
+        try:
+            stat = os.stat(task.path)
+        except OSError:
+            stat = None
+        if stat is None or (task.size is not None and stat.st_size != task.size):
+            broken.append(task)
+        elif task.sha1 is not None:
+            digest = cache.get(task.path, stat)
+            if digest is None:
+                to_hash.append((task, stat))
+                continue
+            if digest != task.sha1:
+                broken.append(task)
+        done += 1
+        _callback(callback, "setProgress", done)
+
+    try:
+        hashes = hash_files([task.path for task, _ in to_hash], max_workers)
+        for (task, stat), digest in zip(to_hash, hashes):
+            cache.put(task.path, stat, digest)
+            if digest != task.sha1:
+                broken.append(task)
+            done += 1
+            _callback(callback, "setProgress", done)
+    finally:
+        cache.flush()
+    return broken
+
+
+def verify_version(version_id, mc_dir, callback=None, max_workers=None):
+    # Returns the tasks whose file is missing or does not match its size/sha1
+    return verify_tasks(version_tasks(version_id, mc_dir), callback, max_workers)
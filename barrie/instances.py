@@ -0,0 +1,107 @@
+import os
+import json
+import time
+from collections import namedtuple
+
+from barrie import installer, store
+
+INSTANCES_DIRNAME = "instances"
+INSTANCE_FILE = "instance.json"
+INSTANCE_FORMAT = 1
+
+Instance = namedtuple("Instance", "name path version_id created_at")
+
+
+def _callback(callback, key, value):
+    if callback and key in callback:
+        callback[key](value)
+
+
+def get_instance_path(name, mc_dir):
+    return os.path.join(mc_dir, INSTANCES_DIRNAME, name)
+
+
+def _instance_files(version_id, mc_dir):
+    # (path in the shared install, declared sha1, declared size) for everything the version runs on
+    files = [(task.path, task.sha1, task.size) for task in installer.version_tasks(version_id, mc_dir)]
+    for version_json in installer.local_version_chain(version_id, mc_dir):
+        version_dir = os.path.join(mc_dir, "versions", version_json["id"])
+        files.append((os.path.join(version_dir, f"{version_json['id']}.json"), None, None))
+        # Modded profiles without a client download still have a jar of their own (Forge)
+        jar_path = os.path.join(version_dir, f"{version_json['id']}.jar")
+        if "client" not in version_json.get("downloads", {}) and os.path.exists(jar_path):
+            files.append((jar_path, None, None))
+        # Natives are extracted at install time, so the instance needs the extracted files too
+        for dirpath, _, filenames in os.walk(os.path.join(version_dir, "natives")):
+            files.extend((os.path.join(dirpath, filename), None, None) for filename in filenames)
+        logging_file = version_json.get("logging", {}).get("client", {}).get("file")
+        if logging_file:
+            path = os.path.join(mc_dir, "assets", "log_configs", logging_file["id"])
+            files.append((path, logging_file.get("sha1"), logging_file.get("size")))
+    return files
+
+
+def create_instance(name, version_id, mc_dir, callback=None):
+    # Builds instances/<name> as a Minecraft directory of its own: saves, mods and config are
+    # private, while version files, libraries and assets are links to one store object each.
+    # Running it again on an existing instance only links what is new or changed.
+    if not name or os.path.basename(name) != name or name in (".", ".."):
+        raise installer.InstallError(f"Invalid instance name: {name!r}")
+    path = get_instance_path(name, mc_dir)
+    shared = store.get_store(mc_dir)
+    files = _instance_files(version_id, mc_dir)
+    missing = [src for src, _, _ in files if not os.path.exists(src)]
+    if missing:
+        raise installer.InstallError(f"{len(missing)} files of {version_id} are missing; run a repair first (e.g. {missing[0]})")
+
+    def link(entry):
+        src, sha1, size = entry
+        dst = os.path.join(path, os.path.relpath(src, mc_dir))
+        try:
+            existing = os.stat(dst).st_size
+        except OSError:
+            existing = None
+        if sha1 is not None and existing is not None and existing == (size if size is not None else os.path.getsize(src)):
+            # Files with a declared hash are immutable; a right-sized one is already linked
+            return "unchanged"
+        return shared.share(src, dst, sha1)
+
+    stats = {"reflink": 0, "hardlink": 0, "copy": 0, "unchanged": 0}
+    _callback(callback, "setStatus", f"Linking {len(files)} files into instance {name}")
+    _callback(callback, "setMax", len(files))
+    for done, entry in enumerate(files, 1):
+        stats[link(entry)] += 1
+        _callback(callback, "setProgress", done)
+
+    for folder in ("mods", "saves", "config", "resourcepacks"):
+        os.makedirs(os.path.join(path, folder), exist_ok=True)
+    instance = load_instance(name, mc_dir)
+    created_at = instance.created_at if instance is not None else time.time()
+    _write_instance_file(path, {"format": INSTANCE_FORMAT, "name": name, "version_id": version_id, "created_at": created_at})
+    return Instance(name, path, version_id, created_at), stats
+
+
+def _write_instance_file(path, data):
+    tmp_path = os.path.join(path, INSTANCE_FILE + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=4)
+    os.replace(tmp_path, os.path.join(path, INSTANCE_FILE))
+
+
+def load_instance(name, mc_dir):
+    path = get_instance_path(name, mc_dir)
+    try:
+        with open(os.path.join(path, INSTANCE_FILE), "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return Instance(name, path, data.get("version_id"), data.get("created_at"))
+
+
+def list_instances(mc_dir):
+    root = os.path.join(mc_dir, INSTANCES_DIRNAME)
+    try:
+        names = sorted(os.listdir(root))
+    except OSError:
+        return []
+    return [instance for instance in (load_instance(name, mc_dir) for name in names) if instance is not None]
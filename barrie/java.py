@@ -0,0 +1,241 @@
+import os
+import re
+import json
+import glob
+import platform
+import threading
+from collections import namedtuple
+
+from barrie.paths import get_appdata_path
+
+JAVA_CACHE_FILE = os.path.join(get_appdata_path(), "java_runtimes.json")
+CACHE_FORMAT = 1
+
+JavaRuntime = namedtuple("JavaRuntime", "path home version major arch vendor")
+
+# Versions that only run on exactly this Java (LaunchWrapper breaks on 9+)
+EXACT_MAJORS = (8,)
+
+_DIR_VERSION = re.compile(r"(?:jdk|jre|java)[-_]?(1\.\d+|\d+)", re.IGNORECASE)
+
+
+def java_executable(home):
+    name = "java.exe" if os.name == "nt" else "java"
+    return os.path.join(home, "bin", name)
+
+
+def parse_release(path):
+    # The JDK/JRE "release" file: KEY="value" lines, no need to run java to read them
+    values = {}
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            key, sep, value = line.partition("=")
+            if sep:
+                values[key.strip()] = value.strip().strip('"')
+    return values
+
+
+def parse_major(version):
+    # "1.8.0_351" -> 8, "17.0.2" -> 17, "21" -> 21
+    parts = re.findall(r"\d+", version or "")
+    if not parts:
+        return None
+    if parts[0] == "1" and len(parts) > 1:
+        return int(parts[1])
+    return int(parts[0])
+
+
+def normalize_arch(arch):
+    arch = (arch or "").lower()
+    if arch in ("x86_64", "amd64", "x64"):
+        return "x64"
+    if arch in ("aarch64", "arm64"):
+        return "arm64"
+    if arch in ("x86", "i386", "i586", "i686"):
+        return "x86"
+    return arch
+
+
+def machine_arch():
+    return normalize_arch(platform.machine())
+
+
+def probe(home):
+    # Describes the runtime at home from its release file, or its folder name as a last resort
+    executable = java_executable(home)
+    if not os.path.isfile(executable):
+        return None
+    release_path = os.path.join(home, "release")
+    version = arch = vendor = None
+    if os.path.isfile(release_path):
+        try:
+            release = parse_release(release_path)
+        except OSError:
+            release = {}
+        version = release.get("JAVA_VERSION")
+        arch = release.get("OS_ARCH")
+        vendor = release.get("IMPLEMENTOR")
+    if version is None:
+        match = _DIR_VERSION.search(os.path.basename(home))
+        if match is None:
+            return None
+        version = match.group(1)
+    major = parse_major(version)
+    if major is None:
+        return None
+    return JavaRuntime(executable, home, version, major, normalize_arch(arch) or None, vendor)
+
+
+def _mac_home(path):
+    # macOS bundles keep the actual home under Contents/Home
+    bundle_home = os.path.join(path, "Contents", "Home")
+    return bundle_home if os.path.isdir(bundle_home) else path
+
+
+def scan_roots(mc_dir):
+    # Folders whose children are Java homes. Their mtimes decide whether the cache is stale.
+    home = os.path.expanduser("~")
+    roots = [os.path.join(home, ".jdks"), os.path.join(home, ".sdkman", "candidates", "java")]
+    if os.name == "nt":
+        for base in filter(None, (os.getenv("ProgramFiles"), os.getenv("ProgramFiles(x86)"))):
+            for vendor in ("Java", "Eclipse Adoptium", "Eclipse Foundation", "AdoptOpenJDK", "Microsoft", "Zulu", "Amazon Corretto", "BellSoft"):
+                roots.append(os.path.join(base, vendor))
+    elif platform.system() == "Darwin":
+        roots += ["/Library/Java/JavaVirtualMachines", os.path.join(home, "Library", "Java", "JavaVirtualMachines")]
+    else:
+        roots += ["/usr/lib/jvm", "/usr/java", "/opt/java", "/opt/jdk"]
+    # Runtimes Mojang's launcher (and minecraft_launcher_lib) put in runtime/<component>/<platform>/<component>
+    roots += glob.glob(os.path.join(mc_dir, "runtime", "*", "*"))
+    return roots
+
+
+def extra_homes():
+    # JAVA_HOME and whatever java is on PATH
+    homes = []
+    if os.getenv("JAVA_HOME"):
+        homes.append(os.getenv("JAVA_HOME"))
+    for directory in os.getenv("PATH", "").split(os.pathsep):
+        executable = os.path.join(directory, "java.exe" if os.name == "nt" else "java")
+        if os.path.isfile(executable):
+            homes.append(os.path.dirname(os.path.dirname(os.path.realpath(executable))))
+    return homes
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class JavaRegistry:
+    # Every Java runtime found on this machine. The scan result is cached and reused while
+    # the scanned folders and each runtime's release file keep their mtimes.
+    def __init__(self, mc_dir, cache_path=JAVA_CACHE_FILE):
+        self.mc_dir = mc_dir
+        self.cache_path = cache_path
+        self._lock = threading.Lock()
+        self._runtimes = None
+        self._fingerprinted = None
+
+    def _fingerprint(self):
+        roots = scan_roots(self.mc_dir)
+        return {path: _mtime(path) for path in roots + [os.path.join(self.mc_dir, "runtime")]}, extra_homes()
+
+    def _load_cache(self, roots, homes):
+        try:
+            with open(self.cache_path, "r") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if cache.get("format") != CACHE_FORMAT or cache.get("roots") != roots or cache.get("homes") != homes:
+            return None
+        runtimes = []
+        for entry in cache.get("runtimes", []):
+            if _mtime(os.path.join(entry["home"], "release")) != entry["release_mtime_ns"] or not os.path.isfile(entry["path"]):
+                return None
+            runtimes.append(JavaRuntime(*(entry[field] for field in JavaRuntime._fields)))
+        return runtimes
+
+    def _save_cache(self, roots, homes, runtimes):
+        cache = {
+            "format": CACHE_FORMAT,
+            "roots": roots,
+            "homes": homes,
+            "runtimes": [
+                dict(runtime._asdict(), release_mtime_ns=_mtime(os.path.join(runtime.home, "release")))
+                for runtime in runtimes
+            ]
+        }
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = self.cache_path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(cache, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"Could not write Java runtime cache: {e}")
+
+    def _scan(self, roots, homes):
+        candidates = list(homes)
+        for root in roots:
+            if not os.path.isdir(root):
+                continue
+            if os.path.isfile(java_executable(root)):
+                candidates.append(root)
+                continue
+            for name in sorted(os.listdir(root)):
+                candidates.append(_mac_home(os.path.join(root, name)))
+
+        runtimes = []
+        seen = set()
+        for home in candidates:
+            key = os.path.normcase(os.path.realpath(home))
+            if key in seen:
+                continue
+            seen.add(key)
+            runtime = probe(home)
+            if runtime is not None:
+                runtimes.append(runtime)
+        return runtimes
+
+    def runtimes(self, refresh=False):
+        # The folder mtimes are checked on every call, so a runtime the installer adds while the
+        # launcher is open is found by the next launch
+        with self._lock:
+            roots, homes = self._fingerprint()
+            if self._runtimes is not None and not refresh and self._fingerprinted == (roots, homes):
+                return list(self._runtimes)
+            runtimes = None if refresh else self._load_cache(roots, homes)
+            if runtimes is None:
+                runtimes = self._scan(roots, homes)
+                self._save_cache(roots, homes, runtimes)
+            self._runtimes = runtimes
+            self._fingerprinted = (roots, homes)
+            return list(runtimes)
+
+    def select(self, major):
+        # The best runtime for a version that wants Java `major`: the same major if there is one,
+        # otherwise the oldest newer one (never for Java 8 versions, which break on newer Java)
+        arch = machine_arch()
+        mojang_runtime = os.path.join(self.mc_dir, "runtime")
+
+        def rank(runtime):
+            return (
+                runtime.major != major,
+                runtime.major,
+                runtime.arch not in (None, arch),
+                not runtime.home.startswith(mojang_runtime)
+            )
+
+        candidates = [r for r in self.runtimes() if r.major == major or (major not in EXACT_MAJORS and r.major > major)]
+        return min(candidates, key=rank) if candidates else None
+
+
+_registries = {}
+
+
+def get_registry(mc_dir):
+    if mc_dir not in _registries:
+        _registries[mc_dir] = JavaRegistry(mc_dir)
+    return _registries[mc_dir]
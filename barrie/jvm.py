@@ -0,0 +1,197 @@
+import os
+
+from barrie import installer, java
+
+MB = 1024 * 1024
+MIN_HEAP_MB = 1024
+# The heap starts at a quarter of its maximum and grows on demand, so a small machine does not
+# commit the whole heap at launch
+INITIAL_HEAP_DIVISOR = 4
+MIN_INITIAL_HEAP_MB = 512
+BASE_HEAP_MB = 2048
+# Extra heap per installed mod, and the most the auto-sizer will ever hand out
+PER_MOD_MB = 32
+AUTO_HEAP_CAP_MB = 8192
+# Left to the OS and the rest of the desktop when sizing or capping the heap
+OS_RESERVE_MB = 2048
+DEFAULT_JAVA_MAJOR = 8
+
+DEFAULT_PRESET = "g1"
+PRESET_LABELS = {
+    "none": "JVM default",
+    "g1": "G1 (tuned)",
+    "zgc": "ZGC (Java 17+)",
+    "aikar": "Aikar's flags"
+}
+
+# The flags Mojang's own launcher uses for the client
+G1_FLAGS = [
+    "-XX:+UnlockExperimentalVMOptions",
+    "-XX:+UseG1GC",
+    "-XX:G1NewSizePercent=20",
+    "-XX:G1ReservePercent=20",
+    "-XX:MaxGCPauseMillis=50",
+    "-XX:G1HeapRegionSize=32M"
+]
+
+AIKAR_FLAGS = [
+    "-XX:+UnlockExperimentalVMOptions",
+    "-XX:+UseG1GC",
+    "-XX:+ParallelRefProcEnabled",
+    "-XX:MaxGCPauseMillis=200",
+    "-XX:+DisableExplicitGC",
+    "-XX:+AlwaysPreTouch",
+    "-XX:G1HeapWastePercent=5",
+    "-XX:G1MixedGCCountTarget=4",
+    "-XX:G1MixedGCLiveThresholdPercent=90",
+    "-XX:G1RSetUpdatingPauseTimePercent=5",
+    "-XX:SurvivorRatio=32",
+    "-XX:+PerfDisableSharedMem",
+    "-XX:MaxTenuringThreshold=1"
+]
+# Preset settings HotSpot refuses unless -XX:+UnlockExperimentalVMOptions comes first
+EXPERIMENTAL_FLAGS = {"-XX:G1NewSizePercent", "-XX:G1MaxNewSizePercent", "-XX:G1MixedGCLiveThresholdPercent"}
+LOCK_EXPERIMENTAL = "-XX:-UnlockExperimentalVMOptions"
+# HotSpot reads options in order, so an unlock only counts for the options after it
+UNLOCK_FLAGS = ("-XX:+UnlockExperimentalVMOptions", "-XX:+UnlockDiagnosticVMOptions")
+
+# Aikar's generation sizing changes once the heap passes 12 GB
+AIKAR_SMALL_HEAP = [
+    "-XX:G1NewSizePercent=30",
+    "-XX:G1MaxNewSizePercent=40",
+    "-XX:G1HeapRegionSize=8M",
+    "-XX:G1ReservePercent=20",
+    "-XX:InitiatingHeapOccupancyPercent=15"
+]
+AIKAR_LARGE_HEAP = [
+    "-XX:G1NewSizePercent=40",
+    "-XX:G1MaxNewSizePercent=50",
+    "-XX:G1HeapRegionSize=16M",
+    "-XX:G1ReservePercent=15",
+    "-XX:InitiatingHeapOccupancyPercent=20"
+]
+
+
+def system_memory_mb():
+    import psutil
+    return psutil.virtual_memory().total // MB
+
+
+def max_heap_mb(total_mb):
+    # Never more than three quarters of RAM, and always leave the OS its reserve
+    return max(MIN_HEAP_MB, min(total_mb - OS_RESERVE_MB, total_mb * 3 // 4))
+
+
+def recommended_heap_mb(total_mb, mod_count=0):
+    wanted = min(BASE_HEAP_MB + mod_count * PER_MOD_MB, AUTO_HEAP_CAP_MB)
+    # Rounded up to a 512 MB step so small mod changes do not change the command
+    wanted = -(-wanted // 512) * 512
+    return max(MIN_HEAP_MB, min(wanted, max_heap_mb(total_mb), total_mb // 2))
+
+
+def initial_heap_mb(heap_mb):
+    return min(heap_mb, max(MIN_INITIAL_HEAP_MB, heap_mb // INITIAL_HEAP_DIVISOR))
+
+
+def count_mods(mods_dir):
+    try:
+        with os.scandir(mods_dir) as it:
+            return sum(1 for entry in it if entry.is_file() and entry.name.endswith(".jar"))
+    except OSError:
+        return 0
+
+
+def version_info(mc_dir, version_id):
+    # (java major version, whether the profile loads mods) read from the installed JSONs
+    try:
+        chain = installer.local_version_chain(version_id, mc_dir)
+    except (installer.InstallError, OSError, ValueError):
+        return DEFAULT_JAVA_MAJOR, False
+    java_major = DEFAULT_JAVA_MAJOR
+    for version_json in chain:
+        if "javaVersion" in version_json:
+            java_major = version_json["javaVersion"].get("majorVersion", DEFAULT_JAVA_MAJOR)
+            break
+    return java_major, len(chain) > 1
+
+
+def gc_flags(preset, heap_mb, java_major):
+    if preset == "zgc":
+        if java_major < 17:
+            # ZGC is not production-ready before 17; fall back rather than fail to start
+            return list(G1_FLAGS)
+        flags = ["-XX:+UseZGC"]
+        if 21 <= java_major < 23:
+            # Generational ZGC exists from 21 and is the only mode from 23
+            flags.append("-XX:+ZGenerational")
+        return flags
+    if preset == "aikar":
+        return AIKAR_FLAGS + (AIKAR_LARGE_HEAP if heap_mb >= 12 * 1024 else AIKAR_SMALL_HEAP)
+    if preset == "g1":
+        return list(G1_FLAGS)
+    return []
+
+
+def flag_key(arg):
+    # The setting a flag controls: -XX:+Foo, -XX:-Foo and -XX:Foo=1 all set Foo, -Dkey=a and
+    # -Dkey=b both set key
+    if arg.startswith("-XX:"):
+        return "-XX:" + arg[4:].lstrip("+-").split("=", 1)[0]
+    if arg.startswith("-D"):
+        return arg.split("=", 1)[0]
+    return arg
+
+
+def is_collector_flag(arg):
+    return arg.startswith("-XX:+Use") and arg.endswith("GC")
+
+
+def build_jvm_args(heap_mb, preset=DEFAULT_PRESET, java_major=DEFAULT_JAVA_MAJOR, extra=None):
+    # Heap flags, then the preset, then caller-supplied flags. The heap is always ours; any
+    # other setting the caller passes replaces the preset's, and a caller that picks its own
+    # collector replaces the whole preset. Each setting appears once, at its last value.
+    extra = [arg for arg in (extra or []) if not arg.startswith(("-Xmx", "-Xms"))]
+    preset_flags = gc_flags(preset, heap_mb, java_major)
+    if any(is_collector_flag(arg) for arg in extra):
+        preset_flags = []
+    last = {flag_key(arg): index for index, arg in enumerate(extra)}
+    unlock = flag_key(LOCK_EXPERIMENTAL)
+    if unlock in last and extra[last[unlock]] == LOCK_EXPERIMENTAL:
+        # A caller that locks experimental options takes the preset's experimental settings
+        # with it, or the JVM would refuse to start
+        preset_flags = [arg for arg in preset_flags if flag_key(arg) not in EXPERIMENTAL_FLAGS]
+    args = [f"-Xmx{heap_mb}M", f"-Xms{initial_heap_mb(heap_mb)}M"]
+    args.extend(arg for arg in preset_flags if flag_key(arg) not in last)
+    args.extend(arg for index, arg in enumerate(extra) if last[flag_key(arg)] == index)
+    # Unlocks go straight after the heap, ahead of every option that needs them
+    unlocks = [arg for arg in args if arg in UNLOCK_FLAGS]
+    return args[:2] + unlocks + [arg for arg in args[2:] if arg not in UNLOCK_FLAGS]
+
+
+def launch_arguments(mc_dir, version_id, heap_mb=None, preset=DEFAULT_PRESET, mods_dir=None, extra=None, total_mb=None, java_major=None):
+    # The JVM arguments for one launch. heap_mb None means size it from RAM and mod count;
+    # java_major is the runtime that will actually run it, if known.
+    required_major, modded = version_info(mc_dir, version_id)
+    java_major = java_major or required_major
+    total_mb = total_mb or system_memory_mb()
+    if heap_mb is None:
+        mod_count = count_mods(mods_dir or os.path.join(mc_dir, "mods")) if modded else 0
+        heap_mb = recommended_heap_mb(total_mb, mod_count)
+    heap_mb = max(MIN_HEAP_MB, min(int(heap_mb), max_heap_mb(total_mb)))
+    return build_jvm_args(heap_mb, preset, java_major, extra)
+
+
+def apply_to_options(options, mc_dir, version_id, heap_mb=None, preset=DEFAULT_PRESET, mods_dir=None, java_dir=None):
+    # Picks the Java runtime for the version and the JVM arguments to run it with.
+    # java_dir is where Mojang runtimes live when mc_dir is an instance rather than the shared install.
+    options = dict(options)
+    runtime = None
+    if "executablePath" not in options:
+        runtime = java.get_registry(java_dir or mc_dir).select(version_info(mc_dir, version_id)[0])
+        if runtime is not None:
+            options["executablePath"] = runtime.path
+    options["jvmArguments"] = launch_arguments(
+        mc_dir, version_id, heap_mb, preset, mods_dir, extra=options.get("jvmArguments"),
+        java_major=runtime.major if runtime is not None else None
+    )
+    return options
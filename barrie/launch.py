@@ -0,0 +1,190 @@
+import os
+import json
+import shutil
+import subprocess
+
+from barrie import command_cache, installer, java, net, store
+from barrie.errors import LaunchCancelled, LaunchError
+from barrie.paths import get_appdata_path
+
+OFFLINE_UUID = "12345678-1234-1234-1234-123456789abc"
+
+LEGACY_FORGE_BASE = "1.7.10"
+LEGACY_FORGE_VERSION = "1.7.10-Forge10.13.4.1614-1.7.10"
+LEGACY_FORGE_URL = "https://maven.minecraftforge.net/net/minecraftforge/forge/1.7.10-10.13.4.1614-1.7.10/forge-1.7.10-10.13.4.1614-1.7.10-installer.jar"
+
+# subprocess.CREATE_NO_WINDOW only exists on Windows
+NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+
+
+def offline_options(username, jvm_args=None):
+    options = {
+        "username": username,
+        "uuid": OFFLINE_UUID,
+        "token": "faketoken"
+    }
+    if jvm_args:
+        options["jvmArguments"] = list(jvm_args)
+    return options
+
+
+def _set_status(callback, text):
+    if callback and "setStatus" in callback:
+        callback["setStatus"](text)
+
+
+def install_version(mode, version_id, mc_dir, callback=None):
+    # Installs the requested edition and returns the version id to launch
+    mode = mode.lower()
+    if mode == "fabric":
+        import minecraft_launcher_lib
+        minecraft_launcher_lib.fabric.install_fabric(version_id, mc_dir, callback=callback)
+        return version_id
+    if mode == "forge":
+        return install_forge(version_id, mc_dir, callback=callback)
+    installer.install_version(version_id, mc_dir, callback=callback)
+    return version_id
+
+
+def install_forge(version_id, mc_dir, callback=None):
+    import minecraft_launcher_lib
+    forge_version = minecraft_launcher_lib.forge.find_forge_version(version_id)
+    if forge_version is None:
+        raise LaunchError(f"No Forge build is available for Minecraft {version_id}.")
+
+    if not minecraft_launcher_lib.forge.supports_automatic_install(forge_version):
+        if version_id == LEGACY_FORGE_BASE:
+            return install_legacy_forge(mc_dir, callback=callback)
+        ensure_launcher_profile_exists(mc_dir, version_id)
+        raise LaunchError(f"Automatic installation not supported for Forge {version_id}. Please install it manually from the Forge website.")
+
+    _set_status(callback, f"Installing Forge {forge_version}")
+    minecraft_launcher_lib.forge.install_forge_version(forge_version, mc_dir, callback=callback)
+    installed_id = minecraft_launcher_lib.forge.forge_to_installed_version(forge_version)
+    ensure_launcher_profile_exists(mc_dir, installed_id)
+    fix_forge_missing_jar(mc_dir, installed_id)
+    return installed_id
+
+
+def install_legacy_forge(mc_dir, callback=None):
+    installer_path = os.path.join(get_appdata_path(), "forge_installer_1.7.10.jar")
+    version_folder = os.path.join(mc_dir, "versions", LEGACY_FORGE_VERSION)
+
+    # Download installer
+    if not os.path.exists(installer_path):
+        _set_status(callback, "Downloading Forge 1.7.10 installer")
+        r = net.get(LEGACY_FORGE_URL, stream=True)
+        if r.status_code != 200:
+            raise LaunchError("Could not download Forge 1.7.10 installer.")
+        with open(installer_path, "wb") as f:
+            shutil.copyfileobj(r.raw, f)
+        print("Forge 1.7.10 installer downloaded.")
+
+    # The installer is happiest on Java 8; any Java found will do otherwise
+    registry = java.get_registry(mc_dir)
+    runtime = registry.select(8) or registry.select(1)
+    if runtime is None:
+        raise LaunchError("Java is required to install Forge 1.7.10. Please install Java 8.")
+
+    # Run installer
+    _set_status(callback, "Running Forge 1.7.10 installer")
+    subprocess.run([runtime.path, "-jar", installer_path, "--installClient"], cwd=mc_dir, creationflags=NO_WINDOW)
+
+    if not os.path.exists(version_folder):
+        raise LaunchError(f"Forge version folder '{LEGACY_FORGE_VERSION}' was not created.")
+
+    ensure_launcher_profile_exists(mc_dir, LEGACY_FORGE_VERSION)
+    fix_forge_missing_jar(mc_dir, LEGACY_FORGE_VERSION)
+    return LEGACY_FORGE_VERSION
+
+
+def fix_forge_missing_jar(mc_dir, version_id):
+    forge_dir = os.path.join(mc_dir, "versions", version_id)
+    forge_jar = os.path.join(forge_dir, f"{version_id}.jar")
+
+    if not os.path.exists(forge_jar):
+        # Extract the base version from Forge string (e.g., "1.7.10-Forge10.13.4.1614-1.7.10" → "1.7.10")
+        base_version = version_id.split('-')[0]
+        vanilla_jar = os.path.join(mc_dir, "versions", base_version, f"{base_version}.jar")
+
+        if not os.path.exists(vanilla_jar):
+            raise LaunchError(f"The base version {base_version} is not installed. Please install it first using your launcher.")
+        # The client jar is only ever replaced, never rewritten in place, so both names can be
+        # links to one store object
+        method = store.get_store(mc_dir).share(vanilla_jar, forge_jar, installer.cached_sha1(vanilla_jar))
+        print(f"Linked {base_version}.jar to Forge folder as {version_id}.jar ({method})")
+
+
+def ensure_launcher_profile_exists(mc_dir, version_id):
+    profile_path = os.path.join(mc_dir, "launcher_profiles.json")
+
+    # Try to load existing JSON if valid
+    if os.path.exists(profile_path):
+        try:
+            with open(profile_path, "r") as f:
+                json.load(f)
+            return  # File is valid, no need to change
+        except json.JSONDecodeError:
+            print("Corrupted launcher_profiles.json, regenerating...")
+
+    # Create a basic valid launcher_profiles.json
+    data = {
+        "profiles": {
+            "forge": {
+                "name": "Forge",
+                "lastVersionId": version_id,
+                "type": "custom"
+            }
+        },
+        "selectedProfile": "forge",
+        "clientToken": OFFLINE_UUID,
+        "launcherVersion": {
+            "name": "custom-launcher",
+            "format": 21
+        }
+    }
+
+    with open(profile_path, "w") as f:
+        json.dump(data, f, indent=4)
+    print("Created default launcher_profiles.json for Forge.")
+
+
+def build_command(version_id, mc_dir, options):
+    return command_cache.get_cache().get_command(version_id, mc_dir, options)
+
+
+def spawn(command, env=None, cwd=None, capture=False):
+    # capture pipes stdout and stderr together so a GameLog can stream them
+    if capture:
+        return subprocess.Popen(
+            command, env=env, cwd=cwd, creationflags=NO_WINDOW,
+            stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+        )
+    return subprocess.Popen(command, env=env, cwd=cwd, creationflags=NO_WINDOW)
+
+
+def fabric_env(mc_dir, fabric_version):
+    # Each Fabric profile loads mods from its own mods/<version> folder
+    env = os.environ.copy()
+    env["FABRIC_MODS_DIR"] = os.path.join(mc_dir, "mods", fabric_version)
+    return env
+
+
+def install_customskinloader(mc_dir, fabric_version):
+    mods_dir = os.path.join(mc_dir, "mods", fabric_version)
+    os.makedirs(mods_dir, exist_ok=True)
+
+    csl_path = os.path.join(mods_dir, "CustomSkinLoader.jar")
+    if not os.path.exists(csl_path):
+        try:
+            print("Downloading CustomSkinLoader...")
+            url = "https://github.com/xfl03/CustomSkinLoader/releases/latest/download/CustomSkinLoader_Fabric.jar"
+            r = net.get(url, stream=True)
+            if r.status_code == 200:
+                with open(csl_path, "wb") as f:
+                    shutil.copyfileobj(r.raw, f)
+                print("CustomSkinLoader installed.")
+            else:
+                print("Failed to download CustomSkinLoader.")
+        except Exception as e:
+            print(f"Error downloading CustomSkinLoader: {e}")
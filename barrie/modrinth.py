@@ -0,0 +1,408 @@
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from barrie import hashcache, installer, mods, net, store
+from barrie.paths import get_appdata_path
+
+API_URL = "https://api.modrinth.com/v2"
+CACHE_DIR = os.path.join(get_appdata_path(), "modrinth")
+# Version lists change with every mod release; project metadata hardly ever
+VERSIONS_TTL = 60 * 60
+PROJECT_TTL = 24 * 60 * 60
+CHUNK_SIZE = 64 * 1024
+# hashlib releases the GIL while digesting, so threads hash jars in parallel
+HASH_WORKERS = 8
+# Lookups and downloads in flight at once; below the shared session's connection pool
+FETCH_WORKERS = 16
+
+SODIUM = "AANobbMI"
+
+
+# An installed jar with a newer build on Modrinth: version is that build, file its primary file
+ModUpdate = namedtuple("ModUpdate", "path version file")
+# One entry of an install plan. required_by is the name of the build that pulled it in (None
+# when it was asked for), replaces the installed jar of the same project it supersedes.
+PlannedMod = namedtuple("PlannedMod", "project_id version file required_by replaces")
+
+
+class ModrinthError(Exception):
+    pass
+
+
+def sha512_of(path):
+    digest = hashlib.sha512()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _callback(callback, key, value):
+    if callback and key in callback:
+        callback[key](value)
+
+
+def _jars(mods_dir):
+    try:
+        return sorted(entry.path for entry in os.scandir(mods_dir) if entry.is_file() and entry.name.endswith(".jar"))
+    except OSError:
+        return []
+
+
+def hash_jars(paths, max_workers=HASH_WORKERS):
+    # {path: sha1}. Jars the hash cache knows at their current size and mtime are not read;
+    # the rest are streamed through sha1 on a thread pool.
+    cache = hashcache.get_cache()
+    hashes = {}
+    misses = []
+    for path in paths:
+        stat = os.stat(path)
+        digest = cache.get(path, stat)
+        if digest is None:
+            misses.append((path, stat))
+        else:
+            hashes[path] = digest
+    if misses:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(misses))) as pool:
+            for (path, stat), digest in zip(misses, pool.map(installer.sha1_of, [path for path, _ in misses])):
+                hashes[path] = digest
+                cache.put(path, stat, digest)
+        cache.flush()
+    return hashes
+
+
+def _write_json(path, data):
+    # Each writer gets its own temporary file, so lookups running in parallel on the same key
+    # never write into each other's file; the last replace wins
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def primary_file(version):
+    # The file Modrinth marks as primary, else the first jar
+    files = version.get("files", [])
+    for file in files:
+        if file.get("primary"):
+            return file
+    for file in files:
+        if file["filename"].endswith(".jar"):
+            return file
+    return None
+
+
+def _required(version):
+    # The required dependencies of a version that name a project or a version
+    return [
+        dependency for dependency in version.get("dependencies", [])
+        if dependency.get("dependency_type") == "required" and (dependency.get("project_id") or dependency.get("version_id"))
+    ]
+
+
+class ModrinthClient:
+    # API responses are cached on disk per request with a TTL, and served stale when the API
+    # cannot be reached. Downloaded files are kept by sha512 and linked into mods folders.
+    def __init__(self, base_url=API_URL, cache_dir=CACHE_DIR, versions_ttl=VERSIONS_TTL, project_ttl=PROJECT_TTL):
+        self.base_url = base_url.rstrip("/")
+        self.cache_dir = cache_dir
+        self.versions_ttl = versions_ttl
+        self.project_ttl = project_ttl
+        self._lock = threading.Lock()
+        self._memory = {}
+        self._indexes = {}
+
+    def _cache_path(self, path, params):
+        key = path + "?" + json.dumps(params or {}, sort_keys=True)
+        return os.path.join(self.cache_dir, "api", hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+
+    def _load_cached(self, cache_path):
+        try:
+            with open(cache_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def get_json(self, path, params=None, ttl=VERSIONS_TTL):
+        cache_path = self._cache_path(path, params)
+        # Fresh responses stay in memory too, so repeat lookups skip the disk and keep their identity
+        cached = self._memory.get(cache_path) or self._load_cached(cache_path)
+        if cached is not None and time.time() - cached.get("fetched_at", 0) < ttl:
+            self._memory[cache_path] = cached
+            return cached["data"]
+
+        headers = {}
+        if cached is not None and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        try:
+            response = net.get(self.base_url + path, params=params, headers=headers)
+        except Exception as e:
+            if cached is not None:
+                print(f"Modrinth unreachable, using cached {path}: {e}")
+                return cached["data"]
+            raise ModrinthError(f"Could not reach Modrinth: {e}")
+        if response.status_code == 304 and cached is not None:
+            data = cached["data"]
+        elif response.status_code == 404:
+            raise ModrinthError(f"Not found on Modrinth: {path}")
+        elif response.status_code != 200:
+            if cached is not None:
+                return cached["data"]
+            raise ModrinthError(f"Modrinth returned {response.status_code} for {path}")
+        else:
+            data = response.json()
+        cached = {"fetched_at": time.time(), "etag": response.headers.get("ETag"), "data": data}
+        _write_json(cache_path, cached)
+        self._memory[cache_path] = cached
+        return data
+
+    def project(self, project_id):
+        return self.get_json(f"/project/{project_id}", ttl=self.project_ttl)
+
+    def project_versions(self, project_id):
+        return self.get_json(f"/project/{project_id}/version", ttl=self.versions_ttl)
+
+    def version_index(self, project_id):
+        # {(game_version, loader): [versions, newest first]}, rebuilt only when the list changes
+        versions = self.project_versions(project_id)
+        with self._lock:
+            cached = self._indexes.get(project_id)
+            if cached is not None and cached[0] is versions:
+                return cached[1]
+        index = {}
+        for version in sorted(versions, key=lambda v: v.get("date_published", ""), reverse=True):
+            for game_version in version.get("game_versions", []):
+                for loader in version.get("loaders", []):
+                    index.setdefault((game_version, loader), []).append(version)
+        with self._lock:
+            self._indexes[project_id] = (versions, index)
+        return index
+
+    def find_version(self, project_id, game_version, loader):
+        # The newest release for this game version and loader, or the newest build of any kind.
+        # Builds for a loader this one can run (Fabric mods on Quilt) count too.
+        index = self.version_index(project_id)
+        candidates = {}
+        for accepted in mods.COMPATIBLE_LOADERS.get(loader, (loader,)):
+            for version in index.get((game_version, accepted), []):
+                candidates.setdefault(version["id"], version)
+        candidates = sorted(candidates.values(), key=lambda v: v.get("date_published", ""), reverse=True)
+        for version in candidates:
+            if version.get("version_type") == "release":
+                return version
+        return candidates[0] if candidates else None
+
+    def _blob_path(self, sha512):
+        return os.path.join(self.cache_dir, "files", sha512[:2], sha512)
+
+    def fetch_file(self, file):
+        # Downloads a version file into the local file cache, verified against its sha512
+        sha512 = file.get("hashes", {}).get("sha512")
+        if not sha512:
+            raise ModrinthError(f"Modrinth gave no sha512 for {file['filename']}")
+        blob = self._blob_path(sha512)
+        if os.path.exists(blob):
+            return blob
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        tmp_path = f"{blob}.{threading.get_ident()}.part"
+        digest = hashlib.sha512()
+        try:
+            # iter_content decodes any transfer encoding, unlike reading r.raw
+            with net.get(file["url"], stream=True) as r:
+                r.raise_for_status()
+                with open(tmp_path, "wb") as f:
+                    for chunk in r.iter_content(CHUNK_SIZE):
+                        digest.update(chunk)
+                        f.write(chunk)
+            if digest.hexdigest() != sha512:
+                raise ModrinthError(f"Checksum mismatch for {file['filename']}")
+            os.replace(tmp_path, blob)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return blob
+
+    def install_file(self, file, mods_dir):
+        # Puts the file into mods_dir, reusing a verified copy when there is one
+        dest = os.path.join(mods_dir, file["filename"])
+        sha512 = file.get("hashes", {}).get("sha512")
+        if os.path.exists(dest) and sha512 and sha512_of(dest) == sha512:
+            return dest
+        store.link_file(self.fetch_file(file), dest)
+        return dest
+
+    def check_updates(self, mods_dir, game_version, loader):
+        # Returns (updates, unknown): a ModUpdate for every jar with a newer build for this game
+        # version and loader, and the jars Modrinth has no such build for. All jars are looked
+        # up by hash in a single request, so this is never cached.
+        paths = _jars(mods_dir)
+        if not paths:
+            return [], []
+        hashes = hash_jars(paths)
+        # Same loaders as find_version, so a Fabric build counts as an update on Quilt
+        loaders = list(mods.COMPATIBLE_LOADERS.get(loader, (loader,)))
+        latest = self._post_hashes("/version_files/update", hashes, loaders=loaders, game_versions=[game_version])
+
+        updates = []
+        unknown = []
+        for path in paths:
+            version = latest.get(hashes[path])
+            if version is None:
+                unknown.append(path)
+                continue
+            # Up to date when the newest build contains this very jar
+            if any(file.get("hashes", {}).get("sha1") == hashes[path] for file in version.get("files", [])):
+                continue
+            file = primary_file(version)
+            if file is not None:
+                updates.append(ModUpdate(path, version, file))
+        return updates, unknown
+
+    def _post_hashes(self, path, hashes, **filters):
+        body = dict(filters, hashes=sorted(set(hashes.values())), algorithm="sha1")
+        try:
+            response = net.post(self.base_url + path, json=body)
+        except Exception as e:
+            raise ModrinthError(f"Could not reach Modrinth: {e}")
+        if response.status_code != 200:
+            raise ModrinthError(f"Modrinth returned {response.status_code} for {path}")
+        return response.json()
+
+    def identify(self, mods_dir):
+        # {project id: (jar path, version id)} for the jars in mods_dir that Modrinth knows, in
+        # one request
+        paths = _jars(mods_dir)
+        if not paths:
+            return {}
+        hashes = hash_jars(paths)
+        versions = self._post_hashes("/version_files", hashes)
+        return {
+            versions[hashes[path]]["project_id"]: (path, versions[hashes[path]]["id"])
+            for path in paths if hashes[path] in versions
+        }
+
+    def _pick(self, reference, pinned_id, game_version, loader, required_by):
+        # The build a plan entry resolves to: the exact one a dependency pins, else the best match
+        if pinned_id:
+            # Versions never change once published
+            return self.get_json(f"/version/{pinned_id}", ttl=self.project_ttl)
+        try:
+            version = self.find_version(reference, game_version, loader)
+            if version is None:
+                title = self.project(reference).get("title", reference)
+                raise ModrinthError(f"No {loader.title()} build of {title} for Minecraft {game_version}")
+        except ModrinthError as e:
+            if required_by:
+                raise ModrinthError(f"{e} (required by {required_by})")
+            raise
+        return version
+
+    def plan(self, projects, game_version, loader, mods_dir=None, max_workers=FETCH_WORKERS):
+        # Resolves project ids or slugs and their required dependencies into a list of
+        # PlannedMod. Each round of dependencies is looked up in parallel, so the number of
+        # round trips follows the depth of the dependency tree, not the number of mods.
+        # Dependencies already installed in mods_dir are left alone unless a dependency pins
+        # another version of them.
+        installed = self.identify(mods_dir) if mods_dir else {}
+        chosen = {}
+        pinned = set()
+        # (reference, pinned version id) -> the project id it resolved to
+        resolved = {}
+        wave = [(reference, None, None) for reference in dict.fromkeys(projects)]
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            while wave:
+                picked = pool.map(lambda item: self._pick(item[0], item[1], game_version, loader, item[2]), wave)
+                next_wave = []
+                for (reference, pinned_id, required_by), version in zip(wave, picked):
+                    project_id = version["project_id"]
+                    resolved[(reference, pinned_id)] = project_id
+                    existing = chosen.get(project_id)
+                    if existing is not None:
+                        if existing.version["id"] == version["id"] or not pinned_id:
+                            continue
+                        if project_id in pinned:
+                            raise ModrinthError(
+                                f"{existing.required_by or existing.version.get('name')} and {required_by} need different versions of {project_id}"
+                            )
+                    elif required_by is not None and project_id in installed and pinned_id in (None, installed[project_id][1]):
+                        continue
+                    file = primary_file(version)
+                    if file is None:
+                        raise ModrinthError(f"{version.get('name', project_id)} has no jar to download")
+                    replaces = installed[project_id][0] if project_id in installed else None
+                    chosen[project_id] = PlannedMod(project_id, version, file, required_by, replaces)
+                    if pinned_id:
+                        pinned.add(project_id)
+                    for dependency in _required(version):
+                        next_wave.append((dependency.get("project_id"), dependency.get("version_id"), version.get("name", project_id)))
+                # A dependency several mods share is looked up once per round
+                unique = {}
+                for item in next_wave:
+                    unique.setdefault(item[:2], item)
+                wave = list(unique.values())
+
+        # A pinned version can replace one chosen earlier; what only that earlier version needed
+        # is dropped by keeping just what the requested projects still reach
+        roots = [resolved[(reference, None)] for reference in dict.fromkeys(projects)]
+        kept = {project_id: chosen[project_id]._replace(required_by=None) for project_id in roots}
+        queue = list(kept.values())
+        while queue:
+            mod = queue.pop(0)
+            for dependency in _required(mod.version):
+                project_id = resolved.get((dependency.get("project_id"), dependency.get("version_id")))
+                if project_id in chosen and project_id not in kept:
+                    kept[project_id] = chosen[project_id]._replace(required_by=mod.version.get("name", mod.project_id))
+                    queue.append(kept[project_id])
+
+        for mod in kept.values():
+            for dependency in mod.version.get("dependencies", []):
+                if dependency.get("dependency_type") == "incompatible" and (dependency.get("project_id") in kept or dependency.get("project_id") in installed):
+                    raise ModrinthError(f"{mod.version.get('name', mod.project_id)} is incompatible with {dependency['project_id']}")
+        return [kept[project_id] for project_id in chosen if project_id in kept]
+
+    def install_plan(self, plan, mods_dir, callback=None, max_workers=FETCH_WORKERS):
+        # Downloads every planned jar at once into mods_dir and drops the jars they replace.
+        # Returns the installed paths in plan order.
+        os.makedirs(mods_dir, exist_ok=True)
+        _callback(callback, "setStatus", f"Installing {len(plan)} mods")
+        _callback(callback, "setMax", len(plan))
+        paths = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(self.install_file, mod.file, mods_dir): mod for mod in plan}
+            for done, future in enumerate(as_completed(futures), 1):
+                mod = futures[future]
+                paths[mod.project_id] = future.result()
+                if mod.replaces and os.path.abspath(mod.replaces) != os.path.abspath(paths[mod.project_id]) and os.path.exists(mod.replaces):
+                    os.remove(mod.replaces)
+                _callback(callback, "setProgress", done)
+        return [paths[mod.project_id] for mod in plan]
+
+    def apply_update(self, update):
+        # Installs the new build next to the old jar, then removes the old one
+        mods_dir = os.path.dirname(update.path)
+        dest = self.install_file(update.file, mods_dir)
+        if os.path.abspath(dest) != os.path.abspath(update.path) and os.path.exists(update.path):
+            os.remove(update.path)
+        return dest
+
+
+_client = None
+
+
+def get_client():
+    global _client
+    if _client is None:
+        _client = ModrinthClient()
+    return _client
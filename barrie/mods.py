@@ -0,0 +1,396 @@
+import os
+import re
+import json
+import zipfile
+import threading
+from functools import lru_cache
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from barrie.paths import get_appdata_path
+
+MOD_INDEX_FILE = os.path.join(get_appdata_path(), "mod_index.json")
+INDEX_FORMAT = 1
+SCAN_WORKERS = 8
+
+LOADERS = ("fabric", "quilt", "forge", "neoforge")
+
+ModInfo = namedtuple("ModInfo", "path file_name id name version loader minecraft depends provides")
+
+# Dependencies every mod of a loader has satisfied by the game itself
+PLATFORM_IDS = {"minecraft", "java", "fabricloader", "quilt_loader", "forge", "neoforge", "fml", "mcp"}
+# Loaders that run another loader's mods
+COMPATIBLE_LOADERS = {"quilt": ("quilt", "fabric")}
+
+
+def _read_json(archive, name):
+    # Mod authors leave raw newlines/tabs inside strings; strict=False accepts them like the loaders do
+    return json.loads(archive.read(name).decode("utf-8", errors="replace"), strict=False)
+
+
+def _parse_fabric(archive, data):
+    depends = {}
+    for mod_id, spec in (data.get("depends") or {}).items():
+        depends[mod_id] = " || ".join(spec) if isinstance(spec, list) else str(spec)
+    provides = list(data.get("provides") or [])
+    # Jar-in-jar modules (Fabric API ships as dozens of them) satisfy dependencies too
+    for nested in data.get("jars") or []:
+        path = nested.get("file") if isinstance(nested, dict) else None
+        if not path or path not in archive.NameToInfo:
+            continue
+        try:
+            # Streamed from the outer jar, so only the nested jar's directory and its
+            # fabric.mod.json are read, not the whole module
+            with archive.open(path) as member, zipfile.ZipFile(member) as inner:
+                if "fabric.mod.json" in inner.NameToInfo:
+                    inner_data = _read_json(inner, "fabric.mod.json")
+                    provides.append(inner_data.get("id"))
+                    provides.extend(inner_data.get("provides") or [])
+        except (zipfile.BadZipFile, ValueError, KeyError):
+            continue
+    return {
+        "id": data.get("id"),
+        "name": data.get("name") or data.get("id"),
+        "version": str(data.get("version", "")),
+        "loader": "fabric",
+        "minecraft": depends.get("minecraft"),
+        "depends": depends,
+        "provides": [mod_id for mod_id in provides if mod_id]
+    }
+
+
+def _parse_quilt(data):
+    loader = data.get("quilt_loader") or {}
+    depends = {}
+    for dependency in loader.get("depends") or []:
+        if isinstance(dependency, str):
+            depends[dependency] = "*"
+        elif isinstance(dependency, dict) and dependency.get("id") and not dependency.get("optional"):
+            versions = dependency.get("versions", "*")
+            depends[dependency["id"]] = " || ".join(versions) if isinstance(versions, list) else str(versions)
+    provides = [p if isinstance(p, str) else p.get("id") for p in loader.get("provides") or []]
+    return {
+        "id": loader.get("id"),
+        "name": (loader.get("metadata") or {}).get("name") or loader.get("id"),
+        "version": str(loader.get("version", "")),
+        "loader": "quilt",
+        "minecraft": depends.get("minecraft"),
+        "depends": depends,
+        "provides": [mod_id for mod_id in provides if mod_id]
+    }
+
+
+def _toml_value(text):
+    text = text.strip()
+    if text[:3] in ('"""', "'''"):
+        return text[3:].split(text[:3], 1)[0]
+    if text[:1] in ('"', "'"):
+        return text[1:].split(text[0], 1)[0]
+    text = text.split("#", 1)[0].strip()
+    if text in ("true", "false"):
+        return text == "true"
+    return text
+
+
+def parse_toml_subset(text):
+    # Just enough TOML for mods.toml when tomllib (3.11+) is missing: top-level keys,
+    # [[mods]] and [[dependencies.<id>]] tables of plain key = value pairs, and multi-line
+    # strings (descriptions), whose lines are never read as keys
+    result = {}
+    current = result
+    lines = iter(text.splitlines())
+    for raw in lines:
+        line = raw.strip()
+        if not line or line.startswith("#"):
+            continue
+        table = re.match(r"^\[\[\s*([\w.\-\"]+)\s*\]\]", line)
+        if table:
+            path = [part.strip('"') for part in table.group(1).split(".")]
+            parent = result
+            for part in path[:-1]:
+                parent = parent.setdefault(part, {})
+            current = {}
+            parent.setdefault(path[-1], []).append(current)
+            continue
+        if line.startswith("["):
+            current = {}
+            continue
+        key, sep, value = line.partition("=")
+        if sep:
+            value = value.strip()
+            quote = value[:3]
+            if quote in ('"""', "'''") and quote not in value[3:]:
+                # Runs until the closing quotes on a later line
+                parts = [value[3:]]
+                for raw in lines:
+                    if quote in raw:
+                        parts.append(raw.split(quote, 1)[0])
+                        break
+                    parts.append(raw)
+                # A newline right after the opening quotes is not part of the string
+                value = quote + "\n".join(parts[1:] if not parts[0] else parts) + quote
+            current[key.strip().strip('"')] = _toml_value(value)
+    return result
+
+
+def _load_toml(text):
+    try:
+        import tomllib
+    except ImportError:
+        return parse_toml_subset(text)
+    try:
+        return tomllib.loads(text)
+    except tomllib.TOMLDecodeError:
+        # Plenty of published mods.toml files are not valid TOML; the loaders are lenient too
+        return parse_toml_subset(text)
+
+
+def _manifest_version(archive):
+    # "${file.jarVersion}" in mods.toml means the jar manifest's Implementation-Version
+    if "META-INF/MANIFEST.MF" not in archive.NameToInfo:
+        return None
+    for line in archive.read("META-INF/MANIFEST.MF").decode("utf-8", errors="replace").splitlines():
+        if line.startswith("Implementation-Version:"):
+            return line.split(":", 1)[1].strip()
+    return None
+
+
+def _parse_mods_toml(archive, name, loader):
+    data = _load_toml(archive.read(name).decode("utf-8", errors="replace"))
+    mods = data.get("mods") or [{}]
+    mod = mods[0]
+    mod_id = mod.get("modId")
+    version = str(mod.get("version", ""))
+    if "${" in version:
+        version = _manifest_version(archive) or version
+    depends = {}
+    for dependency in (data.get("dependencies") or {}).get(mod_id, []):
+        # Forge uses mandatory, NeoForge type = "required"
+        required = dependency.get("mandatory", dependency.get("type", "required") == "required")
+        if dependency.get("modId") and required:
+            depends[dependency["modId"]] = str(dependency.get("versionRange", "*"))
+    return {
+        "id": mod_id,
+        "name": mod.get("displayName") or mod_id,
+        "version": version,
+        "loader": loader,
+        "minecraft": depends.get("minecraft"),
+        "depends": depends,
+        "provides": [m.get("modId") for m in mods[1:] if m.get("modId")]
+    }
+
+
+def read_mod(path):
+    # Reads the metadata from the jar's central directory and the one member it needs;
+    # nothing is extracted to disk. Returns None for jars with no recognised metadata.
+    with zipfile.ZipFile(path) as archive:
+        names = archive.NameToInfo
+        if "quilt.mod.json" in names:
+            return _parse_quilt(_read_json(archive, "quilt.mod.json"))
+        if "fabric.mod.json" in names:
+            return _parse_fabric(archive, _read_json(archive, "fabric.mod.json"))
+        if "META-INF/neoforge.mods.toml" in names:
+            return _parse_mods_toml(archive, "META-INF/neoforge.mods.toml", "neoforge")
+        if "META-INF/mods.toml" in names:
+            return _parse_mods_toml(archive, "META-INF/mods.toml", "forge")
+    return None
+
+
+def _to_mod(path, entry):
+    info = entry.get("info") or {}
+    return ModInfo(
+        path, os.path.basename(path), info.get("id"), info.get("name") or os.path.basename(path),
+        info.get("version", ""), info.get("loader"), info.get("minecraft"),
+        info.get("depends") or {}, info.get("provides") or []
+    )
+
+
+def _parse_entry(path, size, mtime_ns):
+    entry = {"size": size, "mtime_ns": mtime_ns, "info": None}
+    try:
+        entry["info"] = read_mod(path)
+    except (OSError, zipfile.BadZipFile, ValueError, KeyError, AttributeError, TypeError) as e:
+        entry["error"] = str(e)
+    return entry
+
+
+class ModIndex:
+    # Metadata for every jar in a mods folder. Each jar is parsed once and reused while its
+    # (path, size, mtime) holds; the parsed entries persist across runs in the appdata cache.
+    def __init__(self, cache_path=MOD_INDEX_FILE):
+        self.cache_path = cache_path
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._load_cache()
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, "r") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return
+        if cache.get("format") == INDEX_FORMAT:
+            self._entries = cache.get("entries", {})
+
+    def _save_cache(self):
+        cache = {"format": INDEX_FORMAT, "entries": self._entries}
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = self.cache_path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(cache, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"Could not write mod index cache: {e}")
+
+    def scan(self, mods_dir):
+        # Returns a ModInfo per jar directly inside mods_dir (disabled ".jar.disabled" files excluded)
+        with self._lock:
+            try:
+                with os.scandir(mods_dir) as it:
+                    jars = [(entry.path, entry.stat()) for entry in it if entry.is_file() and entry.name.endswith(".jar")]
+            except OSError:
+                jars = []
+
+            found = {}
+            stale = []
+            for path, stat in jars:
+                key = os.path.abspath(path)
+                cached = self._entries.get(key)
+                if cached is not None and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+                    found[key] = cached
+                else:
+                    stale.append((key, stat.st_size, stat.st_mtime_ns))
+
+            if len(stale) > 1:
+                # Only the first scan of a big pack gets here; zip reads release the GIL
+                with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as pool:
+                    parsed = list(pool.map(lambda args: _parse_entry(*args), stale))
+            else:
+                parsed = [_parse_entry(*args) for args in stale]
+            for (key, _, _), entry in zip(stale, parsed):
+                found[key] = entry
+
+            folder = os.path.abspath(mods_dir)
+            removed = [key for key in self._entries if os.path.dirname(key) == folder and key not in found]
+            for key in removed:
+                del self._entries[key]
+            self._entries.update(found)
+            if stale or removed:
+                self._save_cache()
+            return sorted((_to_mod(key, entry) for key, entry in found.items()), key=lambda mod: mod.name.lower())
+
+
+@lru_cache(maxsize=4096)
+def _version_key(version):
+    # "1.20.1" -> ((1, 20, 1), 1, ()). Anything after a "-" is a pre-release and sorts before the
+    # release, even when empty: Fabric's "1.20-" is the lowest 1.20 pre-release. Pre-release
+    # identifiers compare as in semver, numbers before words.
+    core, dash, pre = re.split(r"\+", version, 1)[0].partition("-")
+    numbers = tuple(int(part) if part.isdigit() else 0 for part in core.split("."))
+    pre_key = tuple((0, int(part), "") if part.isdigit() else (1, 0, part) for part in pre.split(".")) if pre else ()
+    return numbers, 0 if dash else 1, pre_key
+
+
+def _compare(a, b):
+    ka, kb = _version_key(a), _version_key(b)
+    width = max(len(ka[0]), len(kb[0]))
+    ka = (ka[0] + (0,) * (width - len(ka[0])),) + ka[1:]
+    kb = (kb[0] + (0,) * (width - len(kb[0])),) + kb[1:]
+    return (ka > kb) - (ka < kb)
+
+
+def _matches_maven(spec, version):
+    # Forge ranges: "[1.20,1.21)", "[1.20.1]", "[47,)", several ranges joined with commas
+    for low_bracket, inner, high_bracket in re.findall(r"([\[(])([^\[\]()]*)([\])])", spec):
+        if "," not in inner:
+            if _compare(version, inner.strip()) == 0:
+                return True
+            continue
+        low, high = (part.strip() for part in inner.split(",", 1))
+        if low and (_compare(version, low) < 0 or (low_bracket == "(" and _compare(version, low) == 0)):
+            continue
+        if high and (_compare(version, high) > 0 or (high_bracket == ")" and _compare(version, high) == 0)):
+            continue
+        return True
+    return False
+
+
+def _matches_predicate(predicate, version):
+    predicate = predicate.strip()
+    if predicate in ("", "*"):
+        return True
+    match = re.match(r"^(>=|<=|>|<|=|~|\^)?\s*(.+)$", predicate)
+    op, target = match.group(1) or "", match.group(2)
+    if target.endswith((".x", ".X", ".*")):
+        prefix = target[:-2]
+        return version == prefix or version.startswith(prefix + ".")
+    cmp = _compare(version, target)
+    if op == ">=":
+        return cmp >= 0
+    if op == "<=":
+        return cmp <= 0
+    if op == ">":
+        return cmp > 0
+    if op == "<":
+        return cmp < 0
+    if op in ("~", "^"):
+        # ~1.20.1 keeps the minor, ^1.20.1 the major
+        keep = 2 if op == "~" else 1
+        target_parts = _version_key(target)[0]
+        return cmp >= 0 and _version_key(version)[0][:keep] == target_parts[:keep]
+    return cmp == 0
+
+
+def version_matches(spec, version):
+    # Fabric/Quilt predicates (">=1.20 <1.21", "1.20.x", "~1.20", "a || b") and Forge Maven ranges
+    if not spec or not version:
+        return True
+    spec = spec.strip()
+    if spec[:1] in ("[", "("):
+        return _matches_maven(spec, version)
+    for alternative in spec.split("||"):
+        if all(_matches_predicate(predicate, version) for predicate in alternative.split()):
+            return True
+    return False
+
+
+def check(mods, minecraft_version=None, loader=None):
+    # Problems that would stop this set of mods from loading together, as {path: [messages]}
+    problems = {}
+    available = {}
+    for mod in mods:
+        if mod.id:
+            available.setdefault(mod.id, mod.version)
+        for provided in mod.provides:
+            available.setdefault(provided, mod.version)
+
+    accepted = COMPATIBLE_LOADERS.get(loader, (loader,)) if loader else None
+    for mod in mods:
+        messages = []
+        if mod.id is None:
+            messages.append("No mod metadata found")
+        elif accepted and mod.loader not in accepted:
+            messages.append(f"{mod.loader.title()} mod, not for {loader.title()}")
+        if mod.minecraft and minecraft_version and not version_matches(mod.minecraft, minecraft_version):
+            messages.append(f"Needs Minecraft {mod.minecraft}")
+        for dependency, spec in mod.depends.items():
+            if dependency in PLATFORM_IDS:
+                continue
+            if dependency not in available:
+                messages.append(f"Missing {dependency}")
+            elif not version_matches(spec, available[dependency]):
+                messages.append(f"Needs {dependency} {spec}")
+        if messages:
+            problems[mod.path] = messages
+    return problems
+
+
+_index = None
+
+
+def get_index():
+    global _index
+    if _index is None:
+        _index = ModIndex()
+    return _index
@@ -0,0 +1,55 @@
+import threading
+
+# (connect, read) seconds, used whenever a caller does not pass its own timeout
+DEFAULT_TIMEOUT = (5, 15)
+# Per-host keep-alive pool; large enough for the installer's download workers
+POOL_SIZE = 32
+USER_AGENT = "BarrieLauncher/3.6"
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _build_session():
+    # requests is imported here so that importing barrie.net costs nothing at startup
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    class LauncherSession(requests.Session):
+        def request(self, method, url, **kwargs):
+            kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+            return super().request(method, url, **kwargs)
+
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    s = LauncherSession()
+    adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    s.headers["User-Agent"] = USER_AGENT
+    return s
+
+
+def session():
+    # One process-wide session so repeat requests to a host reuse its connection
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def get(url, **kwargs):
+    return session().get(url, **kwargs)
+
+
+def post(url, **kwargs):
+    return session().post(url, **kwargs)
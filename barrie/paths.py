@@ -0,0 +1,22 @@
+import os
+import sys
+import platform
+
+
+def get_appdata_path():
+    # APPDATA only exists on Windows; fall back to the home directory elsewhere
+    return os.path.join(os.getenv("APPDATA") or os.path.expanduser("~"), "BarrieLauncher")
+
+
+def get_minecraft_directory():
+    # Same locations as minecraft_launcher_lib.utils.get_minecraft_directory, without importing it
+    if platform.system() == "Windows":
+        return os.path.join(os.getenv("APPDATA", os.path.join(os.path.expanduser("~"), "AppData", "Roaming")), ".minecraft")
+    if platform.system() == "Darwin":
+        return os.path.join(os.path.expanduser("~"), "Library", "Application Support", "minecraft")
+    return os.path.join(os.path.expanduser("~"), ".minecraft")
+
+
+def resource_path(relative_path):
+    base_path = getattr(sys, '_MEIPASS', os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return os.path.join(base_path, relative_path)
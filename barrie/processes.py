@@ -0,0 +1,207 @@
+import time
+import itertools
+import subprocess
+import threading
+from collections import deque
+
+from barrie import tracing
+from barrie.gamelog import GameLog
+
+SAMPLE_INTERVAL = 2.0
+# Milestones that also mark a launch trace, under the trace's own names
+TRACE_MILESTONES = {"lwjgl": "window_visible", "sound_engine": "main_menu", "crash": "crash"}
+# Ten minutes of history at the default interval
+HISTORY_SIZE = 300
+KILL_TIMEOUT = 10
+
+
+class GameInstance:
+    # One spawned game process and the resource samples taken from it
+    def __init__(self, instance_id, process, version_id, username=None, on_exit=None, trace=None):
+        self.id = instance_id
+        self.process = process
+        self.pid = process.pid
+        self.version_id = version_id
+        self.username = username
+        self.on_exit = on_exit
+        self.trace = trace
+        self.started_at = time.time()
+        self.exit_code = None
+        self.ended_at = None
+        self.samples = deque(maxlen=HISTORY_SIZE)
+        self.log = None
+        self._ps = None
+
+    @property
+    def running(self):
+        return self.exit_code is None
+
+    @property
+    def uptime(self):
+        return (self.ended_at or time.time()) - self.started_at
+
+    @property
+    def latest(self):
+        return self.samples[-1] if self.samples else None
+
+    def sample(self):
+        import psutil
+        try:
+            if self._ps is None:
+                self._ps = psutil.Process(self.pid)
+                # The first cpu_percent call only sets the baseline
+                self._ps.cpu_percent(None)
+            with self._ps.oneshot():
+                stats = {
+                    "time": time.time(),
+                    "rss": self._ps.memory_info().rss,
+                    "cpu_percent": self._ps.cpu_percent(None),
+                    "threads": self._ps.num_threads(),
+                    "uptime": self.uptime
+                }
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            return None
+        self.samples.append(stats)
+        return stats
+
+
+class ProcessManager:
+    # Tracks every running game. A waiter thread per instance captures the exit code;
+    # a single sampler thread records RSS, CPU%, threads and uptime while any are running.
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._instances = {}
+        self._ids = itertools.count(1)
+        self._listeners = []
+        self._sampler = None
+        self._wake = threading.Event()
+
+    def subscribe(self, listener):
+        # listener(event, instance) with event "started", "sample", "milestone" or "exited";
+        # it runs on the manager's threads, not the caller's
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, event, instance):
+        for listener in list(self._listeners):
+            try:
+                listener(event, instance)
+            except Exception as e:
+                print(f"Process listener failed: {e}")
+
+    def register(self, process, version_id, username=None, on_exit=None, trace=None):
+        # A trace handed over here is finished when the game exits
+        with self._lock:
+            instance = GameInstance(next(self._ids), process, version_id, username, on_exit, trace)
+            self._instances[instance.id] = instance
+        if process.stdout is not None:
+            instance.log = GameLog(process.stdout, instance.started_at)
+            instance.log.subscribe(lambda event, value: self._on_log_event(instance, event, value))
+            instance.log.start()
+        # Not a daemon, so an exit hook (log sync) still runs if the launcher closes first
+        threading.Thread(target=self._wait, args=(instance,), name=f"game-{instance.pid}").start()
+        self._ensure_sampler()
+        self._notify("started", instance)
+        return instance
+
+    def _on_log_event(self, instance, event, value):
+        if event == "line":
+            if instance.trace is not None and instance.log.total == 1:
+                instance.trace.event("first_log_line")
+            return
+        name, elapsed = value
+        if name in TRACE_MILESTONES:
+            tracing.event(instance.trace, TRACE_MILESTONES[name], since_spawn_ms=round(elapsed * 1000))
+        print(f"Minecraft {instance.version_id} (pid {instance.pid}): {name} after {elapsed:.1f}s")
+        self._notify("milestone", instance)
+
+    def _wait(self, instance):
+        exit_code = instance.process.wait()
+        if instance.log is not None:
+            # Let the reader drain what the game wrote just before exiting
+            instance.log.join(5)
+        instance.exit_code = exit_code
+        instance.ended_at = time.time()
+        print(f"Minecraft {instance.version_id} (pid {instance.pid}) exited with code {exit_code}")
+        if instance.on_exit is not None:
+            try:
+                instance.on_exit(instance)
+            except Exception as e:
+                print(f"Exit hook for {instance.version_id} failed: {e}")
+        if instance.trace is not None:
+            instance.trace.event("exit", exit_code=exit_code)
+            instance.trace.finish("ok" if exit_code == 0 else "error", summary=tracing.summary_enabled(), exit_code=exit_code)
+        self._notify("exited", instance)
+
+    def _ensure_sampler(self):
+        with self._lock:
+            if self._sampler is not None and self._sampler.is_alive():
+                self._wake.set()
+                return
+            self._sampler = threading.Thread(target=self._sample_loop, name="game-sampler", daemon=True)
+            self._sampler.start()
+
+    def _sample_loop(self):
+        while True:
+            with self._lock:
+                running = [instance for instance in self._instances.values() if instance.running]
+                if not running:
+                    self._sampler = None
+                    return
+            for instance in running:
+                if instance.sample() is not None:
+                    self._notify("sample", instance)
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def instances(self):
+        with self._lock:
+            return list(self._instances.values())
+
+    def running(self):
+        return [instance for instance in self.instances() if instance.running]
+
+    def get(self, instance_id):
+        with self._lock:
+            return self._instances.get(instance_id)
+
+    def forget(self, instance_id):
+        # Drops a finished instance from the list; running ones are kept
+        with self._lock:
+            instance = self._instances.get(instance_id)
+            if instance is not None and not instance.running:
+                del self._instances[instance_id]
+
+    def kill(self, instance_id, timeout=KILL_TIMEOUT):
+        # Asks the game to close, then kills it if it is still there after timeout seconds.
+        # Runs on its own thread so the caller never waits on the game.
+        instance = self.get(instance_id)
+        if instance is None or not instance.running:
+            return None
+
+        def stop():
+            process = instance.process
+            process.terminate()
+            try:
+                process.wait(timeout)
+            except subprocess.TimeoutExpired:
+                print(f"Minecraft {instance.version_id} (pid {instance.pid}) did not exit, killing it")
+                process.kill()
+
+        thread = threading.Thread(target=stop, name=f"kill-{instance.pid}", daemon=True)
+        thread.start()
+        return thread
+
+
+_manager = None
+
+
+def get_manager():
+    global _manager
+    if _manager is None:
+        _manager = ProcessManager()
+    return _manager
@@ -0,0 +1,151 @@
+import os
+import json
+import atexit
+import threading
+
+from barrie import versions
+from barrie.paths import get_appdata_path
+
+SETTINGS_FILE = os.path.join(get_appdata_path(), "settings.json")
+SCHEMA_VERSION = 1
+DEBOUNCE_SECONDS = 0.5
+
+DEFAULTS = {
+    "username": "",
+    "version_id": "",
+    "ram_mb": 2048,
+    "ram_auto": False,
+    "gc_preset": "g1",
+    "trace_summary": False,
+    "separate_instances": False,
+    "version_cache_ttl": versions.DEFAULT_TTL
+}
+
+
+def _migrate(data):
+    # Files written before the schema field existed only had username/version_id/ram_mb
+    if data.get("schema", 0) < 1:
+        data["schema"] = 1
+    return data
+
+
+class Settings:
+    # Loaded once per process. Writes are debounced and atomic (temp file + rename),
+    # and keys this version does not know about are carried through untouched.
+    def __init__(self, path=SETTINGS_FILE, debounce=DEBOUNCE_SECONDS):
+        self.path = path
+        self.debounce = debounce
+        self._lock = threading.RLock()
+        self._timer = None
+        self._data = self._load()
+
+    def _load(self):
+        data = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r") as f:
+                    data = json.load(f)
+            except Exception as e:
+                print(f"Ignoring unreadable settings file: {e}")
+        if not isinstance(data, dict):
+            data = {}
+        return _migrate(data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._data:
+                return self._data[key]
+        if default is not None:
+            return default
+        return DEFAULTS.get(key)
+
+    def set(self, key, value):
+        self.update(**{key: value})
+
+    def update(self, **values):
+        with self._lock:
+            changed = False
+            for key, value in values.items():
+                if self._data.get(key) != value:
+                    self._data[key] = value
+                    changed = True
+            if changed:
+                self._schedule_save()
+
+    def _schedule_save(self):
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.debounce, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            data = dict(self._data, schema=SCHEMA_VERSION)
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+    def flush_if_pending(self):
+        if self._timer is not None:
+            self.flush()
+
+    @property
+    def username(self):
+        return str(self.get("username") or "")
+
+    @username.setter
+    def username(self, value):
+        self.set("username", value)
+
+    @property
+    def version_id(self):
+        return str(self.get("version_id") or "")
+
+    @version_id.setter
+    def version_id(self, value):
+        self.set("version_id", value)
+
+    @property
+    def ram_mb(self):
+        try:
+            return int(self.get("ram_mb"))
+        except (TypeError, ValueError):
+            return DEFAULTS["ram_mb"]
+
+    @ram_mb.setter
+    def ram_mb(self, value):
+        self.set("ram_mb", int(value))
+
+    @property
+    def heap_mb(self):
+        # None asks the JVM engine to size the heap itself
+        return None if self.get("ram_auto") else self.ram_mb
+
+    @property
+    def gc_preset(self):
+        return str(self.get("gc_preset") or DEFAULTS["gc_preset"])
+
+    @property
+    def version_cache_ttl(self):
+        try:
+            return int(self.get("version_cache_ttl"))
+        except (TypeError, ValueError):
+            return DEFAULTS["version_cache_ttl"]
+
+
+_settings = None
+
+
+def get_settings():
+    global _settings
+    if _settings is None:
+        _settings = Settings()
+        # Anything still inside the debounce window is written on the way out
+        atexit.register(_settings.flush_if_pending)
+    return _settings
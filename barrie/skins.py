@@ -0,0 +1,173 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+
+from barrie import net, tracing
+from barrie.paths import get_appdata_path
+
+SKIN_URL = "https://crafatar.com/skins/{}"
+SKIN_CACHE_DIR = os.path.join(get_appdata_path(), "skins")
+DEFAULT_TTL = 24 * 60 * 60
+
+
+def skin_install_dir(mc_dir):
+    return os.path.join(mc_dir, "CustomSkinLoader", "Skins")
+
+
+def normalize_key(name):
+    name = name.strip().lower()
+    # Usernames are case-insensitive; UUIDs are accepted with or without dashes
+    if len(name) == 36 and name.count("-") == 4:
+        return name.replace("-", "")
+    return name
+
+
+def _sha1_of(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+class SkinCache:
+    # Skins are stored once per content hash under blobs/; index.json maps each
+    # username/UUID to a blob (or to another name via alias_of) with its ETag.
+    def __init__(self, root=SKIN_CACHE_DIR, ttl=DEFAULT_TTL):
+        self.root = root
+        self.ttl = ttl
+        self.blobs_dir = os.path.join(root, "blobs")
+        self.index_path = os.path.join(root, "index.json")
+        self._lock = threading.RLock()
+        self._index = self._load_index()
+
+    def _load_index(self):
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, "r") as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"Ignoring unreadable skin index: {e}")
+        return {}
+
+    def _save_index(self):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._index, f, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    def _entry(self, key):
+        # Follows alias_of links to the entry that owns the blob
+        seen = set()
+        entry = self._index.get(key)
+        while entry is not None and "alias_of" in entry and key not in seen:
+            seen.add(key)
+            key = entry["alias_of"]
+            entry = self._index.get(key)
+        return key, entry
+
+    def _blob_path(self, digest):
+        return os.path.join(self.blobs_dir, f"{digest}.png")
+
+    def lookup(self, name):
+        with self._lock:
+            _, entry = self._entry(normalize_key(name))
+            if entry is None or "hash" not in entry:
+                return None
+            path = self._blob_path(entry["hash"])
+            return path if os.path.exists(path) else None
+
+    def fetch(self, name, force=False):
+        # Returns the blob path for name, revalidating with the server once the TTL is up
+        with self._lock:
+            key, entry = self._entry(normalize_key(name))
+            entry = dict(entry or {})
+        blob = self._blob_path(entry["hash"]) if "hash" in entry else None
+        have_blob = blob is not None and os.path.exists(blob)
+        if have_blob and not force and time.time() - entry.get("fetched_at", 0) < self.ttl:
+            return blob
+
+        headers = {}
+        if have_blob and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if have_blob and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        response = net.get(SKIN_URL.format(key), headers=headers)
+
+        if response.status_code == 304 and have_blob:
+            entry["fetched_at"] = time.time()
+        elif response.status_code == 200:
+            digest = hashlib.sha1(response.content).hexdigest()
+            blob = self._blob_path(digest)
+            if not os.path.exists(blob):
+                os.makedirs(self.blobs_dir, exist_ok=True)
+                tmp_path = blob + ".tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(response.content)
+                os.replace(tmp_path, blob)
+            entry = {
+                "hash": digest,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "fetched_at": time.time()
+            }
+        else:
+            return blob if have_blob else None
+
+        with self._lock:
+            self._index[key] = entry
+            self._save_index()
+        return blob
+
+    def alias(self, target, source):
+        # target now resolves to whatever skin source has, including future updates
+        blob = self.fetch(source)
+        if blob is None:
+            return None
+        with self._lock:
+            self._index[normalize_key(target)] = {"alias_of": normalize_key(source)}
+            self._save_index()
+        return blob
+
+    def install(self, name, skins_dir, blob=None):
+        # Copies the cached skin to <skins_dir>/<name>.png unless it is already identical
+        blob = blob or self.lookup(name)
+        if blob is None:
+            return None
+        dest = os.path.join(skins_dir, f"{name}.png")
+        digest = os.path.splitext(os.path.basename(blob))[0]
+        if os.path.exists(dest) and _sha1_of(dest) == digest:
+            return dest
+        os.makedirs(skins_dir, exist_ok=True)
+        shutil.copyfile(blob, dest)
+        return dest
+
+    def sync_in_background(self, name, skins_dir, trace=None):
+        # Installs the cached copy right away, then revalidates without blocking the caller
+        def run():
+            try:
+                with tracing.span(trace, "skin_fetch", username=name):
+                    blob = self.fetch(name)
+                self.install(name, skins_dir, blob)
+                print(f"Skin ready for {name}")
+            except Exception as e:
+                print(f"Failed to fetch skin for {name}: {e}")
+
+        try:
+            self.install(name, skins_dir)
+        except OSError as e:
+            print(f"Failed to install cached skin for {name}: {e}")
+        thread = threading.Thread(target=run, name=f"skin-{name}", daemon=True)
+        thread.start()
+        return thread
+
+
+_default_cache = None
+
+
+def default_cache():
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = SkinCache()
+    return _default_cache
@@ -0,0 +1,43 @@
+import os
+import time
+
+PROFILE_FLAG = "--profile-startup"
+BUDGET_FLAG = "--startup-budget-ms"
+PROFILE_ENV = "BARRIE_PROFILE_STARTUP"
+
+
+class StartupProfile:
+    # Named checkpoints measured from process start; each phase is the time since the previous mark
+    def __init__(self, started_at):
+        self.started_at = started_at
+        self.marks = []
+
+    def mark(self, name):
+        self.marks.append((name, time.perf_counter()))
+
+    def phases(self):
+        phases = {}
+        previous = self.started_at
+        for name, at in self.marks:
+            phases[name] = round((at - previous) * 1000, 1)
+            previous = at
+        phases["total"] = round((previous - self.started_at) * 1000, 1)
+        return phases
+
+    def report(self):
+        phases = self.phases()
+        print("Startup timings (ms): " + ", ".join(f"{name}={value}" for name, value in phases.items()))
+        return phases
+
+
+def requested(argv):
+    return PROFILE_FLAG in argv or BUDGET_FLAG in argv or bool(os.getenv(PROFILE_ENV))
+
+
+def budget_ms(argv):
+    # --startup-budget-ms N: exit non-zero once painted if startup took longer than N ms
+    if BUDGET_FLAG in argv:
+        index = argv.index(BUDGET_FLAG)
+        if index + 1 < len(argv):
+            return float(argv[index + 1])
+    return None
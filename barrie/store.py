@@ -0,0 +1,184 @@
+import os
+import sys
+import errno
+import shutil
+import threading
+
+from barrie import hashcache, installer
+
+# Inside the Minecraft directory so objects, the shared install and instances are always on
+# one volume; hardlinks cannot cross volumes
+STORE_DIRNAME = "barrie_store"
+
+# Linux FICLONE ioctl: a copy-on-write clone of the whole file (btrfs, XFS, bcachefs)
+FICLONE = 0x40049409
+
+_no_reflink_devices = set()
+
+
+def _reflink_linux(src, dst):
+    import fcntl
+    with open(src, "rb") as source, open(dst, "wb") as target:
+        fcntl.ioctl(target.fileno(), FICLONE, source.fileno())
+
+
+def _reflink_macos(src, dst):
+    # clonefile(2) on APFS
+    import ctypes
+    libc = ctypes.CDLL(None, use_errno=True)
+    if libc.clonefile(os.fsencode(src), os.fsencode(dst), 0) != 0:
+        error = ctypes.get_errno()
+        raise OSError(error, os.strerror(error))
+
+
+def reflink(src, dst):
+    # True if dst is now a copy-on-write clone of src. Filesystems that cannot clone are
+    # remembered per device so the syscall is only tried once per volume.
+    if sys.platform.startswith("linux"):
+        clone = _reflink_linux
+    elif sys.platform == "darwin":
+        clone = _reflink_macos
+    else:
+        return False
+    device = os.stat(src).st_dev
+    if device in _no_reflink_devices:
+        return False
+    try:
+        clone(src, dst)
+        return True
+    except OSError as e:
+        if os.path.exists(dst):
+            os.remove(dst)
+        if e.errno in (errno.EOPNOTSUPP, errno.ENOTTY, errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.ENOTSUP):
+            _no_reflink_devices.add(device)
+            return False
+        raise
+
+
+def copy_file(src, dst):
+    # dst becomes an independent copy of src: a copy-on-write clone where the filesystem can
+    # make one, otherwise a plain copy. Returns the method used.
+    if reflink(src, dst):
+        return "reflink"
+    shutil.copyfile(src, dst)
+    return "copy"
+
+
+def link_file(src, dst, hardlink=True):
+    # Puts src at dst without copying its bytes where the OS allows it: a reflink, then a
+    # hardlink, then a plain copy. dst is replaced atomically. Returns the method used.
+    # Pass hardlink=False when either file may be rewritten in place: a hardlink would carry
+    # the write over to the other.
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    # A new file can be cloned or linked in place; anything else goes through a temporary name
+    # so a half-written file never appears at dst
+    target = dst + ".link" if os.path.lexists(dst) else dst
+    if target != dst and os.path.lexists(target):
+        os.remove(target)
+    method = None
+    if reflink(src, target):
+        method = "reflink"
+    elif hardlink:
+        try:
+            os.link(src, target)
+            method = "hardlink"
+        except OSError:
+            pass
+    if method is None:
+        target = dst + ".link"
+        shutil.copyfile(src, target)
+        method = "copy"
+    if target != dst:
+        os.replace(target, dst)
+    return method
+
+
+class Store:
+    # Files kept once under objects/<sha1[:2]>/<sha1>. A file with a declared sha1 is moved into
+    # the store and hardlinked back, so the shared install, the store and every instance use
+    # one copy of it. That is safe because such files are only ever replaced (installer.download_file
+    # writes a temporary file and renames it over the old one), never rewritten in place.
+    def __init__(self, root):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+
+    def object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def has(self, digest):
+        return os.path.exists(self.object_path(digest))
+
+    def intact(self, digest):
+        # True if the object exists and still hashes to its name. The hash cache keeps this
+        # cheap until something changes the file.
+        try:
+            return installer.cached_sha1(self.object_path(digest)) == digest
+        except OSError:
+            return False
+
+    def add(self, path, sha1=None):
+        # Moves the file at path into the store, leaving a link to the object in its place, and
+        # returns its sha1. When the store already holds the content, path is linked to the
+        # existing object instead; an object that no longer matches its hash is replaced.
+        digest = installer.cached_sha1(path)
+        if sha1 is not None and digest != sha1:
+            raise installer.InstallError(f"{path} is corrupt (sha1 {digest}, expected {sha1})")
+        obj = self.object_path(digest)
+        if self.intact(digest):
+            try:
+                if os.path.samefile(path, obj):
+                    return digest
+            except OSError:
+                pass
+            link_file(obj, path)
+            return digest
+        os.makedirs(os.path.dirname(obj), exist_ok=True)
+        tmp_path = f"{obj}.{threading.get_ident()}.tmp"
+        try:
+            try:
+                # The object takes over the file's inode: nothing is copied
+                os.link(path, tmp_path)
+            except OSError:
+                copy_file(path, tmp_path)
+            os.replace(tmp_path, obj)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        hashcache.get_cache().put(obj, os.stat(obj), digest)
+        return digest
+
+    def place(self, digest, dst):
+        # Links the object to dst unless dst already is that object
+        obj = self.object_path(digest)
+        try:
+            if os.path.samefile(obj, dst):
+                return "unchanged"
+        except OSError:
+            pass
+        return link_file(obj, dst)
+
+    def share(self, src, dst, sha1=None):
+        # dst becomes the same content as src. Files with a declared sha1 go through the store
+        # and end up as one object linked from both places. The rest (version JSONs, natives)
+        # may be rewritten in place, so dst gets a copy or clone of its own.
+        if sha1 is None:
+            return link_file(src, dst, hardlink=False)
+        return self.place(self.add(src, sha1), dst)
+
+    def usage(self):
+        # (object count, bytes) of what the store holds; linked copies cost nothing extra
+        count = size = 0
+        for dirpath, _, filenames in os.walk(self.objects_dir):
+            for name in filenames:
+                count += 1
+                size += os.path.getsize(os.path.join(dirpath, name))
+        return count, size
+
+
+_stores = {}
+
+
+def get_store(mc_dir):
+    if mc_dir not in _stores:
+        _stores[mc_dir] = Store(os.path.join(mc_dir, STORE_DIRNAME))
+    return _stores[mc_dir]
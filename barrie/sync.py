@@ -0,0 +1,97 @@
+import os
+import shutil
+import hashlib
+import threading
+
+LAUNCHER_SYNC_DIRS = ("logs", "config", "CustomSkinLoader")
+
+
+def _scan(root):
+    # relative path -> DirEntry for every file below root
+    files = {}
+    dirs = set()
+    stack = [""]
+    while stack:
+        rel_dir = stack.pop()
+        try:
+            with os.scandir(os.path.join(root, rel_dir)) as it:
+                for entry in it:
+                    rel = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        dirs.add(rel)
+                        stack.append(rel)
+                    elif entry.is_file():
+                        files[rel] = entry
+        except FileNotFoundError:
+            pass
+    return files, dirs
+
+
+def _file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _unchanged(src_entry, dst_entry, use_hash):
+    src_stat = src_entry.stat()
+    dst_stat = dst_entry.stat()
+    if src_stat.st_size != dst_stat.st_size:
+        return False
+    if use_hash:
+        return _file_hash(src_entry.path) == _file_hash(dst_entry.path)
+    # copy2 carries the mtime over, so equal mtimes mean nothing changed since the last sync
+    return src_stat.st_mtime_ns == dst_stat.st_mtime_ns
+
+
+def sync_tree(src, dst, use_hash=False):
+    # Makes dst a mirror of src, copying only new or changed files and removing
+    # files that no longer exist in src. Returns counters for the caller to log.
+    stats = {"copied": 0, "deleted": 0, "unchanged": 0, "bytes": 0}
+    src_files, src_dirs = _scan(src)
+    dst_files, dst_dirs = _scan(dst)
+
+    for rel in sorted(src_dirs):
+        if rel not in dst_dirs:
+            os.makedirs(os.path.join(dst, rel), exist_ok=True)
+    os.makedirs(dst, exist_ok=True)
+
+    for rel, src_entry in src_files.items():
+        dst_entry = dst_files.get(rel)
+        if dst_entry is not None and _unchanged(src_entry, dst_entry, use_hash):
+            stats["unchanged"] += 1
+            continue
+        shutil.copy2(src_entry.path, os.path.join(dst, rel))
+        stats["copied"] += 1
+        stats["bytes"] += src_entry.stat().st_size
+
+    for rel, dst_entry in dst_files.items():
+        if rel not in src_files:
+            os.remove(dst_entry.path)
+            stats["deleted"] += 1
+
+    # Deepest first so parents are empty by the time they are removed
+    for rel in sorted(dst_dirs - src_dirs, key=len, reverse=True):
+        path = os.path.join(dst, rel)
+        if os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path, ignore_errors=True)
+    return stats
+
+
+def sync_launcher_data(mc_dir, launcher_dir, names=LAUNCHER_SYNC_DIRS):
+    results = {}
+    for name in names:
+        src = os.path.join(mc_dir, name)
+        if os.path.exists(src):
+            results[name] = sync_tree(src, os.path.join(launcher_dir, name))
+            print(f"Synced {name} to BarrieLauncher directory: {results[name]}")
+    return results
+
+
+def sync_launcher_data_in_background(mc_dir, launcher_dir, names=LAUNCHER_SYNC_DIRS):
+    # Not a daemon: interpreter shutdown waits for a sync in progress instead of cutting it off
+    thread = threading.Thread(target=sync_launcher_data, args=(mc_dir, launcher_dir, names), name="launcher-sync")
+    thread.start()
+    return thread
@@ -0,0 +1,140 @@
+import os
+import json
+import time
+import uuid
+import threading
+from contextlib import contextmanager
+
+from barrie.errors import LaunchCancelled
+from barrie.paths import get_appdata_path
+from barrie.settings import get_settings
+
+TRACE_FILE = os.path.join(get_appdata_path(), "launch_traces.jsonl")
+# The file is rolled over to .1 past this size, so at most twice this is kept
+MAX_TRACE_BYTES = 5 * 1024 * 1024
+
+_write_lock = threading.Lock()
+
+
+def _write_lines(path, records):
+    with _write_lock:
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if os.path.exists(path) and os.path.getsize(path) > MAX_TRACE_BYTES:
+                os.replace(path, path + ".1")
+            with open(path, "a", encoding="utf-8") as f:
+                for record in records:
+                    f.write(json.dumps(record) + "\n")
+        except OSError as e:
+            print(f"Could not write launch trace: {e}")
+
+
+class Trace:
+    # One launch, from the Play click to the game's exit. Spans have a duration, events are
+    # instants; both are timed from the start of the trace. finish() appends the whole trace
+    # to the JSON-lines file: one "trace" record followed by one record per span/event.
+    # Spans that end after finish() (a skin fetch outliving a short session) are appended on
+    # their own, marked late, under the same trace id.
+    def __init__(self, name, path=TRACE_FILE, **attrs):
+        self.id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.path = path
+        self.attrs = attrs
+        self.started_at = time.time()
+        self.spans = []
+        self.finished = False
+        self.duration_ms = None
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def _offset_ms(self, at=None):
+        return round(((at or time.perf_counter()) - self._t0) * 1000, 3)
+
+    def _add(self, record):
+        with self._lock:
+            self.spans.append(record)
+            late = self.finished
+        if late:
+            _write_lines(self.path, [dict(record, trace=self.id, late=True)])
+
+    @contextmanager
+    def span(self, name, **attrs):
+        start = time.perf_counter()
+        record = {"name": name, "kind": "span", "start_ms": self._offset_ms(start), "thread": threading.current_thread().name}
+        try:
+            yield record
+        except BaseException as e:
+            record["status"] = "cancelled" if isinstance(e, LaunchCancelled) else "error"
+            record["error"] = f"{type(e).__name__}: {e}"
+            raise
+        else:
+            record["status"] = "ok"
+        finally:
+            record["duration_ms"] = round((time.perf_counter() - start) * 1000, 3)
+            if attrs:
+                record["attrs"] = attrs
+            self._add(record)
+
+    def event(self, name, **attrs):
+        record = {"name": name, "kind": "event", "start_ms": self._offset_ms()}
+        if attrs:
+            record["attrs"] = attrs
+        self._add(record)
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def finish(self, status="ok", summary=False, **attrs):
+        with self._lock:
+            if self.finished:
+                return
+            self.finished = True
+            self.duration_ms = self._offset_ms()
+            spans = sorted(self.spans, key=lambda record: record["start_ms"])
+        self.attrs.update(attrs)
+        root = {
+            "trace": self.id,
+            "kind": "trace",
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_ms": self.duration_ms,
+            "status": status,
+            "attrs": self.attrs
+        }
+        _write_lines(self.path, [root] + [dict(record, trace=self.id) for record in spans])
+        if summary:
+            print(self.summary())
+
+    def summary(self):
+        with self._lock:
+            spans = sorted(self.spans, key=lambda record: record["start_ms"])
+        duration = self.duration_ms if self.finished else self._offset_ms()
+        details = " ".join(f"{key}={value}" for key, value in self.attrs.items())
+        lines = [f"Trace {self.id} {self.name} {details}: {duration / 1000:.2f} s"]
+        for record in spans:
+            if record["kind"] == "span":
+                status = "" if record.get("status") == "ok" else f"  [{record.get('status')}]"
+                lines.append(f"  {record['name']:<18} {record['duration_ms']:>10.1f} ms  at +{record['start_ms'] / 1000:.2f} s{status}")
+            else:
+                lines.append(f"  {record['name']:<18} {'':>10}     at +{record['start_ms'] / 1000:.2f} s")
+        return "\n".join(lines)
+
+
+def summary_enabled():
+    # The per-launch summary is printed when asked for in the settings or the environment
+    return bool(os.getenv("BARRIE_TRACE")) or bool(get_settings().get("trace_summary"))
+
+
+@contextmanager
+def span(trace, name, **attrs):
+    # Lets call sites trace unconditionally whether or not a trace was handed to them
+    if trace is None:
+        yield None
+        return
+    with trace.span(name, **attrs) as record:
+        yield record
+
+
+def event(trace, name, **attrs):
+    if trace is not None:
+        trace.event(name, **attrs)
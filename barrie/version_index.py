@@ -0,0 +1,182 @@
+import os
+import json
+import threading
+from collections import namedtuple
+
+from barrie.paths import get_appdata_path
+
+INDEX_CACHE_FILE = os.path.join(get_appdata_path(), "version_index.json")
+INDEX_FORMAT = 1
+
+EDITIONS = ("vanilla", "fabric", "quilt", "forge", "neoforge")
+
+InstalledVersion = namedtuple("InstalledVersion", "id edition base_version inherits_from main_class type")
+
+
+def classify(data):
+    # Decides the edition from what the profile runs, not from its folder name
+    main_class = data.get("mainClass", "")
+    libraries = [lib.get("name", "") for lib in data.get("libraries", [])]
+    arguments = data.get("minecraftArguments", "") + json.dumps(data.get("arguments", {}).get("game", []))
+
+    def has_library(prefix):
+        return any(name.startswith(prefix) for name in libraries)
+
+    if main_class.startswith("org.quiltmc") or has_library("org.quiltmc:quilt-loader"):
+        return "quilt"
+    if main_class.startswith("net.fabricmc") or has_library("net.fabricmc:fabric-loader"):
+        return "fabric"
+    if has_library("net.neoforged") or "neoforge" in arguments.lower():
+        return "neoforge"
+    if (has_library("net.minecraftforge") or main_class.startswith("cpw.mods")
+            or "net.minecraftforge" in main_class or "FMLTweaker" in arguments):
+        return "forge"
+    return "vanilla"
+
+
+def _parse(version_dir, version_id):
+    json_path = os.path.join(version_dir, version_id, f"{version_id}.json")
+    try:
+        stat = os.stat(json_path)
+        with open(json_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    inherits_from = data.get("inheritsFrom")
+    entry = {
+        "id": version_id,
+        "edition": classify(data),
+        "base_version": inherits_from or data.get("id", version_id),
+        "inherits_from": inherits_from,
+        "main_class": data.get("mainClass"),
+        "type": data.get("type"),
+        "json_mtime_ns": stat.st_mtime_ns
+    }
+    return entry
+
+
+def _to_version(entry):
+    return InstalledVersion(
+        entry["id"], entry["edition"], entry["base_version"],
+        entry["inherits_from"], entry["main_class"], entry["type"]
+    )
+
+
+class VersionIndex:
+    # Parses each versions/<id>/<id>.json once; the listing is only re-read when the
+    # versions directory mtime changes, and entries are reused while their json mtime holds.
+    def __init__(self, mc_dir, cache_path=INDEX_CACHE_FILE):
+        self.mc_dir = mc_dir
+        self.versions_dir = os.path.join(mc_dir, "versions")
+        self.cache_path = cache_path
+        self._lock = threading.Lock()
+        self._dir_mtime_ns = None
+        self._entries = {}
+        self._load_cache()
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, "r") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return
+        if cache.get("format") != INDEX_FORMAT or cache.get("versions_dir") != self.versions_dir:
+            return
+        # The listing itself is re-checked on first use; only parsed entries are reused
+        self._entries = cache.get("entries", {})
+
+    def _save_cache(self):
+        cache = {
+            "format": INDEX_FORMAT,
+            "versions_dir": self.versions_dir,
+            "dir_mtime_ns": self._dir_mtime_ns,
+            "entries": self._entries
+        }
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = self.cache_path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(cache, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"Could not write version index cache: {e}")
+
+    def refresh(self, force=False):
+        with self._lock:
+            try:
+                dir_mtime_ns = os.stat(self.versions_dir).st_mtime_ns
+            except OSError:
+                self._dir_mtime_ns = None
+                self._entries = {}
+                return
+            if not force and dir_mtime_ns == self._dir_mtime_ns:
+                return
+
+            entries = {}
+            changed = False
+            for version_id in os.listdir(self.versions_dir):
+                cached = self._entries.get(version_id)
+                json_path = os.path.join(self.versions_dir, version_id, f"{version_id}.json")
+                try:
+                    mtime_ns = os.stat(json_path).st_mtime_ns
+                except OSError:
+                    continue
+                if cached is not None and cached.get("json_mtime_ns") == mtime_ns:
+                    entries[version_id] = cached
+                    continue
+                entry = _parse(self.versions_dir, version_id)
+                if entry is not None:
+                    entries[version_id] = entry
+                    changed = True
+
+            changed = changed or entries.keys() != self._entries.keys()
+            self._entries = entries
+            self._dir_mtime_ns = dir_mtime_ns
+            if changed:
+                self._save_cache()
+
+    def invalidate(self):
+        with self._lock:
+            self._dir_mtime_ns = None
+
+    def _resolve(self, entry):
+        # A profile on top of a modded one (OptiFine or a custom profile inheriting from Fabric)
+        # runs that loader too, and its base version is the one at the end of the chain
+        edition = entry["edition"]
+        base_version = entry["base_version"]
+        seen = {entry["id"]}
+        parent = self._entries.get(entry["inherits_from"]) if entry["inherits_from"] else None
+        while parent is not None and parent["id"] not in seen:
+            seen.add(parent["id"])
+            if edition == "vanilla":
+                edition = parent["edition"]
+            base_version = parent["base_version"]
+            parent = self._entries.get(parent["inherits_from"]) if parent["inherits_from"] else None
+        return _to_version(dict(entry, edition=edition, base_version=base_version))
+
+    def versions(self, edition=None, base_version=None):
+        self.refresh()
+        result = []
+        for entry in self._entries.values():
+            version = self._resolve(entry)
+            if edition and version.edition != edition.lower():
+                continue
+            if base_version and version.base_version != base_version:
+                continue
+            result.append(version)
+        result.sort(key=lambda v: v.id)
+        return result
+
+    def get(self, version_id):
+        self.refresh()
+        entry = self._entries.get(version_id)
+        return self._resolve(entry) if entry is not None else None
+
+
+_indexes = {}
+
+
+def get_index(mc_dir):
+    if mc_dir not in _indexes:
+        _indexes[mc_dir] = VersionIndex(mc_dir)
+    return _indexes[mc_dir]
@@ -0,0 +1,102 @@
+import os
+import json
+import time
+
+from barrie import net
+from barrie.paths import get_appdata_path
+
+VERSION_API = "https://piston-meta.mojang.com/mc/game/version_manifest_v2.json"
+MANIFEST_CACHE_FILE = os.path.join(get_appdata_path(), "version_manifest.json")
+# Pre-cache launchers only stored the ids, one per line
+LEGACY_VERSION_FILE = os.path.join(get_appdata_path(), "versions.txt")
+
+DEFAULT_TTL = 6 * 60 * 60
+MANIFEST_FIELDS = ("id", "type", "releaseTime", "url", "sha1")
+
+TYPE_LABELS = {
+    "release": "Release",
+    "snapshot": "Snapshot",
+    "old_beta": "Beta",
+    "old_alpha": "Alpha"
+}
+
+
+def load_manifest_cache(path=MANIFEST_CACHE_FILE):
+    if os.path.exists(path):
+        try:
+            with open(path, "r") as f:
+                cache = json.load(f)
+            if isinstance(cache.get("versions"), list):
+                return cache
+        except Exception as e:
+            print(f"Ignoring unreadable version cache: {e}")
+
+    if os.path.exists(LEGACY_VERSION_FILE):
+        with open(LEGACY_VERSION_FILE, "r") as f:
+            version_ids = f.read().splitlines()
+        # No type information survived in the old format; fetched_at 0 forces a refresh
+        return {
+            "fetched_at": 0,
+            "versions": [{"id": vid, "type": "release"} for vid in version_ids if vid]
+        }
+    return None
+
+
+def save_manifest_cache(cache, path=MANIFEST_CACHE_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(cache, f)
+    os.replace(tmp_path, path)
+
+
+def is_fresh(cache, ttl=DEFAULT_TTL):
+    return cache is not None and time.time() - cache.get("fetched_at", 0) < ttl
+
+
+def refresh_manifest(cache=None, path=MANIFEST_CACHE_FILE):
+    # Conditional GET against the manifest; returns (cache, changed)
+    headers = {}
+    if cache is not None:
+        if cache.get("etag"):
+            headers["If-None-Match"] = cache["etag"]
+        if cache.get("last_modified"):
+            headers["If-Modified-Since"] = cache["last_modified"]
+
+    response = net.get(VERSION_API, headers=headers)
+    if response.status_code == 304 and cache is not None:
+        cache["fetched_at"] = time.time()
+        save_manifest_cache(cache, path)
+        return cache, False
+    response.raise_for_status()
+
+    manifest = response.json()
+    cache = {
+        "fetched_at": time.time(),
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "latest": manifest.get("latest", {}),
+        "versions": [
+            {key: v[key] for key in MANIFEST_FIELDS if key in v}
+            for v in manifest.get("versions", [])
+        ]
+    }
+    save_manifest_cache(cache, path)
+    return cache, True
+
+
+def label_versions(versions):
+    labeled_versions = []
+    for v in versions:
+        label = f"{TYPE_LABELS.get(v.get('type', 'release'), 'Other')} - {v['id']}"
+        labeled_versions.append((label, v["id"]))
+    return labeled_versions
+
+
+def find_version(cache, version_id):
+    if cache is None:
+        return None
+    for v in cache["versions"]:
+        if v["id"] == version_id:
+            return v
+    return None
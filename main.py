@@ -1,36 +1,26 @@
 import os
 import sys
-import shutil
-import json
-import webbrowser
-import subprocess
-import psutil
-import requests
-import tempfile
+import time
+# Taken before the heavy imports so --profile-startup can report how long they took
+_STARTED_AT = time.perf_counter()
+import hashlib
+import threading
 from PySide6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
     QPushButton, QComboBox, QFrame, QDialog, QListView, QAbstractItemView, QCheckBox, QMessageBox,
-    QTabWidget, QSlider
+    QTabWidget, QSlider, QProgressBar, QFileDialog, QTableWidget, QTableWidgetItem, QHeaderView, QPlainTextEdit, QInputDialog,
+    QGraphicsView, QGraphicsScene, QGraphicsPixmapItem, QGraphicsRectItem, QGraphicsItem
 )
+from PySide6.QtGui import (
+    QPixmap, QIcon, QStandardItemModel, QStandardItem, QFont, QPainter, QPen, QColor, QBrush,
+    QImage, QImageReader, QImageIOHandler, QPainterPath, QDesktopServices
+)
+from PySide6.QtCore import Qt, QThread, Signal, QObject, QEvent, QTimer, QRect, QRectF, QSize, QUrl
+from barrie import assets, gamelog, instances, jvm, launch, modrinth, mods, processes, skins, startup, sync, tracing, version_index, versions
+from barrie.settings import get_settings
+from barrie.errors import LaunchCancelled
+from barrie.paths import get_appdata_path, get_minecraft_directory
 
-from PySide6.QtGui import QPixmap, QIcon, QStandardItemModel, QStandardItem, QFont
-from PySide6.QtCore import Qt, QTimer
-from PySide6.QtGui import QPainter
-import minecraft_launcher_lib
-from PySide6.QtGui import QPainter, QPixmap, QColor, QImage
-from PySide6.QtCore import QRect
-from PySide6.QtWidgets import QDialog, QGraphicsView, QGraphicsScene, QGraphicsPixmapItem, QPushButton, QVBoxLayout, QFileDialog, QGraphicsRectItem, QGraphicsItem
-from PySide6.QtGui import QPixmap, QPainter, QPen, QColor, QMouseEvent, QBrush
-from PySide6.QtCore import QRectF, Qt, QPointF
-def get_appdata_path():
-    return os.path.join(os.getenv("APPDATA"), "BarrieLauncher")
-
-def resource_path(relative_path):
-    base_path = getattr(sys, '_MEIPASS', os.path.dirname(__file__))
-    return os.path.join(base_path, relative_path)
-
-VERSION_FILE = os.path.join(get_appdata_path(), "versions.txt")
-VERSION_API = "https://launchermeta.mojang.com/mc/game/version_manifest.json"
 class CropBox(QGraphicsRectItem):
     def __init__(self, rect):
         super().__init__(rect)
@@ -38,67 +28,579 @@ class CropBox(QGraphicsRectItem):
         self.setPen(QPen(Qt.green, 2))
         self.setBrush(QBrush(QColor(0, 255, 0, 40)))
 
-SETTINGS_FILE = os.path.join(get_appdata_path(), "settings.json")
-
-def save_settings(username, version_id, ram_mb=None):
-    data = {"username": username, "version_id": version_id}
-    if ram_mb is not None:
-        data["ram_mb"] = ram_mb
+    def itemChange(self, change, value):
+        # Dragging stops at the image edges, so the crop is always a full square of image
+        if change == QGraphicsItem.ItemPositionChange and self.scene() is not None:
+            rect = self.rect().translated(value)
+            return value + (clamp_rect(rect, self.scene().sceneRect()).topLeft() - rect.topLeft())
+        return super().itemChange(change, value)
 
-    os.makedirs(get_appdata_path(), exist_ok=True)
-    with open(SETTINGS_FILE, "w") as f:
-        json.dump(data, f)
-
-def load_settings():
-    if os.path.exists(SETTINGS_FILE):
-        try:
-            with open(SETTINGS_FILE, "r") as f:
-                return json.load(f)
-        except Exception:
-            pass
-    return {}
+def clamp_rect(rect, bounds):
+    # rect moved just far enough to lie inside bounds; it must not be larger than them
+    x = min(max(rect.left(), bounds.left()), bounds.right() - rect.width())
+    y = min(max(rect.top(), bounds.top()), bounds.bottom() - rect.height())
+    return QRectF(x, y, rect.width(), rect.height())
 
 def get_available_versions(offline=False):
-    versions = []
-    try:
+    # Served from the manifest cache only; VersionRefresher keeps it current
+    cache = versions.load_manifest_cache()
+    if cache is None or not cache["versions"]:
         if offline:
-            raise Exception("Forced offline")
-        mc_versions = minecraft_launcher_lib.utils.get_version_list()
-        with open(VERSION_FILE, "w") as f:
-            for v in mc_versions:
-                f.write(v["id"] + "\n")
-    except Exception as e:
-        print("Offline or error fetching versions:", e)
-        if os.path.exists(VERSION_FILE):
-            with open(VERSION_FILE, "r") as f:
-                version_ids = f.read().splitlines()
-            mc_versions = [{"id": vid, "type": "release"} for vid in version_ids]
-        else:
             return [("Offline: No cached versions", "")]
-    type_labels = {
-        "release": "Release",
-        "snapshot": "Snapshot",
-        "old_beta": "Beta",
-        "old_alpha": "Alpha"
-    }
-    labeled_versions = []
-    for v in mc_versions:
-        label = f"{type_labels.get(v.get('type', 'release'), 'Other')} - {v['id']}"
-        labeled_versions.append((label, v["id"]))
-    return labeled_versions
+        return [("Loading versions...", "")]
+    return versions.label_versions(cache["versions"])
+
+def open_link(url):
+    # webbrowser is only needed once a social button is clicked
+    import webbrowser
+    webbrowser.open(url)
+
+class FirstPaintProbe(QObject):
+    # Marks the first paint of the main window, then hands the profile to on_painted
+    def __init__(self, profile, on_painted):
+        super().__init__()
+        self.profile = profile
+        self.on_painted = on_painted
+        self.painted = False
+
+    def eventFilter(self, obj, event):
+        if not self.painted and event.type() == QEvent.Paint:
+            self.painted = True
+            # Queued so the paint being measured has finished before the mark is taken
+            QTimer.singleShot(0, self.finish)
+        return False
+
+    def finish(self):
+        self.profile.mark("first_paint")
+        self.on_painted(self.profile)
 
 def get_installed_fabric_versions():
-    fabric_versions = []
-    versions_dir = os.path.join(minecraft_launcher_lib.utils.get_minecraft_directory(), "versions")
-    if os.path.exists(versions_dir):
-        for folder_name in os.listdir(versions_dir):
-            if "fabric-loader" in folder_name:
-                fabric_versions.append(folder_name)
-    return fabric_versions
-
-from PySide6.QtWidgets import QDialog, QLabel, QPushButton, QVBoxLayout, QHBoxLayout, QFileDialog
-from PySide6.QtGui import QPixmap, QPainter, QPen, QColor, QMouseEvent
-from PySide6.QtCore import Qt, QRect
+    index = version_index.get_index(get_minecraft_directory())
+    return [v.id for v in index.versions("fabric")]
+
+
+
+class LaunchWorker(QThread):
+    # Runs install, command build and the game process off the GUI thread
+    phase_changed = Signal(str)
+    progress_changed = Signal(int, int)
+    installed = Signal(str)
+    game_started = Signal(int)
+    failed = Signal(str)
+
+    def __init__(self, version_id, options, mode="vanilla", install=True, launch=True, env=None, prelaunch=None, on_exit=None, trace=None, separate=False, parent=None):
+        super().__init__(parent)
+        self.version_id = version_id
+        self.options = options
+        self.mode = mode.lower()
+        self.install = install
+        self.launch = launch
+        self.env = env
+        self.prelaunch = prelaunch
+        self.on_exit = on_exit
+        self.trace = trace
+        self.separate = separate
+        self._cancelled = False
+        self._process = None
+        self._progress_max = 0
+
+    def cancel(self):
+        self._cancelled = True
+        process = self._process
+        if process is not None and process.poll() is None:
+            process.terminate()
+
+    def _check_cancelled(self):
+        if self._cancelled:
+            raise LaunchCancelled()
+
+    def _install_callback(self):
+        def set_status(text):
+            self._check_cancelled()
+            self.phase_changed.emit(text)
+
+        def set_progress(value):
+            self._check_cancelled()
+            self.progress_changed.emit(value, self._progress_max)
+
+        def set_max(value):
+            self._progress_max = value
+
+        return {"setStatus": set_status, "setProgress": set_progress, "setMax": set_max}
+
+    def run(self):
+        trace = self.trace
+        try:
+            mc_dir = get_minecraft_directory()
+            version_id = self.version_id
+            if self.install:
+                self.phase_changed.emit(f"Installing {self.mode.title()} {version_id}...")
+                with tracing.span(trace, "install", mode=self.mode, version=version_id):
+                    version_id = launch.install_version(self.mode, version_id, mc_dir, callback=self._install_callback())
+                self._check_cancelled()
+            self.installed.emit(version_id)
+            if not self.launch:
+                # The launch that follows (e.g. after picking a Fabric build) carries on with the trace
+                return
+
+            # The game runs from the shared directory, or from its own instance linked out of it
+            game_dir = mc_dir
+            env = self.env
+            if self.separate:
+                self.phase_changed.emit(f"Preparing instance {version_id}...")
+                with tracing.span(trace, "instance"):
+                    instance, _ = instances.create_instance(version_id, version_id, mc_dir, callback=self._install_callback())
+                game_dir = instance.path
+                if env is not None and "FABRIC_MODS_DIR" in env:
+                    env = launch.fabric_env(game_dir, version_id)
+                self._check_cancelled()
+
+            self.phase_changed.emit("Preparing launch...")
+            if self.prelaunch is not None:
+                with tracing.span(trace, "prelaunch"):
+                    self.prelaunch(game_dir, version_id)
+            settings = get_settings()
+            mods_dir = (env or {}).get("FABRIC_MODS_DIR")
+            with tracing.span(trace, "jvm_options"):
+                options = jvm.apply_to_options(
+                    self.options, game_dir, version_id, settings.heap_mb, settings.gc_preset, mods_dir, java_dir=mc_dir
+                )
+            with tracing.span(trace, "command_build", version=version_id):
+                command = launch.build_command(version_id, game_dir, options)
+            self._check_cancelled()
+            print("Launching with command:", " ".join(command))
+
+            with tracing.span(trace, "spawn"):
+                self._process = launch.spawn(command, env=env, capture=True)
+            if self._cancelled:
+                self._process.terminate()
+            # The process manager owns the game (and the trace) from here, so this worker is free for the next launch
+            processes.get_manager().register(
+                self._process, version_id, username=self.options.get("username"), on_exit=self.on_exit, trace=trace
+            )
+            self.game_started.emit(self._process.pid)
+            self.phase_changed.emit(f"Minecraft {version_id} is running")
+        except LaunchCancelled:
+            if trace is not None:
+                trace.finish("cancelled", summary=tracing.summary_enabled())
+            self.phase_changed.emit("Launch cancelled.")
+        except Exception as e:
+            if trace is not None:
+                trace.finish("error", summary=tracing.summary_enabled(), error=str(e))
+            self.failed.emit(str(e))
+
+
+class BackgroundTask(QThread):
+    # Runs one blocking call (Modrinth lookups, downloads) off the GUI thread
+    succeeded = Signal(object)
+    failed = Signal(str)
+
+    def __init__(self, job, parent=None):
+        super().__init__(parent)
+        self.job = job
+
+    def run(self):
+        try:
+            self.succeeded.emit(self.job())
+        except Exception as e:
+            self.failed.emit(str(e))
+
+
+# Seconds the window waits on quit for startup downloads that are still running
+BACKGROUND_STOP_TIMEOUT = 5
+
+
+class VersionRefresher(QObject):
+    # Revalidates the manifest cache on a daemon thread so a slow network
+    # never holds up startup or shutdown
+    versions_ready = Signal(list)
+
+    def __init__(self, ttl=versions.DEFAULT_TTL, parent=None):
+        super().__init__(parent)
+        self.ttl = ttl
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name="version-refresh", daemon=True)
+        self.thread.start()
+
+    def run(self):
+        cache = versions.load_manifest_cache()
+        if versions.is_fresh(cache, self.ttl):
+            return
+        try:
+            cache, changed = versions.refresh_manifest(cache)
+        except Exception as e:
+            print("Offline or error fetching versions:", e)
+            if cache is None:
+                self.versions_ready.emit([("Offline: No cached versions", "")])
+            return
+        if changed:
+            self.versions_ready.emit(versions.label_versions(cache["versions"]))
+
+
+class AssetNotifier(QObject):
+    # Relays asset downloads finished on worker threads to the GUI thread
+    asset_ready = Signal(str, str)
+
+
+class ProcessNotifier(QObject):
+    # Relays process manager events from its threads to the GUI thread
+    instance_event = Signal(str, object)
+
+
+def format_bytes(value):
+    for unit in ("B", "KB", "MB"):
+        if value < 1024:
+            return f"{value:.0f} {unit}"
+        value /= 1024
+    return f"{value:.2f} GB"
+
+
+def format_uptime(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
+
+
+class InstancesDialog(QDialog):
+    COLUMNS = ("Version", "User", "PID", "Memory", "CPU", "Threads", "Uptime", "Status")
+
+    def __init__(self, notifier, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Running Instances")
+        self.setMinimumSize(640, 300)
+        self.manager = processes.get_manager()
+        self.rows = {}
+        self.log_instance = None
+        self.log_seen = 0
+
+        layout = QVBoxLayout()
+        tabs = QTabWidget()
+        instances_tab = QWidget()
+        instances_layout = QVBoxLayout()
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.itemSelectionChanged.connect(self.on_selection_changed)
+        instances_layout.addWidget(self.table)
+
+        buttons = QHBoxLayout()
+        kill_button = QPushButton("Stop")
+        kill_button.clicked.connect(self.kill_selected)
+        clear_button = QPushButton("Clear Finished")
+        clear_button.clicked.connect(self.clear_finished)
+        buttons.addWidget(kill_button)
+        buttons.addWidget(clear_button)
+        buttons.addStretch()
+        instances_layout.addLayout(buttons)
+        instances_tab.setLayout(instances_layout)
+
+        # === Log Tab ===
+        log_tab = QWidget()
+        log_layout = QVBoxLayout()
+        self.log_title = QLabel("No instance selected")
+        self.milestone_label = QLabel()
+        self.log_view = QPlainTextEdit()
+        self.log_view.setReadOnly(True)
+        self.log_view.setMaximumBlockCount(gamelog.MAX_LINES)
+        self.log_view.setFont(QFont("Consolas", 9))
+        log_layout.addWidget(self.log_title)
+        log_layout.addWidget(self.milestone_label)
+        log_layout.addWidget(self.log_view)
+        log_tab.setLayout(log_layout)
+
+        tabs.addTab(instances_tab, "Instances")
+        tabs.addTab(log_tab, "Log")
+        layout.addWidget(tabs)
+        self.setLayout(layout)
+
+        for instance in self.manager.instances():
+            self.update_instance(instance)
+        running = self.manager.running()
+        if running:
+            self.show_log(running[-1])
+        notifier.instance_event.connect(self.on_instance_event)
+
+        # The reader thread only fills the buffer; the view tails it on a timer
+        self.log_timer = QTimer(self)
+        self.log_timer.timeout.connect(self.tail_log)
+        self.log_timer.start(250)
+
+    def on_instance_event(self, event, instance):
+        self.update_instance(instance)
+        if event == "started" and (self.log_instance is None or not self.log_instance.running):
+            self.show_log(instance)
+        elif event == "milestone" and instance is self.log_instance:
+            self.update_milestones()
+
+    def on_selection_changed(self):
+        instance = self.manager.get(self.selected_instance_id())
+        if instance is not None and instance is not self.log_instance:
+            self.show_log(instance)
+
+    def show_log(self, instance):
+        self.log_instance = instance
+        self.log_seen = 0
+        self.log_view.clear()
+        self.log_title.setText(f"Minecraft {instance.version_id} (pid {instance.pid})")
+        self.update_milestones()
+        self.tail_log()
+
+    def tail_log(self):
+        instance = self.log_instance
+        if instance is None or instance.log is None:
+            return
+        self.log_seen, lines = instance.log.lines_since(self.log_seen)
+        if lines:
+            self.log_view.appendPlainText("\n".join(lines))
+
+    def update_milestones(self):
+        log = self.log_instance.log if self.log_instance is not None else None
+        if log is None or not log.milestones:
+            self.milestone_label.setText("")
+            return
+        parts = [f"{name.replace('_', ' ')} +{elapsed:.1f}s" for name, elapsed in sorted(log.milestones.items(), key=lambda item: item[1])]
+        self.milestone_label.setText("  ·  ".join(parts))
+
+    def update_instance(self, instance):
+        row = self.rows.get(instance.id)
+        if row is None:
+            row = self.table.rowCount()
+            self.table.insertRow(row)
+            self.rows[instance.id] = row
+        latest = instance.latest
+        if instance.running:
+            status = "Running"
+        else:
+            status = f"Exited ({instance.exit_code})"
+        values = (
+            instance.version_id,
+            instance.username or "",
+            str(instance.pid),
+            format_bytes(latest["rss"]) if latest else "-",
+            f"{latest['cpu_percent']:.0f}%" if latest else "-",
+            str(latest["threads"]) if latest else "-",
+            format_uptime(instance.uptime),
+            status
+        )
+        for column, value in enumerate(values):
+            item = QTableWidgetItem(value)
+            item.setData(Qt.UserRole, instance.id)
+            self.table.setItem(row, column, item)
+
+    def selected_instance_id(self):
+        items = self.table.selectedItems()
+        return items[0].data(Qt.UserRole) if items else None
+
+    def kill_selected(self):
+        instance_id = self.selected_instance_id()
+        if instance_id is not None:
+            self.manager.kill(instance_id)
+
+    def clear_finished(self):
+        for instance in self.manager.instances():
+            if not instance.running:
+                self.manager.forget(instance.id)
+        self.table.setRowCount(0)
+        self.rows = {}
+        for instance in self.manager.instances():
+            self.update_instance(instance)
+
+
+def mods_target(mc_dir, folder, fallback_version=None, fallback_loader=None):
+    # (Minecraft version, loader) a mods folder is meant for: per-version folders are named
+    # after the profile that loads them (FABRIC_MODS_DIR), the shared one follows the main window
+    installed = version_index.get_index(mc_dir).get(folder) if folder else None
+    if installed is not None:
+        return installed.base_version, installed.edition if installed.edition in mods.LOADERS else None
+    return fallback_version, fallback_loader
+
+def mod_problems_text(problems, limit=10):
+    lines = [f"{os.path.basename(path)}: {', '.join(messages)}" for path, messages in sorted(problems.items())]
+    if len(lines) > limit:
+        lines = lines[:limit] + [f"...and {len(lines) - limit} more"]
+    return "\n".join(lines)
+
+class ModsDialog(QDialog):
+    COLUMNS = ("Name", "Id", "Version", "Loader", "Minecraft", "Update", "Status")
+
+    def __init__(self, minecraft_version=None, loader=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Mods")
+        self.setMinimumSize(760, 420)
+        self.mc_dir = get_minecraft_directory()
+        self.mods_root = os.path.join(self.mc_dir, "mods")
+        self.minecraft_version = minecraft_version
+        self.loader = loader if loader in mods.LOADERS else None
+        self.updates = {}
+        self.update_task = None
+        os.makedirs(self.mods_root, exist_ok=True)
+
+        layout = QVBoxLayout()
+        top = QHBoxLayout()
+        self.folder_dropdown = QComboBox()
+        # "" is the shared mods folder, anything else a per-version one
+        self.folder_dropdown.addItem("mods", "")
+        for name in sorted(os.listdir(self.mods_root)):
+            if os.path.isdir(os.path.join(self.mods_root, name)):
+                self.folder_dropdown.addItem(f"mods/{name}", name)
+        self.folder_dropdown.currentIndexChanged.connect(self.folder_changed)
+        top.addWidget(self.folder_dropdown, 1)
+        self.summary_label = QLabel()
+        top.addWidget(self.summary_label)
+        layout.addLayout(top)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.horizontalHeader().setSectionResizeMode(len(self.COLUMNS) - 1, QHeaderView.Stretch)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSortingEnabled(True)
+        layout.addWidget(self.table)
+
+        buttons = QHBoxLayout()
+        open_button = QPushButton("Open Folder")
+        open_button.clicked.connect(self.open_folder)
+        refresh_button = QPushButton("Refresh")
+        refresh_button.clicked.connect(self.refresh)
+        self.install_button = QPushButton("Install Mods...")
+        self.install_button.clicked.connect(self.install_mods)
+        self.check_button = QPushButton("Check Updates")
+        self.check_button.clicked.connect(self.check_updates)
+        self.update_button = QPushButton("Update All")
+        self.update_button.setEnabled(False)
+        self.update_button.clicked.connect(self.apply_updates)
+        buttons.addWidget(open_button)
+        buttons.addWidget(refresh_button)
+        buttons.addStretch()
+        buttons.addWidget(self.install_button)
+        buttons.addWidget(self.check_button)
+        buttons.addWidget(self.update_button)
+        layout.addLayout(buttons)
+        self.setLayout(layout)
+        self.refresh()
+
+    def current_folder(self):
+        return os.path.join(self.mods_root, self.folder_dropdown.currentData() or "")
+
+    def folder_changed(self):
+        self.updates = {}
+        self.update_button.setEnabled(False)
+        self.refresh()
+
+    def target(self):
+        return mods_target(self.mc_dir, self.folder_dropdown.currentData(), self.minecraft_version, self.loader)
+
+    def refresh(self):
+        minecraft_version, loader = self.target()
+        found = mods.get_index().scan(self.current_folder())
+        problems = mods.check(found, minecraft_version, loader)
+
+        self.table.setSortingEnabled(False)
+        self.table.setRowCount(len(found))
+        for row, mod in enumerate(found):
+            messages = problems.get(mod.path)
+            update = self.updates.get(mod.path)
+            latest = update.version.get("version_number", "?") if update else ""
+            values = (mod.name, mod.id or "", mod.version, (mod.loader or "").title(), mod.minecraft or "", latest, "; ".join(messages) if messages else "OK")
+            for column, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                item.setToolTip(mod.file_name)
+                if messages:
+                    item.setForeground(QColor("#d9534f"))
+                self.table.setItem(row, column, item)
+        self.table.setSortingEnabled(True)
+
+        target = " ".join(filter(None, ((loader or "").title(), minecraft_version)))
+        summary = f"{len(found)} mods, {len(problems)} with problems"
+        self.summary_label.setText(f"{summary} for {target}" if target else summary)
+
+    def open_folder(self):
+        QDesktopServices.openUrl(QUrl.fromLocalFile(self.current_folder()))
+
+    def run_task(self, job, on_success, failure_title):
+        self.install_button.setEnabled(False)
+        self.check_button.setEnabled(False)
+        self.update_button.setEnabled(False)
+        self.folder_dropdown.setEnabled(False)
+        task = BackgroundTask(job, parent=self)
+        task.succeeded.connect(on_success)
+        task.failed.connect(lambda message: QMessageBox.critical(self, failure_title, message))
+        task.finished.connect(self.task_finished)
+        self.update_task = task
+        task.start()
+
+    def task_finished(self):
+        self.install_button.setEnabled(True)
+        self.check_button.setEnabled(True)
+        self.update_button.setEnabled(bool(self.updates))
+        self.folder_dropdown.setEnabled(True)
+        self.refresh()
+
+    def install_mods(self):
+        minecraft_version, loader = self.target()
+        if not minecraft_version or not loader:
+            QMessageBox.warning(self, "Install Mods", "Pick a mods folder that belongs to a modded profile first.")
+            return
+        text, ok = QInputDialog.getText(self, "Install Mods", "Modrinth project ids or slugs, separated by spaces or commas:")
+        projects = text.replace(",", " ").split()
+        if not ok or not projects:
+            return
+        folder = self.current_folder()
+        client = modrinth.get_client()
+
+        def job():
+            # Dependencies are resolved first, then the whole plan downloads at once
+            plan = client.plan(projects, minecraft_version, loader, folder)
+            client.install_plan(plan, folder)
+            return plan
+
+        self.run_task(job, self.show_installed, "Install Failed")
+
+    def show_installed(self, plan):
+        dependencies = sum(1 for mod in plan if mod.required_by)
+        names = "\n".join(mod.file["filename"] for mod in plan)
+        QMessageBox.information(self, "Install Mods", f"Installed {len(plan)} mod(s), {dependencies} of them as dependencies:\n\n{names}")
+
+    def check_updates(self):
+        minecraft_version, loader = self.target()
+        if not minecraft_version or not loader:
+            QMessageBox.warning(self, "Check Updates", "Pick a mods folder that belongs to a modded profile first.")
+            return
+        folder = self.current_folder()
+        # Every jar is hashed and looked up in one Modrinth request
+        self.run_task(lambda: modrinth.get_client().check_updates(folder, minecraft_version, loader), self.show_updates, "Update Check Failed")
+
+    def show_updates(self, result):
+        updates, unknown = result
+        self.updates = {update.path: update for update in updates}
+        text = f"{len(updates)} update(s) available."
+        if unknown:
+            text += f"\n{len(unknown)} mod(s) have no matching build on Modrinth."
+        QMessageBox.information(self, "Check Updates", text)
+
+    def apply_updates(self):
+        updates = list(self.updates.values())
+        client = modrinth.get_client()
+
+        def job():
+            for update in updates:
+                client.apply_update(update)
+            return len(updates)
+
+        self.updates = {}
+        self.run_task(job, lambda count: QMessageBox.information(self, "Update All", f"Updated {count} mod(s)."), "Update Failed")
+
+    def done(self, result):
+        # Closing waits for a running check or download rather than destroying its thread
+        if self.update_task is not None and self.update_task.isRunning():
+            self.update_task.wait()
+        super().done(result)
 
 class SettingsDialog(QDialog):
 
@@ -107,21 +609,22 @@ class SettingsDialog(QDialog):
         value = self.ram_slider.value()             # Value in GB
         ram_mb = value * 1024                       # Convert to MB
 
-    # Load existing settings
-        settings = load_settings()
-
-    # Update only ram_mb, leave username and version_id unchanged
-        save_settings(
-            settings.get("username", ""), 
-            settings.get("version_id", ""), 
-            ram_mb
+    # Update only the JVM settings, leave username and version_id unchanged
+        get_settings().update(
+            ram_mb=ram_mb,
+            ram_auto=self.ram_auto_checkbox.isChecked(),
+            gc_preset=self.gc_dropdown.currentData()
         )
 
         self.accept()  # Close the dialog
 
 
     def update_ram_label(self, value):
-        self.ram_label.setText(f"Allocated RAM: {value} GB")
+        if self.ram_auto_checkbox.isChecked():
+            self.ram_label.setText(f"Allocated RAM: Auto (about {self.auto_heap_mb / 1024:.1f} GB without mods)")
+        else:
+            self.ram_label.setText(f"Allocated RAM: {value} GB")
+        self.ram_slider.setEnabled(not self.ram_auto_checkbox.isChecked())
 
 
     def __init__(self, parent=None):
@@ -135,24 +638,40 @@ class SettingsDialog(QDialog):
         general_tab = QWidget()
         general_layout = QVBoxLayout()
 
+        settings = get_settings()
+        total_mb = jvm.system_memory_mb()
+        self.auto_heap_mb = jvm.recommended_heap_mb(total_mb)
+
         self.ram_slider = QSlider(Qt.Horizontal)
         self.ram_slider.setMinimum(1)      # 1 GB
-        self.ram_slider.setMaximum(16)     # 16 GB
+        self.ram_slider.setMaximum(max(1, jvm.max_heap_mb(total_mb) // 1024))  # What this machine can spare
         self.ram_slider.setSingleStep(1)
 
 # Set RAM from saved settings
-        settings = load_settings()
-        ram_mb = settings.get("ram_mb", 2048)
+        ram_mb = settings.ram_mb
         slider_value = ram_mb // 1024      # Direct GB
         self.ram_slider.setValue(slider_value)
 
+        self.ram_auto_checkbox = QCheckBox("Size automatically from system RAM and mods")
+        self.ram_auto_checkbox.setChecked(bool(settings.get("ram_auto")))
 
         self.ram_label = QLabel()
         self.update_ram_label(self.ram_slider.value())
         self.ram_slider.valueChanged.connect(self.update_ram_label)
+        self.ram_auto_checkbox.toggled.connect(lambda _: self.update_ram_label(self.ram_slider.value()))
+
+        self.gc_dropdown = QComboBox()
+        for preset, label in jvm.PRESET_LABELS.items():
+            self.gc_dropdown.addItem(label, preset)
+        index = self.gc_dropdown.findData(settings.gc_preset)
+        if index != -1:
+            self.gc_dropdown.setCurrentIndex(index)
 
         general_layout.addWidget(self.ram_label)
         general_layout.addWidget(self.ram_slider)
+        general_layout.addWidget(self.ram_auto_checkbox)
+        general_layout.addWidget(QLabel("Garbage collector"))
+        general_layout.addWidget(self.gc_dropdown)
         general_tab.setLayout(general_layout)
 
         # === Tabs ===
@@ -170,13 +689,86 @@ class SettingsDialog(QDialog):
         self.setLayout(layout)
 
 
+AVATAR_SIZE = 80
+AVATAR_CACHE_DIR = os.path.join(get_appdata_path(), "avatars")
+# Longest side of the image CropDialog works on; the source is only decoded at full size for the final crop
+PREVIEW_MAX_SIZE = 1600
+PROFILE_PHOTO_SIZE = 256
+
+def read_image(path, max_size=None):
+    # Decodes straight to at most max_size on the longest side instead of scaling a full decode
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    size = reader.size()
+    if max_size and size.isValid() and max(size.width(), size.height()) > max_size:
+        reader.setScaledSize(size.scaled(max_size, max_size, Qt.KeepAspectRatio))
+    return reader.read()
+
+def avatar_cache_path(source_path):
+    with open(source_path, "rb") as f:
+        digest = hashlib.sha1(f.read()).hexdigest()
+    return os.path.join(AVATAR_CACHE_DIR, f"{digest}-{AVATAR_SIZE}.png")
+
+def render_avatar(source_path, size=AVATAR_SIZE):
+    # Centre square of the source, scaled to size and clipped to an antialiased circle
+    image = read_image(source_path, size * 4)
+    if image.isNull():
+        return image
+    side = min(image.width(), image.height())
+    square = image.copy((image.width() - side) // 2, (image.height() - side) // 2, side, side)
+    square = square.scaled(size, size, Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation)
+
+    avatar = QImage(size, size, QImage.Format_ARGB32_Premultiplied)
+    avatar.fill(Qt.transparent)
+    painter = QPainter(avatar)
+    painter.setRenderHint(QPainter.Antialiasing)
+    path = QPainterPath()
+    path.addEllipse(0, 0, size, size)
+    painter.setClipPath(path)
+    painter.drawImage(0, 0, square)
+    painter.end()
+    return avatar
+
+def load_avatar(source_path):
+    # Renders once per distinct source file; later startups only load an 80px PNG
+    try:
+        cache_path = avatar_cache_path(source_path)
+    except OSError:
+        return QPixmap()
+    if os.path.exists(cache_path):
+        pixmap = QPixmap(cache_path)
+        if not pixmap.isNull():
+            return pixmap
+
+    avatar = render_avatar(source_path)
+    if avatar.isNull():
+        return QPixmap()
+    try:
+        os.makedirs(AVATAR_CACHE_DIR, exist_ok=True)
+        # Only the current avatar is worth keeping
+        for name in os.listdir(AVATAR_CACHE_DIR):
+            os.remove(os.path.join(AVATAR_CACHE_DIR, name))
+        avatar.save(cache_path, "PNG")
+    except OSError as e:
+        print(f"Could not cache avatar: {e}")
+    return QPixmap.fromImage(avatar)
+
 class CropDialog(QDialog):
     def __init__(self, image_path, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Crop Profile Photo")
         self.setMinimumSize(600, 600)
 
-        self.image = QPixmap(image_path)
+        # Cropping happens on a downsampled preview; scale maps it back to source pixels
+        self.image_path = image_path
+        preview = read_image(image_path, PREVIEW_MAX_SIZE)
+        self.image = QPixmap.fromImage(preview)
+        reader = QImageReader(image_path)
+        reader.setAutoTransform(True)
+        source_size = reader.size()
+        if reader.transformation() & QImageIOHandler.TransformationRotate90:
+            source_size = source_size.transposed()
+        self.scale = source_size.width() / preview.width() if not preview.isNull() and source_size.isValid() else 1.0
         self.scene = QGraphicsScene()
         self.view = QGraphicsView(self.scene)
         self.view.setRenderHint(QPainter.Antialiasing)
@@ -207,12 +799,29 @@ class CropDialog(QDialog):
         self.setLayout(layout)
 
     def get_cropped_pixmap(self):
-        rect = self.crop_box.rect().toRect()
-        img_rect = rect.intersected(self.image.rect())
-        cropped = self.image.copy(img_rect)
+        # The crop box may have been dragged, so take its rect in scene coordinates. It is kept
+        # inside the image while dragging; clamping (not clipping) again keeps it square.
+        rect = clamp_rect(self.crop_box.mapRectToScene(self.crop_box.rect()), QRectF(self.image.rect()))
+        source_rect = QRect(
+            round(rect.x() * self.scale), round(rect.y() * self.scale),
+            round(rect.width() * self.scale), round(rect.height() * self.scale)
+        )
+
+        reader = QImageReader(self.image_path)
+        reader.setAutoTransform(True)
+        if reader.transformation() == QImageIOHandler.TransformationNone:
+            # Only the cropped region is decoded, already scaled to the output size
+            reader.setClipRect(source_rect)
+            reader.setScaledSize(QSize(PROFILE_PHOTO_SIZE, PROFILE_PHOTO_SIZE))
+            cropped = reader.read()
+        else:
+            # Rotated photos: clip rects are in stored orientation, so crop after the full decode
+            cropped = reader.read().copy(source_rect)
+        if cropped.isNull():
+            cropped = self.image.toImage().copy(rect.toRect())
 
         # Resize to standard square size (e.g., 256x256)
-        return cropped.scaled(256, 256, Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation)
+        return QPixmap.fromImage(cropped.scaled(PROFILE_PHOTO_SIZE, PROFILE_PHOTO_SIZE, Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation))
 class DownloadedVersionSelector(QDialog):
     def __init__(self, username, parent=None):
         super().__init__(parent)
@@ -224,9 +833,10 @@ class DownloadedVersionSelector(QDialog):
         layout = QVBoxLayout(self)
 
         self.edition_dropdown = QComboBox()
-        self.edition_dropdown.addItems(["Vanilla", "Fabric", "Forge"])
+        self.edition_dropdown.addItems(["Vanilla", "Fabric", "Quilt", "Forge", "NeoForge"])
         layout.addWidget(self.edition_dropdown)
 
+        self.index = version_index.get_index(get_minecraft_directory())
         self.model = QStandardItemModel(self)
         self.version_list = QListView()
         self.version_list.setModel(self.model)
@@ -243,15 +853,9 @@ class DownloadedVersionSelector(QDialog):
     def update_versions(self):
         self.model.clear()
         edition = self.edition_dropdown.currentText().lower()
-        versions_dir = os.path.join(minecraft_launcher_lib.utils.get_minecraft_directory(), "versions")
 
-        for folder in os.listdir(versions_dir):
-            if edition == "vanilla" and not ("fabric-loader" in folder or "forge" in folder):
-                self.model.appendRow(QStandardItem(folder))
-            elif edition == "fabric" and "fabric-loader" in folder:
-                self.model.appendRow(QStandardItem(folder))
-            elif edition == "forge" and "forge" in folder:
-                self.model.appendRow(QStandardItem(folder))
+        # One appendRows call rather than a model update per version
+        self.model.invisibleRootItem().appendRows([QStandardItem(version.id) for version in self.index.versions(edition)])
 
     def launch_selected(self):
         selected = self.version_list.selectedIndexes()
@@ -259,22 +863,7 @@ class DownloadedVersionSelector(QDialog):
             version = selected[0].data()
             print(f"Launching: {version}")
             self.accept()
-            minecraft_directory = minecraft_launcher_lib.utils.get_minecraft_directory()
-            options = {
-                "username": self.username,
-                "uuid": "12345678-1234-1234-1234-123456789abc",
-                "token": "faketoken"
-            }
-            try:
-                command = minecraft_launcher_lib.command.get_minecraft_command(
-                    version, minecraft_directory, options
-                )
-                self.parent_window.hide()
-                process = subprocess.Popen(command, creationflags=subprocess.CREATE_NO_WINDOW)
-                process.wait()
-                self.parent_window.show()
-            except Exception as e:
-                print(f"Failed to launch selected version: {e}")
+            self.parent_window.start_launch(version, launch.offline_options(self.username), install=False)
         else:
             QMessageBox.warning(self, "No Version Selected", "Please select a version to launch.")
 
@@ -304,71 +893,41 @@ class FabricVersionSelector(QDialog):
         selected_index = self.version_list.selectedIndexes()
         if selected_index:
             selected_version = selected_index[0].data()
+            minecraft_directory = get_minecraft_directory()
+            game_dir = get_instance_path(selected_version) if self.parent_window.separate_checkbox.isChecked() else minecraft_directory
+            env = launch.fabric_env(game_dir, selected_version)
+            minecraft_version, loader = mods_target(minecraft_directory, selected_version)
+            problems = mods.check(mods.get_index().scan(env["FABRIC_MODS_DIR"]), minecraft_version, loader)
+            if problems:
+                answer = QMessageBox.question(
+                    self, "Mod Problems",
+                    f"Some mods in mods/{selected_version} may not load:\n\n{mod_problems_text(problems)}\n\nLaunch anyway?"
+                )
+                if answer != QMessageBox.Yes:
+                    return
             print(f"Launching Fabric with version: {selected_version}")
             self.accept()
-            minecraft_directory = minecraft_launcher_lib.utils.get_minecraft_directory()
-            options = {
-                "username": self.username,
-                "uuid": "12345678-1234-1234-1234-123456789abc",
-                "token": "faketoken"
-            }
-            try:
-                command = minecraft_launcher_lib.command.get_minecraft_command(
-                    selected_version, minecraft_directory, options
-                )
-                env = os.environ.copy()
-                env["FABRIC_MODS_DIR"] = os.path.join(minecraft_directory, "mods", selected_version)
-                self.parent_window.hide()
-                process = subprocess.Popen(command, env=env, creationflags=subprocess.CREATE_NO_WINDOW)
-                process.wait()
-                self.parent_window.show()
-            except Exception as e:
-                print(f"Error launching Fabric: {e}")
+            self.parent_window.start_launch(
+                selected_version, launch.offline_options(self.username), install=False, env=env,
+                prelaunch=launch.install_customskinloader
+            )
         else:
             print("No Fabric version selected.")
-        self.install_customskinloader(selected_version)
-def launch_minecraft(username, version, mode="Vanilla", offline_mode=False):
-    options = {
-        "username": username,
-        "uuid": "12345678-1234-1234-1234-123456789abc",
-        "token": "faketoken"
-    }
-    minecraft_directory = minecraft_launcher_lib.utils.get_minecraft_directory()
+
+def launch_minecraft(parent, username, version, mode="Vanilla", offline_mode=False):
+    options = launch.offline_options(username)
     if mode.lower() == "fabric":
-        try:
-            print(f"Installing Fabric for Minecraft version: {version}")
-            minecraft_launcher_lib.fabric.install_fabric(version, minecraft_directory)
-            fabric_versions = get_installed_fabric_versions()
-            fabric_selector = FabricVersionSelector(fabric_versions, username, parent=window)
+        # Install in the background, then let the user pick the loader build
+        def show_selector(_):
+            fabric_selector = FabricVersionSelector(get_installed_fabric_versions(), username, parent=parent)
             fabric_selector.exec_()
-            return
-        except Exception as e:
-            print(f"Error handling Fabric installation: {e}")
-            return
-    elif mode.lower() == "forge":
-        try:
-            print(f"Installing Forge for Minecraft version: {version}")
-            minecraft_launcher_lib.forge.install_forge(version, minecraft_directory)
-            command = minecraft_launcher_lib.command.get_minecraft_command(version, minecraft_directory, options)
-            window.hide()
-            process = subprocess.Popen(command, creationflags=subprocess.CREATE_NO_WINDOW)
-            process.wait()
-            window.show()
-        except Exception as e:
-            print(f"Error installing Forge: {e}")
-            return
+            parent.end_pending_trace("cancelled")
+        parent.start_launch(version, options, mode="fabric", on_installed=show_selector)
     else:
-        if not offline_mode:
-            minecraft_launcher_lib.install.install_minecraft_version(version, minecraft_directory)
-        command = minecraft_launcher_lib.command.get_minecraft_command(version, minecraft_directory, options)
-        window.hide()
-        process = subprocess.Popen(command, creationflags=subprocess.CREATE_NO_WINDOW)
-        process.wait()
-        window.show()
+        parent.start_launch(version, options, mode=mode, install=not offline_mode)
 
 def get_instance_path(version_name):
-    base_dir = os.path.join(minecraft_launcher_lib.utils.get_minecraft_directory(), "instances")
-    return os.path.join(base_dir, version_name)
+    return instances.get_instance_path(version_name, get_minecraft_directory())
 class SkinDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -397,13 +956,9 @@ class SkinDialog(QDialog):
             QMessageBox.warning(self, "Missing UUID", "Please enter a UUID.")
             return
         try:
-            url = f"https://crafatar.com/skins/{uuid}"
-            response = requests.get(url, timeout=10)
-            if response.status_code == 200:
-                tmp_file = os.path.join(tempfile.gettempdir(), f"{uuid}.png")
-                with open(tmp_file, "wb") as f:
-                    f.write(response.content)
-                pixmap = QPixmap(tmp_file).scaled(100, 200, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            skin_path = skins.default_cache().fetch(uuid)
+            if skin_path:
+                pixmap = QPixmap(skin_path).scaled(100, 200, Qt.KeepAspectRatio, Qt.SmoothTransformation)
                 self.skin_label.setPixmap(pixmap)
 
                 self.selected_uuid = uuid  # Save UUID
@@ -437,20 +992,15 @@ class CustomSkinLoaderDialog(QDialog):
                 return
 
             try:
-                # Get skin from Crafatar
-                skin_url = f"https://crafatar.com/skins/{username}"
-                r = requests.get(skin_url, timeout=10)
-                if r.status_code != 200:
+                cache = skins.default_cache()
+                blob = cache.fetch(username)
+                if blob is None:
                     QMessageBox.warning(self, "Skin Error", "Skin not found.")
                     return
 
                 # Save to CustomSkinLoader config
-                mc_dir = minecraft_launcher_lib.utils.get_minecraft_directory()
-                csl_dir = os.path.join(mc_dir, "CustomSkinLoader", "Skins")
-                os.makedirs(csl_dir, exist_ok=True)
-                skin_path = os.path.join(csl_dir, f"{username}.png")
-                with open(skin_path, "wb") as f:
-                    f.write(r.content)
+                mc_dir = get_minecraft_directory()
+                cache.install(username, skins.skin_install_dir(mc_dir), blob)
 
                 QMessageBox.information(self, "Skin Set", f"Skin for '{username}' installed.")
                 self.accept()
@@ -489,19 +1039,15 @@ class SkinRedirectDialog(QDialog):
             return
 
         try:
-            skin_url = f"https://crafatar.com/skins/{username1}"
-            r = requests.get(skin_url, timeout=10)
-            if r.status_code != 200:
+            # username2 keeps following username1's skin through the cache
+            cache = skins.default_cache()
+            blob = cache.alias(username2, username1)
+            if blob is None:
                 QMessageBox.warning(self, "Skin Error", f"Could not get skin for {username1}")
                 return
 
-            mc_dir = minecraft_launcher_lib.utils.get_minecraft_directory()
-            skin_dir = os.path.join(mc_dir, "CustomSkinLoader", "Skins")
-            os.makedirs(skin_dir, exist_ok=True)
-
-            skin_path = os.path.join(skin_dir, f"{username2}.png")
-            with open(skin_path, "wb") as f:
-                f.write(r.content)
+            mc_dir = get_minecraft_directory()
+            cache.install(username2, skins.skin_install_dir(mc_dir), blob)
 
             QMessageBox.information(self, "Success", f"{username2} will now use {username1}'s skin.")
             self.accept()
@@ -516,102 +1062,16 @@ class BarrieLauncher(QWidget):
         dialog.exec_()
 
 
-    def install_legacy_forge(self, version_id):
-        mc_dir = minecraft_launcher_lib.utils.get_minecraft_directory()
-        installer_url = "https://maven.minecraftforge.net/net/minecraftforge/forge/1.7.10-10.13.4.1614-1.7.10/forge-1.7.10-10.13.4.1614-1.7.10-installer.jar"
-        installer_path = os.path.join(get_appdata_path(), "forge_installer_1.7.10.jar")
-        version_folder = os.path.join(mc_dir, "versions", version_id)
-
-        try:
-        # Download installer
-            if not os.path.exists(installer_path):
-                r = requests.get(installer_url, stream=True, timeout=30)
-                if r.status_code == 200:
-                    with open(installer_path, "wb") as f:
-                        shutil.copyfileobj(r.raw, f)
-                    print("Forge 1.7.10 installer downloaded.")
-                else:
-                    QMessageBox.warning(self, "Download Failed", "Could not download Forge 1.7.10 installer.")
-                    return
-
-        # Check if Java is installed
-            try:
-                subprocess.run(["java", "-version"], capture_output=True, check=True)
-            except Exception:
-                QMessageBox.critical(self, "Java Missing", "Java is required to install Forge 1.7.10. Please install Java and add it to PATH.")
-                return
-
-        # Run installer
-            subprocess.run(["java", "-jar", installer_path, "--installClient"], cwd=mc_dir, creationflags=subprocess.CREATE_NO_WINDOW)
-
-        # Check if the version folder was created
-            if not os.path.exists(version_folder):
-                QMessageBox.warning(self, "Installation Failed", f"Forge version folder '{version_id}' was not created.")
-                return
-
-        # Ensure required files are there
-            jar_path = os.path.join(version_folder, f"{version_id}.jar")
-            json_path = os.path.join(version_folder, f"{version_id}.json")
-
-            if not os.path.exists(jar_path) or not os.path.exists(json_path):
-            # Copy vanilla jar if missing
-                base_version = "1.7.10"
-                base_jar = os.path.join(mc_dir, "versions", base_version, f"{base_version}.jar")
-                if os.path.exists(base_jar):
-                    shutil.copy(base_jar, jar_path)
-                    print("Base jar copied to Forge folder.")
-                else:
-                    QMessageBox.warning(self, "Missing Base Version", "Minecraft 1.7.10 is not installed. Please install it first.")
-                    return
-
-        # Generate launcher profile
-            self.ensure_launcher_profile_exists(version_id)
-
-        # Launch
-            options = {
-                "username": self.username_input.text().strip(),
-                "uuid": "12345678-1234-1234-1234-123456789abc",
-                "token": "faketoken"
-            }
-            command = minecraft_launcher_lib.command.get_minecraft_command(version_id, mc_dir, options)
-            self.hide()
-            subprocess.Popen(command, creationflags=subprocess.CREATE_NO_WINDOW).wait()
-            self.show()
-
-        except Exception as e:
-            QMessageBox.critical(self, "Forge Install Failed", f"Failed to install Forge 1.7.10:\n{e}")
-
-
     def load_profile_photo(self):
         profile_img_path = os.path.join(get_appdata_path(), "profile.png")
         if not os.path.exists(profile_img_path):
-            profile_img_path = os.path.join(self.assets_dir, "logo.png")
-
-        pixmap = QPixmap(profile_img_path)
-        if pixmap.isNull():
-            return
-
-        size = min(pixmap.width(), pixmap.height())
-        rect = QRect(
-            (pixmap.width() - size) // 2,
-            (pixmap.height() - size) // 2,
-            size,
-            size
-        )
-        cropped = pixmap.copy(rect).scaled(80, 80, Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation)
-
-    # Create circular mask
-        mask = QPixmap(80, 80)
-        mask.fill(Qt.transparent)
-
-        painter = QPainter(mask)
-        painter.setRenderHint(QPainter.Antialiasing)
-        painter.setBrush(Qt.white)
-        painter.drawEllipse(0, 0, 80, 80)
-        painter.end()
+            profile_img_path = assets.asset_path(self.assets_dir, "logo.png")
+            if profile_img_path is None:
+                return
 
-        cropped.setMask(mask.createMaskFromColor(Qt.transparent, Qt.MaskInColor))
-        self.profile_label.setPixmap(cropped)
+        avatar = load_avatar(profile_img_path)
+        if not avatar.isNull():
+            self.profile_label.setPixmap(avatar)
 
     def change_profile_photo(self, event):
         file_path, _ = QFileDialog.getOpenFileName(self, "Select Profile Picture", "", "Images (*.png *.jpg *.jpeg *.bmp)")
@@ -626,126 +1086,120 @@ class BarrieLauncher(QWidget):
 
     
 
-    def auto_download_skin(self, username):
-        try:
-            skin_url = f"https://crafatar.com/skins/{username}"
-            response = requests.get(skin_url, timeout=10)
-            if response.status_code == 200:
-                mc_dir = minecraft_launcher_lib.utils.get_minecraft_directory()
-                csl_dir = os.path.join(mc_dir, "CustomSkinLoader", "Skins")
-                os.makedirs(csl_dir, exist_ok=True)
-                skin_path = os.path.join(csl_dir, f"{username}.png")
-                with open(skin_path, "wb") as f:
-                    f.write(response.content)
-                print(f"Skin downloaded for {username}")
-            else:
-                print(f"Skin not found for {username}")
-        except Exception as e:
-            print(f"Failed to fetch skin for {username}: {e}")
-
-    
-    def fix_forge_missing_jar(self, version_id):
-        mc_dir = minecraft_launcher_lib.utils.get_minecraft_directory()
-        forge_dir = os.path.join(mc_dir, "versions", version_id)
-        forge_jar = os.path.join(forge_dir, f"{version_id}.jar")
-
-        if not os.path.exists(forge_jar):
-            # Extract the base version from Forge string (e.g., "1.7.10-Forge10.13.4.1614-1.7.10" → "1.7.10")
-            base_version = version_id.split('-')[0]
-            vanilla_jar = os.path.join(mc_dir, "versions", base_version, f"{base_version}.jar")
-
-            if os.path.exists(vanilla_jar):
-                os.makedirs(forge_dir, exist_ok=True)
-                shutil.copy(vanilla_jar, forge_jar)
-                print(f"Copied {base_version}.jar to Forge folder as {version_id}.jar")
-            else:
-                QMessageBox.warning(self, "Missing base version",
-                                f"The base version {base_version} is not installed. Please install it first using your launcher.")
-
-    
-    def ensure_launcher_profile_exists(self, version_id):
-        mc_dir = minecraft_launcher_lib.utils.get_minecraft_directory()
-        profile_path = os.path.join(mc_dir, "launcher_profiles.json")
-
-    # Try to load existing JSON if valid
-        if os.path.exists(profile_path):
-            try:
-                with open(profile_path, "r") as f:
-                    data = json.load(f)
-                return  # File is valid, no need to change
-            except json.JSONDecodeError:
-                print("Corrupted launcher_profiles.json, regenerating...")
-
-    # Create a basic valid launcher_profiles.json
-        data = {
-            "profiles": {
-                "forge": {
-                    "name": "Forge",
-                    "lastVersionId": version_id,
-                    "type": "custom"
-                }
-            },
-            "selectedProfile": "forge",
-            "clientToken": "12345678-1234-1234-1234-123456789abc",
-            "launcherVersion": {
-                "name": "custom-launcher",
-                "format": 21
-            }
-        }
+    def auto_download_skin(self, username, trace=None):
+        # Never blocks: the cached skin is installed now and revalidated in the background
+        mc_dir = get_minecraft_directory()
+        skins.default_cache().sync_in_background(username, skins.skin_install_dir(mc_dir), trace=trace)
 
-        with open(profile_path, "w") as f:
-            json.dump(data, f, indent=4)
-        print("Created default launcher_profiles.json for Forge.")
+    def begin_trace(self, **attrs):
+        # One trace per Play click. The launch that eventually starts takes it over; one left
+        # behind (a version picker closed without launching) is finished as abandoned.
+        self.end_pending_trace("abandoned")
+        self.pending_trace = tracing.Trace("launch", **attrs)
+        return self.pending_trace
 
+    def end_pending_trace(self, status):
+        if self.pending_trace is not None:
+            self.pending_trace.finish(status, summary=tracing.summary_enabled())
+            self.pending_trace = None
 
     def install_and_launch_forge(self, username, version_id):
-        minecraft_directory = minecraft_launcher_lib.utils.get_minecraft_directory()
-        options = {
-            "username": username,
-            "uuid": "12345678-1234-1234-1234-123456789abc",
-            "token": "faketoken"
-        }
+        print(f"Installing Forge for Minecraft version: {version_id}")
+        self.start_launch(version_id, launch.offline_options(username), mode="forge")
 
-        try:
-            print(f"Installing Forge for Minecraft version: {version_id}")
-            minecraft_launcher_lib.forge.install_forge(version_id, minecraft_directory)
-        except AttributeError as e:
-            if "install_forge" in str(e) and "1.7.10" in version_id:
-                self.install_legacy_forge(version_id)
-                return
-        
-            else:
-                QMessageBox.warning(self, "Unsupported Forge", f"Automatic installation not supported for Forge {version_id}. Please install it manually from the Forge website.")
-                self.ensure_launcher_profile_exists(version_id)
+    def start_launch(self, version_id, options, mode="vanilla", install=True, env=None, prelaunch=None, on_installed=None):
+        if self.launch_worker is not None and self.launch_worker.isRunning():
+            self.end_pending_trace("busy")
+            QMessageBox.information(self, "Launch In Progress", "Minecraft is already being launched.")
             return
 
-        self.ensure_launcher_profile_exists(version_id)
-        self.fix_forge_missing_jar(version_id)
-
-        try:
-            command = minecraft_launcher_lib.command.get_minecraft_command(version_id, minecraft_directory, options)
+        # Launch paths that did not start from Play (none today) still get a trace of their own
+        trace = self.pending_trace or tracing.Trace("launch", version=version_id, mode=mode.lower())
+        self.pending_trace = None
+        trace.set(launched_version=version_id)
+
+        separate = self.separate_checkbox.isChecked()
+        on_exit = None
+        if mode.lower() == "vanilla" and not separate:
+            # Runs on the manager's waiter thread once the game exits
+            on_exit = lambda _: self.move_logs_and_config()
+        worker = LaunchWorker(
+            version_id, options, mode=mode, install=install, launch=on_installed is None,
+            env=env, prelaunch=prelaunch, on_exit=on_exit, trace=trace, separate=separate, parent=self
+        )
+        worker.phase_changed.connect(self.status_label.setText)
+        worker.progress_changed.connect(self.on_launch_progress)
+        worker.failed.connect(self.on_launch_failed)
+        worker.finished.connect(lambda: self.on_launch_finished(worker))
+        if on_installed is not None:
+            # Hand the trace back so the launch started from on_installed continues it
+            worker.installed.connect(lambda _: setattr(self, "pending_trace", trace))
+            worker.installed.connect(on_installed)
+
+        self.launch_worker = worker
+        self.play_button.setEnabled(False)
+        self.cancel_button.show()
+        self.status_label.show()
+        worker.start()
+
+    def cancel_launch(self):
+        if self.launch_worker is not None:
+            self.launch_worker.cancel()
+
+    def on_launch_progress(self, value, maximum):
+        self.progress_bar.setMaximum(max(maximum, 1))
+        self.progress_bar.setValue(value)
+        self.progress_bar.show()
+
+    def on_launch_failed(self, message):
+        QMessageBox.critical(self, "Launch Error", f"Failed to launch Minecraft:\n{message}")
+
+    def on_launch_finished(self, worker):
+        if self.launch_worker is not worker:
+            return
+        self.launch_worker = None
+        self.play_button.setEnabled(True)
+        self.cancel_button.hide()
+        self.progress_bar.hide()
+
+    def stop_background_work(self, timeout=BACKGROUND_STOP_TIMEOUT):
+        # Waits, up to timeout seconds in all, for the manifest refresh and icon downloads so
+        # none of them is still importing requests or emitting into the window at teardown
+        deadline = time.monotonic() + timeout
+        threads = [self.version_refresh.thread] + self.asset_threads
+        for thread in threads:
+            if thread is not None:
+                thread.join(max(0, deadline - time.monotonic()))
+
+    def closeEvent(self, event):
+        self.end_pending_trace("abandoned")
+        # Let a running session finish instead of destroying its thread
+        if self.launch_worker is not None and self.launch_worker.isRunning():
             self.hide()
-            process = subprocess.Popen(command, creationflags=subprocess.CREATE_NO_WINDOW)
-            process.wait()
-            self.show()
-        except Exception as e:
-            print(f"Failed to launch Forge: {e}")
-
-            
-
+            self.launch_worker.wait()
+        if self.mod_task is not None and self.mod_task.isRunning():
+            self.hide()
+            self.mod_task.wait()
+        super().closeEvent(event)
 
     def __init__(self):
         self.custom_uuid = None  # Will be set by the Skin dialog
         self.selected_uuid = None
+        self.launch_worker = None
+        self.mod_task = None
+        self.pending_trace = None
+        self.instances_dialog = None
+        self.asset_threads = []
         
         super().__init__()
         self.appdata_dir = get_appdata_path()
         self.assets_dir = os.path.join(self.appdata_dir, "assets")
         self.ads_dir = os.path.join(self.appdata_dir, "images")
         self.icon_path = os.path.join(self.assets_dir, "logo.ico")
-        self.ensure_assets_exist()
+        self.asset_notifier = AssetNotifier(self)
+        self.asset_notifier.asset_ready.connect(self.on_asset_ready)
         self.setWindowTitle("Barrie Launcher")
-        self.setWindowIcon(QIcon(self.icon_path))
+        self.setWindowIcon(QIcon(assets.asset_path(self.assets_dir, "logo.ico") or ""))
         self.setMinimumSize(900, 520)
         self.setStyleSheet(self.load_styles())
         main_layout = QHBoxLayout(self)
@@ -771,17 +1225,21 @@ class BarrieLauncher(QWidget):
         self.username_input = QLineEdit()
         self.username_input.setPlaceholderText("Enter your Minecraft username")
         # Load stored settings
-        settings = load_settings()
-        if "username" in settings:
-            self.username_input.setText(settings["username"])
+        settings = get_settings()
+        self.username_input.setText(settings.username)
 
 # Later: we'll apply the version_id as well, once dropdown is filled
-        self.pending_version_id = settings.get("version_id")
+        self.pending_version_id = settings.version_id
 
         sidebar.addWidget(self.username_input)
         # Replace Offline Mode with Fabric Mode checkbox.
         self.downloaded_checkbox = QCheckBox("Downloaded Versions")
         sidebar.addWidget(self.downloaded_checkbox)
+        # Own saves/mods/config per version; game files are linked from one shared store
+        self.separate_checkbox = QCheckBox("Separate Instance")
+        self.separate_checkbox.setChecked(settings.get("separate_instances"))
+        self.separate_checkbox.toggled.connect(lambda checked: get_settings().set("separate_instances", checked))
+        sidebar.addWidget(self.separate_checkbox)
         # sidebar.addWidget(self.fabric_mode_checkbox)
         social_links = [
             ("GitHub", "github.png", "https://github.com/firearz/Barrie-Launcher-Improved"),
@@ -794,13 +1252,15 @@ class BarrieLauncher(QWidget):
 
         
 
+        self.social_buttons = {}
         for name, icon_file, url in social_links:
             btn = QPushButton(name)
             icon_path = os.path.join(self.assets_dir, icon_file)
             if os.path.exists(icon_path):
                 btn.setIcon(QIcon(icon_path))
-            btn.clicked.connect(lambda _, link=url: webbrowser.open(link))
+            btn.clicked.connect(lambda _, link=url: open_link(link))
             sidebar.addWidget(btn)
+            self.social_buttons[icon_file] = btn
         sidebar_frame = QFrame()
         sidebar_frame.setLayout(sidebar)
         sidebar_frame.setFixedWidth(200)
@@ -824,7 +1284,6 @@ class BarrieLauncher(QWidget):
         content_layout.addLayout(header_layout)
 
         title.setFont(QFont("Segoe UI", 24, QFont.Bold))
-        content_layout.addWidget(title)
         tools_layout = QHBoxLayout()
         mods_button = QPushButton("Mods")
         mods_button.clicked.connect(self.open_mods_menu)
@@ -835,6 +1294,11 @@ class BarrieLauncher(QWidget):
         tools_layout.addWidget(mods_button)
         tools_layout.addWidget(rp_button)
         tools_layout.addWidget(sodium_button)
+        instances_button = QPushButton("Instances")
+        instances_button.clicked.connect(self.open_instances_dialog)
+        tools_layout.addWidget(instances_button)
+        self.process_notifier = ProcessNotifier(self)
+        processes.get_manager().subscribe(self.process_notifier.instance_event.emit)
         content_layout.addLayout(tools_layout)
         edition_label = QLabel("Select Minecraft Edition")
         edition_label.setStyleSheet("font-weight: bold;")
@@ -849,6 +1313,9 @@ class BarrieLauncher(QWidget):
         self.versions = get_available_versions()
         for label, version in self.versions:
             self.version_dropdown.addItem(label, version)
+        self.version_refresh = VersionRefresher(settings.version_cache_ttl, parent=self)
+        self.version_refresh.versions_ready.connect(self.update_version_dropdown)
+        self.version_refresh.start()
         # Apply stored version selection
         if self.pending_version_id:
             index = self.version_dropdown.findData(self.pending_version_id)
@@ -860,11 +1327,50 @@ class BarrieLauncher(QWidget):
         self.play_button.setObjectName("playButton")
         self.play_button.clicked.connect(self.on_play_clicked)
         content_layout.addWidget(self.play_button)
+        self.progress_bar = QProgressBar()
+        self.progress_bar.hide()
+        content_layout.addWidget(self.progress_bar)
+        status_layout = QHBoxLayout()
+        self.status_label = QLabel()
+        self.status_label.hide()
+        status_layout.addWidget(self.status_label)
+        status_layout.addStretch()
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.clicked.connect(self.cancel_launch)
+        self.cancel_button.hide()
+        status_layout.addWidget(self.cancel_button)
+        content_layout.addLayout(status_layout)
         footer = QLabel("© 2025 Barrie Launcher | Powered by Minecraft Launcher Lib")
         footer.setAlignment(Qt.AlignCenter)
         footer.setObjectName("footer")
         content_layout.addWidget(footer)
         main_layout.addLayout(content_layout)
+        self.ensure_assets_exist()
+
+    def update_version_dropdown(self, labeled_versions):
+        # Patch the combo in place so the user's current pick is kept
+        current = self.version_dropdown.currentData()
+        wanted = {version for _, version in labeled_versions}
+        for index in range(self.version_dropdown.count() - 1, -1, -1):
+            if self.version_dropdown.itemData(index) not in wanted:
+                self.version_dropdown.removeItem(index)
+
+        for position, (label, version) in enumerate(labeled_versions):
+            index = self.version_dropdown.findData(version)
+            if index == position:
+                if self.version_dropdown.itemText(index) != label:
+                    self.version_dropdown.setItemText(index, label)
+                continue
+            if index != -1:
+                self.version_dropdown.removeItem(index)
+            self.version_dropdown.insertItem(position, label, version)
+
+        self.versions = labeled_versions
+        selected = current or self.pending_version_id
+        if selected:
+            index = self.version_dropdown.findData(selected)
+            if index != -1:
+                self.version_dropdown.setCurrentIndex(index)
 
     def load_styles(self):
         return """
@@ -904,143 +1410,72 @@ class BarrieLauncher(QWidget):
             font-size: 11px;
         }
         """
+    def open_instances_dialog(self):
+        # Non-modal so it can stay open next to the game windows
+        if self.instances_dialog is None:
+            self.instances_dialog = InstancesDialog(self.process_notifier, self)
+        self.instances_dialog.show()
+        self.instances_dialog.raise_()
+
     def move_logs_and_config(self):
-        mc_dir = minecraft_launcher_lib.utils.get_minecraft_directory()
-        launcher_dir = get_appdata_path()
-
-    # Move logs
-        logs_src = os.path.join(mc_dir, "logs")
-        logs_dst = os.path.join(launcher_dir, "logs")
-        if os.path.exists(logs_src):
-            shutil.rmtree(logs_dst, ignore_errors=True)
-            shutil.copytree(logs_src, logs_dst)
-            print("Copied logs to BarrieLauncher directory.")
-
-    # Move config
-        config_src = os.path.join(mc_dir, "config")
-        config_dst = os.path.join(launcher_dir, "config")
-        if os.path.exists(config_src):
-            shutil.rmtree(config_dst, ignore_errors=True)
-            shutil.copytree(config_src, config_dst)
-            print("Copied config to BarrieLauncher directory.")
-
-    # Move CustomSkinLoader
-        skin_src = os.path.join(mc_dir, "CustomSkinLoader")
-        skin_dst = os.path.join(launcher_dir, "CustomSkinLoader")
-        if os.path.exists(skin_src):
-            shutil.rmtree(skin_dst, ignore_errors=True)
-            shutil.copytree(skin_src, skin_dst)
-            print("Copied CustomSkinLoader to BarrieLauncher directory.")
+        # Incremental mirror of logs, config and CustomSkinLoader, run off the GUI thread
+        mc_dir = get_minecraft_directory()
+        sync.sync_launcher_data_in_background(mc_dir, get_appdata_path())
 
     def on_play_clicked(self):
         username = self.username_input.text().strip()
         version_index = self.version_dropdown.currentIndex()
         version_id = self.version_dropdown.itemData(version_index)
 
+        edition = self.edition_dropdown.currentText()
+        trace = self.begin_trace(version=version_id, edition=edition.lower(), downloaded=self.downloaded_checkbox.isChecked())
+
 # Save settings
-        save_settings(username, version_id)
+        with trace.span("settings"):
+            settings = get_settings()
+            settings.update(username=username, version_id=version_id or "")
 
-        self.auto_download_skin(username)
         if not username:
+            self.end_pending_trace("invalid")
             QMessageBox.warning(self, "Missing Username", "Please enter a Minecraft username.")
             return
+        self.auto_download_skin(username, trace=trace)
 
-        version_index = self.version_dropdown.currentIndex()
-        version_id = self.version_dropdown.itemData(version_index)
-        edition = self.edition_dropdown.currentText()
-        
         if not version_id:
+            self.end_pending_trace("invalid")
             QMessageBox.warning(self, "Invalid Selection", "Please select a valid Minecraft version.")
             return
 
-        settings = load_settings()
-        allocated_ram_mb = settings.get("ram_mb", 2048)  # fallback 2 GB
-        print(f"Allocated RAM from settings: {allocated_ram_mb} MB")
-        
-
-
-        options = {
-            "username": username,
-            "uuid": "12345678-1234-1234-1234-123456789abc",
-            "token": "faketoken",
-            "jvmArguments": [f"-Xmx{allocated_ram_mb}M", f"-Xms{allocated_ram_mb}M"]
-        }
-        
+        options = launch.offline_options(username)
 
     # If Downloaded Versions checkbox is checked
         if self.downloaded_checkbox.isChecked():
             dialog = DownloadedVersionSelector(username, parent=self)
             dialog.exec_()
-            return
-
-        if self.downloaded_checkbox.isChecked():
-            dialog = DownloadedVersionSelector(username, parent=self)
-            dialog.exec_()
+            # Still pending if the dialog was closed without launching
+            self.end_pending_trace("cancelled")
             return
 
         if edition.lower() == "fabric":
             # If downloaded_checkbox is *not* checked, install Fabric instead
-            launch_minecraft(username, version_id, mode="Fabric")
+            launch_minecraft(self, username, version_id, mode="Fabric")
 
         elif edition.lower() == "forge":
             self.install_and_launch_forge(username, version_id)
 
         else:
-            try:
-                minecraft_launcher_lib.install.install_minecraft_version(
-                    version_id,
-                    minecraft_launcher_lib.utils.get_minecraft_directory()
-                )
-                command = minecraft_launcher_lib.command.get_minecraft_command(
-                version_id,
-                minecraft_launcher_lib.utils.get_minecraft_directory(),
-                options
-                )
-
-# Inject RAM allocation manually
-                jvm_args = [f"-Xmx{allocated_ram_mb}M", f"-Xms{allocated_ram_mb}M"]
-                command.insert(2, " ".join(jvm_args))  # Insert after 'java' and '-cp'
-                print("Launching with command:", " ".join(command))
-
-
-                self.hide()
-                subprocess.Popen(command, creationflags=subprocess.CREATE_NO_WINDOW).wait()
-                self.show()
-                self.move_logs_and_config()
-
-            except Exception as e:
-                QMessageBox.critical(self, "Launch Error", f"Failed to launch Minecraft:\n{e}")
-
-        def install_customskinloader(self, fabric_version):
-            mods_dir = os.path.join(minecraft_launcher_lib.utils.get_minecraft_directory(), "mods", fabric_version)
-            os.makedirs(mods_dir, exist_ok=True)
-
-            csl_path = os.path.join(mods_dir, "CustomSkinLoader.jar")
-            if not os.path.exists(csl_path):
-                try:
-                    print("Downloading CustomSkinLoader...")
-                    url = "https://github.com/xfl03/CustomSkinLoader/releases/latest/download/CustomSkinLoader_Fabric.jar"
-                    r = requests.get(url, stream=True, timeout=15)
-                    if r.status_code == 200:
-                        with open(csl_path, "wb") as f:
-                            shutil.copyfileobj(r.raw, f)
-                        print("CustomSkinLoader installed.")
-                    else:
-                        print("Failed to download CustomSkinLoader.")
-                except Exception as e:
-                    print(f"Error downloading CustomSkinLoader: {e}")
-    
+            self.start_launch(version_id, options)
 
     def open_mods_menu(self):
-        mods_path = os.path.join(minecraft_launcher_lib.utils.get_minecraft_directory(), "mods")
-        os.makedirs(mods_path, exist_ok=True)
-        os.startfile(mods_path)  # Windows only
+        version_id = self.version_dropdown.itemData(self.version_dropdown.currentIndex())
+        dialog = ModsDialog(version_id or None, self.edition_dropdown.currentText().lower(), parent=self)
+        dialog.exec_()
 
 
 
 
     def open_resourcepacks_folder(self):
-        rp_path = os.path.join(minecraft_launcher_lib.utils.get_minecraft_directory(), "resourcepacks")
+        rp_path = os.path.join(get_minecraft_directory(), "resourcepacks")
         os.makedirs(rp_path, exist_ok=True)
         os.startfile(rp_path)
 
@@ -1052,54 +1487,46 @@ class BarrieLauncher(QWidget):
             QMessageBox.warning(self, "No Version Selected", "Please select a Minecraft version first.")
             return
 
-        mods_folder = os.path.join(minecraft_launcher_lib.utils.get_minecraft_directory(), "mods")
-        os.makedirs(mods_folder, exist_ok=True)
+        if self.mod_task is not None and self.mod_task.isRunning():
+            QMessageBox.information(self, "Busy", "Mods are already being downloaded.")
+            return
 
-        try:
-            response = requests.get("https://api.modrinth.com/v2/project/AANobbMI/version", timeout=15)
-            versions_data = response.json()
-            for v in versions_data:
-                if version_id in v["game_versions"]:
-                    for file in v["files"]:
-                        if file["filename"].endswith(".jar"):
-                            sodium_url = file["url"]
-                            sodium_file_path = os.path.join(mods_folder, file["filename"])
-                            r = requests.get(sodium_url, stream=True, timeout=15)
-                            if r.status_code == 200:
-                                with open(sodium_file_path, "wb") as f:
-                                    shutil.copyfileobj(r.raw, f)
-                                QMessageBox.information(self, "Success", f"Sodium installed to mods folder:\n{file['filename']}")
-                            else:
-                                QMessageBox.warning(self, "Download Failed", "Failed to download the Sodium jar.")
-                            return
-            else:
-                QMessageBox.warning(self, "Not Found", f"No Sodium version found for Minecraft {version_id}")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error installing Sodium:\n{e}")
+        mods_folder = os.path.join(get_minecraft_directory(), "mods")
+        os.makedirs(mods_folder, exist_ok=True)
+        # Sodium ships for Fabric, Quilt and NeoForge; anything else gets the Fabric build as before
+        edition = self.edition_dropdown.currentText().lower()
+        loader = edition if edition in ("fabric", "quilt", "neoforge") else "fabric"
+
+        # Sodium and whatever it requires; version lists are cached with a TTL and jars checked against their sha512
+        client = modrinth.get_client()
+        task = BackgroundTask(lambda: client.install_plan(client.plan([modrinth.SODIUM], version_id, loader, mods_folder), mods_folder), parent=self)
+        task.succeeded.connect(lambda paths: QMessageBox.information(
+            self, "Success", "Sodium installed to mods folder:\n" + "\n".join(os.path.basename(path) for path in paths)
+        ))
+        task.failed.connect(lambda message: QMessageBox.critical(self, "Error", f"Error installing Sodium:\n{message}"))
+        self.mod_task = task
+        task.start()
 
     def ensure_assets_exist(self):
-        os.makedirs(self.assets_dir, exist_ok=True)
+        # Missing icons are fetched in the background; the bundled fallbacks are
+        # shown until on_asset_ready swaps the downloaded files in
         os.makedirs(self.ads_dir, exist_ok=True)
-        default_assets = {
-            "logo.png": "https://i.postimg.cc/6px5gGRg/logo.png",
-            "logo.ico": "https://raw.githubusercontent.com/firearz/Barrie-Launcher-Improved/refs/heads/main/icon.ico",
-            "github.png": "https://img.icons8.com/?size=512&id=bVGqATNwfhYq&format=png",
-            "youtube.png": "https://img.icons8.com/?size=512&id=szxM3fi4e37N&format=png",
-            "instagram.png": "https://img.icons8.com/?size=512&id=YtpeVQhQ8USm&format=png"
-        }
-        for name, url in default_assets.items():
-            path = os.path.join(self.assets_dir, name)
-            if not os.path.exists(path):
-                try:
-                    r = requests.get(url, stream=True, timeout=10)
-                    if r.status_code == 200:
-                        with open(path, 'wb') as f:
-                            shutil.copyfileobj(r.raw, f)
-                except Exception as e:
-                    print(f"Failed to download {name}: {e}")
+        self.asset_threads = assets.fetch_missing_assets(self.assets_dir, self.asset_notifier.asset_ready.emit)
+
+    def on_asset_ready(self, name, path):
+        if name == "logo.ico":
+            self.setWindowIcon(QIcon(path))
+        elif name == "logo.png":
+            self.load_profile_photo()
+        elif name in self.social_buttons:
+            self.social_buttons[name].setIcon(QIcon(path))
 
 
 if __name__ == "__main__":
+    profile = startup.StartupProfile(_STARTED_AT) if startup.requested(sys.argv) else None
+    if profile:
+        profile.mark("imports")
+
     # Create AppData directory if it doesn't exist
     appdata_path = get_appdata_path()
     os.makedirs(appdata_path, exist_ok=True)
@@ -1109,7 +1536,22 @@ if __name__ == "__main__":
 
     # Start the launcher UI
     app = QApplication(sys.argv)
+    budget = startup.budget_ms(sys.argv)
     window = BarrieLauncher()
+    # A budget run quits right after first paint, while the startup downloads are still going
+    app.aboutToQuit.connect(window.stop_background_work)
+    if profile:
+        profile.mark("window")
+
+        def report_startup(profile):
+            total = profile.report()["total"]
+            if budget is not None:
+                # Budget runs are checks, not sessions: quit as soon as the window is up
+                if total > budget:
+                    print(f"Startup took {total} ms, over the {budget:g} ms budget")
+                app.exit(1 if total > budget else 0)
+
+        probe = FirstPaintProbe(profile, report_startup)
+        window.installEventFilter(probe)
     window.show()
     sys.exit(app.exec())
-
@@ -0,0 +1,159 @@
+# Launcher hot paths on synthetic data, with minecraft_launcher_lib and the version manifest
+# server stubbed out. Every module is marked benchmark, which a plain pytest run deselects.
+# Run them with pytest-benchmark's JSON output to track releases:
+#
+#   pytest -m benchmark --benchmark-json=results.json
+#   pytest -m benchmark --benchmark-compare=0001 --benchmark-compare-fail=median:25%
+import os
+import sys
+import json
+import types
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+VERSION_COUNT = 5000
+MANIFEST_COUNT = 800
+LOG_FILES = 5000
+LOG_SIZE = 1024
+CLASSPATH_JARS = 150
+
+
+def build_versions(mc_dir, count):
+    # Mostly vanilla, with Fabric and Forge profiles inheriting from them
+    libraries = [{"name": f"org.example:lib{i}:1.0", "downloads": {"artifact": {"path": f"org/example/lib{i}.jar"}}} for i in range(20)]
+    for i in range(count):
+        kind = i % 10
+        if kind < 6:
+            version_id = f"1.{i}"
+            data = {"id": version_id, "type": "release", "mainClass": "net.minecraft.client.main.Main", "libraries": libraries}
+        elif kind < 9:
+            version_id = f"fabric-loader-0.15.{i}-1.{i - kind}"
+            data = {
+                "id": version_id, "inheritsFrom": f"1.{i - kind}", "mainClass": "net.fabricmc.loader.impl.launch.knot.KnotClient",
+                "libraries": [{"name": "net.fabricmc:fabric-loader:0.15.0"}]
+            }
+        else:
+            version_id = f"1.{i - kind}-forge-47.{i}"
+            data = {
+                "id": version_id, "inheritsFrom": f"1.{i - kind}", "mainClass": "cpw.mods.bootstraplauncher.BootstrapLauncher",
+                "libraries": [{"name": "net.minecraftforge:forge:47.0"}]
+            }
+        version_dir = os.path.join(mc_dir, "versions", version_id)
+        os.makedirs(version_dir, exist_ok=True)
+        with open(os.path.join(version_dir, f"{version_id}.json"), "w") as f:
+            json.dump(data, f)
+
+
+def build_log_tree(mc_dir, files, size):
+    for i in range(files):
+        folder = ("logs", "config", "CustomSkinLoader")[i % 3]
+        path = os.path.join(mc_dir, folder, f"mod{i % 150:03d}", f"file{i}.txt")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(os.urandom(size))
+
+
+def build_classpath(mc_dir, count):
+    paths = []
+    for i in range(count):
+        path = os.path.join(mc_dir, "libraries", f"lib{i}", f"lib{i}.jar")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(b"PK")
+        paths.append(path)
+    return paths
+
+
+def manifest(count):
+    types_cycle = ["release", "snapshot", "snapshot", "old_beta"]
+    return {
+        "latest": {"release": "1.0.0", "snapshot": "1.0.0"},
+        "versions": [
+            {
+                "id": f"1.{i // 100}.{i % 100}",
+                "type": types_cycle[i % len(types_cycle)],
+                "url": f"https://example.invalid/v/{i}.json",
+                "time": "2024-01-01T00:00:00+00:00",
+                "releaseTime": "2024-01-01T00:00:00+00:00",
+                "sha1": "0" * 40,
+                "complianceLevel": 1
+            }
+            for i in range(count)
+        ]
+    }
+
+
+@pytest.fixture(scope="session")
+def mc_dir(tmp_path_factory):
+    mc_dir = str(tmp_path_factory.mktemp("minecraft"))
+    build_versions(mc_dir, VERSION_COUNT)
+    build_log_tree(mc_dir, LOG_FILES, LOG_SIZE)
+    return mc_dir
+
+
+@pytest.fixture(scope="session")
+def fake_launcher_lib(mc_dir):
+    # Stands in for minecraft_launcher_lib so command building never touches real files or java
+    classpath = build_classpath(mc_dir, CLASSPATH_JARS)
+    fake = types.ModuleType("minecraft_launcher_lib")
+    fake.command = types.ModuleType("minecraft_launcher_lib.command")
+    fake.utils = types.ModuleType("minecraft_launcher_lib.utils")
+
+    def get_minecraft_command(version_id, mc_dir, options):
+        return (
+            ["/usr/bin/java"] + list(options.get("jvmArguments", []))
+            + ["-cp", os.pathsep.join(classpath), "net.minecraft.client.main.Main", "--username", options["username"], "--version", version_id]
+        )
+
+    fake.command.get_minecraft_command = get_minecraft_command
+    fake.utils.get_minecraft_directory = lambda: mc_dir
+    with pytest.MonkeyPatch.context() as patch:
+        for name, module in (("minecraft_launcher_lib", fake), ("minecraft_launcher_lib.command", fake.command), ("minecraft_launcher_lib.utils", fake.utils)):
+            patch.setitem(sys.modules, name, module)
+        yield fake
+
+
+@pytest.fixture(scope="session")
+def manifest_server():
+    payload = json.dumps(manifest(MANIFEST_COUNT)).encode("utf-8")
+    etag = '"bench"'
+
+    class ManifestHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ManifestHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/version_manifest_v2.json"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(scope="session")
+def launcher(mc_dir):
+    # main with its Minecraft directory pointed at the synthetic tree
+    import main
+    from PySide6.QtWidgets import QApplication
+    QApplication.instance() or QApplication([])
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(main, "get_minecraft_directory", lambda: mc_dir)
+        yield main
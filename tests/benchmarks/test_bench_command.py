@@ -0,0 +1,36 @@
+import os
+
+import pytest
+
+from barrie import command_cache
+
+pytestmark = pytest.mark.benchmark
+
+OPTIONS = {"username": "bench", "uuid": "0", "token": "0", "jvmArguments": ["-Xmx2048M"]}
+
+
+@pytest.fixture
+def cache_path(tmp_path, fake_launcher_lib):
+    return str(tmp_path / "command_cache.json")
+
+
+def test_miss(benchmark, mc_dir, cache_path):
+    def drop_cache():
+        if os.path.exists(cache_path):
+            os.remove(cache_path)
+
+    command = benchmark.pedantic(
+        lambda: command_cache.CommandCache(cache_path).get_command("1.0", mc_dir, OPTIONS), setup=drop_cache, rounds=20
+    )
+    assert command[-1] == "1.0"
+
+
+def test_hit(benchmark, mc_dir, cache_path):
+    warm = command_cache.CommandCache(cache_path)
+    first = warm.get_command("1.0", mc_dir, OPTIONS)
+    assert benchmark(warm.get_command, "1.0", mc_dir, OPTIONS) == first
+
+
+def test_hit_from_disk(benchmark, mc_dir, cache_path):
+    first = command_cache.CommandCache(cache_path).get_command("1.0", mc_dir, OPTIONS)
+    assert benchmark(lambda: command_cache.CommandCache(cache_path).get_command("1.0", mc_dir, OPTIONS)) == first
@@ -0,0 +1,69 @@
+import os
+import time
+import shutil
+import hashlib
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+from barrie import installer
+
+pytestmark = pytest.mark.benchmark
+
+OBJECT_COUNT = 300
+OBJECT_SIZE = 8 * 1024
+# Simulated round-trip to resources.download.minecraft.net
+LATENCY = 0.01
+
+
+@pytest.fixture(scope="module")
+def objects():
+    objects = {}
+    for _ in range(OBJECT_COUNT):
+        data = os.urandom(OBJECT_SIZE)
+        objects[hashlib.sha1(data).hexdigest()] = data
+    return objects
+
+
+@pytest.fixture(scope="module")
+def mirror(objects):
+    class MirrorHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            data = objects.get(self.path.rsplit("/", 1)[-1])
+            time.sleep(LATENCY)
+            if data is None:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MirrorHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize("workers", [1, installer.DEFAULT_WORKERS])
+def test_asset_downloads(benchmark, objects, mirror, tmp_path, workers):
+    # Sequential against pooled downloads of a fresh asset index
+    asset_index = {"objects": {f"obj/{i}": {"hash": digest, "size": len(data)} for i, (digest, data) in enumerate(objects.items())}}
+    mc_dir = str(tmp_path / "minecraft")
+    tasks = installer.asset_tasks(asset_index, mc_dir, mirror)
+    benchmark.pedantic(
+        installer.download_all, args=(tasks,), kwargs={"max_workers": workers},
+        setup=lambda: shutil.rmtree(mc_dir, ignore_errors=True), rounds=3
+    )
+    assert sum(len(files) for _, _, files in os.walk(mc_dir)) == OBJECT_COUNT
@@ -0,0 +1,43 @@
+import os
+
+import pytest
+
+from barrie import version_index
+
+from .conftest import VERSION_COUNT
+
+pytestmark = pytest.mark.benchmark
+
+
+def forget_indexes():
+    version_index._indexes.clear()
+
+
+def drop_index():
+    if os.path.exists(version_index.INDEX_CACHE_FILE):
+        os.remove(version_index.INDEX_CACHE_FILE)
+    forget_indexes()
+
+
+def test_index_cold(benchmark, mc_dir):
+    found = benchmark.pedantic(lambda: version_index.get_index(mc_dir).versions(), setup=drop_index, rounds=5)
+    assert len(found) == VERSION_COUNT
+
+
+def test_index_from_disk_cache(benchmark, mc_dir):
+    version_index.get_index(mc_dir).versions()
+    found = benchmark.pedantic(lambda: version_index.get_index(mc_dir).versions(), setup=forget_indexes, rounds=20)
+    assert len(found) == VERSION_COUNT
+
+
+@pytest.mark.parametrize("edition, count", [("Vanilla", 3000), ("Fabric", 1500), ("Forge", 500)])
+def test_downloaded_selector_update_versions(benchmark, launcher, edition, count):
+    version_index.get_index(launcher.get_minecraft_directory()).versions()
+    dialog = launcher.DownloadedVersionSelector("bench")
+    dialog.edition_dropdown.setCurrentText(edition)
+    benchmark.pedantic(dialog.update_versions, rounds=10)
+    assert dialog.model.rowCount() == count
+
+
+def test_installed_fabric_versions(benchmark, launcher):
+    assert len(benchmark(launcher.get_installed_fabric_versions)) == 1500
@@ -0,0 +1,25 @@
+import pytest
+
+from barrie import settings
+
+pytestmark = pytest.mark.benchmark
+
+
+def test_load_update_flush(benchmark, tmp_path):
+    path = str(tmp_path / "settings.json")
+    names = iter(range(10 ** 9))
+
+    def round_trip():
+        store = settings.Settings(path)
+        store.update(username=f"user{next(names)}", ram_mb=4096)
+        store.flush()
+
+    benchmark(round_trip)
+    assert settings.Settings(path).get("ram_mb") == 4096
+
+
+def test_debounced_updates(benchmark, tmp_path):
+    store = settings.Settings(str(tmp_path / "settings.json"))
+    benchmark(lambda: [store.set("ram_mb", 1024 + n) for n in range(100)])
+    store.flush()
+    assert settings.Settings(str(tmp_path / "settings.json")).get("ram_mb") == 1123
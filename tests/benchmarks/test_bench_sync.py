@@ -0,0 +1,66 @@
+import os
+import shutil
+import random
+
+import pytest
+
+from barrie import sync
+
+pytestmark = pytest.mark.benchmark
+
+TREE_FILES = 5000
+TREE_FILE_SIZE = 2048
+
+
+def test_cold_mirror(benchmark, mc_dir, tmp_path):
+    launcher_dir = str(tmp_path / "launcher")
+    benchmark.pedantic(
+        sync.sync_launcher_data, args=(mc_dir, launcher_dir), setup=lambda: shutil.rmtree(launcher_dir, ignore_errors=True), rounds=5
+    )
+
+
+def test_warm_mirror(benchmark, mc_dir, tmp_path):
+    launcher_dir = str(tmp_path / "launcher")
+    sync.sync_launcher_data(mc_dir, launcher_dir)
+    benchmark(sync.sync_launcher_data, mc_dir, launcher_dir)
+
+
+@pytest.fixture(scope="module")
+def config_tree(tmp_path_factory):
+    # Shaped like a modpack's config folder: many small files spread over per-mod folders
+    root = str(tmp_path_factory.mktemp("config"))
+    paths = []
+    for i in range(TREE_FILES):
+        path = os.path.join(root, f"mod{i % 200:03d}", f"sub{i % 7}", f"file{i}.cfg")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(os.urandom(TREE_FILE_SIZE))
+        paths.append(path)
+    return root, paths
+
+
+def touch(paths, count):
+    for path in random.sample(paths, count):
+        with open(path, "ab") as f:
+            f.write(b"x")
+
+
+@pytest.mark.parametrize("changed", [0, 10, 100, 1000])
+def test_warm_sync_tree(benchmark, config_tree, tmp_path, changed):
+    src, paths = config_tree
+    dst = str(tmp_path / "dst")
+    sync.sync_tree(src, dst)
+    stats = benchmark.pedantic(sync.sync_tree, args=(src, dst), setup=lambda: touch(paths, changed), rounds=5)
+    assert stats["copied"] == changed
+
+
+def test_copytree_baseline(benchmark, config_tree, tmp_path):
+    # What every sync cost before sync_tree: throw the mirror away and copy it all again
+    src, _ = config_tree
+    dst = str(tmp_path / "dst")
+
+    def copy_all():
+        shutil.rmtree(dst, ignore_errors=True)
+        shutil.copytree(src, dst)
+
+    benchmark.pedantic(copy_all, rounds=5)
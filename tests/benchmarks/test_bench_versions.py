@@ -0,0 +1,39 @@
+import os
+
+import pytest
+
+from barrie import versions
+
+pytestmark = pytest.mark.benchmark
+
+
+@pytest.fixture
+def stub_manifest(manifest_server, monkeypatch):
+    monkeypatch.setattr(versions, "VERSION_API", manifest_server)
+
+
+def drop_manifest_cache():
+    for path in (versions.MANIFEST_CACHE_FILE, versions.LEGACY_VERSION_FILE):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def test_offline_without_cache(benchmark, launcher):
+    benchmark.pedantic(launcher.get_available_versions, kwargs={"offline": True}, setup=drop_manifest_cache, rounds=20)
+
+
+def test_online_full_download(benchmark, stub_manifest):
+    cache, _ = benchmark(versions.refresh_manifest, None)
+    assert len(cache["versions"]) == 800
+
+
+def test_online_not_modified(benchmark, stub_manifest):
+    cache, _ = versions.refresh_manifest(None)
+    _, changed = benchmark(versions.refresh_manifest, cache)
+    assert not changed
+
+
+def test_cached(benchmark, launcher, stub_manifest):
+    versions.refresh_manifest(None)
+    labeled = benchmark(launcher.get_available_versions)
+    assert len(labeled) == 800
@@ -0,0 +1,8 @@
+import os
+import tempfile
+
+# barrie computes its app data paths at import time, so they are pointed at a throwaway
+# folder before any test module imports it
+_appdata = tempfile.TemporaryDirectory(prefix="barrie-tests-")
+os.environ["APPDATA"] = _appdata.name
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
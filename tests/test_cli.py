@@ -0,0 +1,64 @@
+import os
+import json
+
+import pytest
+
+from barrie import cli, launch
+
+
+def write_profile(mc_dir, version_id, **data):
+    version_dir = os.path.join(mc_dir, "versions", version_id)
+    os.makedirs(version_dir)
+    with open(os.path.join(version_dir, f"{version_id}.json"), "w") as f:
+        json.dump(dict(data, id=version_id), f)
+
+
+def fabric(mc_dir, loader, minecraft="1.20.1"):
+    version_id = f"fabric-loader-{loader}-{minecraft}"
+    write_profile(mc_dir, version_id, inheritsFrom=minecraft, mainClass="net.fabricmc.loader.impl.launch.knot.KnotClient")
+    return version_id
+
+
+def forge(mc_dir, loader, minecraft="1.20.1"):
+    version_id = f"{minecraft}-forge-{loader}"
+    write_profile(mc_dir, version_id, inheritsFrom=minecraft, mainClass="cpw.mods.bootstraplauncher.BootstrapLauncher",
+                  libraries=[{"name": f"net.minecraftforge:forge:{minecraft}-{loader}"}])
+    return version_id
+
+
+def test_newest_fabric_loader_is_picked_by_version_number(tmp_path):
+    mc_dir = str(tmp_path)
+    fabric(mc_dir, "0.15.9")
+    newest = fabric(mc_dir, "0.15.11")
+    fabric(mc_dir, "0.16.0", minecraft="1.21")
+    assert cli.resolve_profile(mc_dir, "1.20.1", "fabric") == newest
+
+
+def test_installed_profile_id_is_used_as_is(tmp_path):
+    mc_dir = str(tmp_path)
+    older = fabric(mc_dir, "0.15.9")
+    fabric(mc_dir, "0.15.11")
+    assert cli.resolve_profile(mc_dir, older, "fabric") == older
+
+
+def test_newest_forge_profile_is_picked(tmp_path):
+    mc_dir = str(tmp_path)
+    forge(mc_dir, "47.2.0")
+    newest = forge(mc_dir, "47.10.1")
+    fabric(mc_dir, "0.15.11")
+    assert cli.resolve_profile(mc_dir, "1.20.1", "forge") == newest
+
+
+def test_missing_profile_is_an_error(tmp_path):
+    mc_dir = str(tmp_path)
+    fabric(mc_dir, "0.15.11")
+    with pytest.raises(launch.LaunchError, match="No Forge profile"):
+        cli.resolve_profile(mc_dir, "1.20.1", "forge")
+
+
+def test_forge_launch_without_install_does_not_fall_back_to_vanilla(tmp_path, capsys):
+    mc_dir = str(tmp_path)
+    write_profile(mc_dir, "1.20.1", mainClass="net.minecraft.client.main.Main")
+    argv = ["launch", "1.20.1", "--mode", "forge", "--no-install", "-u", "Steve", "--print-command", "--minecraft-dir", mc_dir]
+    assert cli.main(argv) == 1
+    assert "No Forge profile is installed for 1.20.1" in capsys.readouterr().err
@@ -0,0 +1,121 @@
+import os
+import sys
+import json
+import types
+
+import pytest
+
+from barrie import command_cache
+
+
+@pytest.fixture
+def built(monkeypatch):
+    # Stands in for minecraft_launcher_lib: the command is the version's libraries on a
+    # classpath, resolved through inheritsFrom. Every version id it builds for is recorded.
+    built = []
+
+    def get_minecraft_command(version_id, mc_dir, options):
+        built.append(version_id)
+        libraries = []
+        for path in command_cache.inheritance_chain(version_id, mc_dir):
+            with open(path) as f:
+                libraries += json.load(f).get("libraries", [])
+        classpath = os.pathsep.join(os.path.join(mc_dir, "libraries", name) for name in libraries)
+        return ["java", "-cp", classpath, "net.minecraft.client.main.Main", "--username", options["username"]]
+
+    fake = types.ModuleType("minecraft_launcher_lib")
+    fake.command = types.SimpleNamespace(get_minecraft_command=get_minecraft_command)
+    monkeypatch.setitem(sys.modules, "minecraft_launcher_lib", fake)
+    return built
+
+
+def write_version(mc_dir, version_id, **data):
+    path = os.path.join(mc_dir, "versions", version_id, f"{version_id}.json")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(dict(data, id=version_id), f)
+    for name in data.get("libraries", []):
+        write_library(mc_dir, name, b"jar")
+
+
+def write_library(mc_dir, name, content):
+    path = os.path.join(mc_dir, "libraries", name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(content)
+
+
+OPTIONS = {"username": "Steve"}
+
+
+@pytest.fixture
+def mc_dir(tmp_path):
+    mc_dir = str(tmp_path / "minecraft")
+    write_version(mc_dir, "1.20.1", libraries=["a.jar", "b.jar"])
+    write_version(mc_dir, "fabric-1.20.1", inheritsFrom="1.20.1", libraries=["fabric.jar"])
+    return mc_dir
+
+
+def test_unchanged_files_reuse_the_command(built, mc_dir, tmp_path):
+    path = str(tmp_path / "command_cache.json")
+    first = command_cache.CommandCache(path).get_command("fabric-1.20.1", mc_dir, OPTIONS)
+    assert command_cache.CommandCache(path).get_command("fabric-1.20.1", mc_dir, OPTIONS) == first
+    assert built == ["fabric-1.20.1"]
+
+
+@pytest.mark.parametrize("change", [
+    # A parent version JSON gains a library
+    lambda mc_dir: write_version(mc_dir, "1.20.1", libraries=["a.jar", "b.jar", "c.jar"]),
+    # The profile itself drops one
+    lambda mc_dir: write_version(mc_dir, "fabric-1.20.1", inheritsFrom="1.20.1", libraries=[]),
+    # A library on the classpath is replaced
+    lambda mc_dir: write_library(mc_dir, "b.jar", b"a newer jar"),
+])
+def test_changed_version_json_or_libraries_rebuild_the_command(built, mc_dir, tmp_path, change):
+    cache = command_cache.CommandCache(str(tmp_path / "command_cache.json"))
+    cache.get_command("fabric-1.20.1", mc_dir, OPTIONS)
+
+    change(mc_dir)
+    command = cache.get_command("fabric-1.20.1", mc_dir, OPTIONS)
+
+    assert built == ["fabric-1.20.1", "fabric-1.20.1"]
+    # The rebuilt command is cached against the new files
+    assert cache.get_command("fabric-1.20.1", mc_dir, OPTIONS) == command
+    assert len(built) == 2
+
+
+def test_eviction_order_survives_a_restart(built, mc_dir, tmp_path):
+    path = str(tmp_path / "command_cache.json")
+    write_version(mc_dir, "1.21")
+    first = command_cache.CommandCache(path, max_entries=2)
+    first.get_command("1.20.1", mc_dir, OPTIONS)
+    first.get_command("fabric-1.20.1", mc_dir, OPTIONS)
+
+    # A later run launches the older entry again, and saves that on its way out
+    second = command_cache.CommandCache(path, max_entries=2)
+    second.get_command("1.20.1", mc_dir, OPTIONS)
+    second.flush_if_pending()
+
+    third = command_cache.CommandCache(path, max_entries=2)
+    third.get_command("1.21", mc_dir, OPTIONS)
+    built.clear()
+    third.get_command("1.20.1", mc_dir, OPTIONS)
+    third.get_command("fabric-1.20.1", mc_dir, OPTIONS)
+    assert built == ["fabric-1.20.1"]
+
+
+def test_hits_are_written_in_one_batch(built, mc_dir, tmp_path, monkeypatch):
+    path = str(tmp_path / "command_cache.json")
+    cache = command_cache.CommandCache(path, save_delay=60)
+    cache.get_command("1.20.1", mc_dir, OPTIONS)
+    saves = []
+    save = cache._save
+    monkeypatch.setattr(cache, "_save", lambda: saves.append(1) or save())
+
+    for _ in range(10):
+        cache.get_command("1.20.1", mc_dir, OPTIONS)
+    assert saves == []
+    cache.flush_if_pending()
+    assert saves == [1]
+    cache.flush_if_pending()
+    assert saves == [1]
@@ -0,0 +1,48 @@
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pytest
+from PySide6.QtCore import QPointF
+from PySide6.QtGui import QImage
+from PySide6.QtWidgets import QApplication
+
+import main
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def gradient_image(tmp_path):
+    # 200x100: red is the x coordinate and green twice the y coordinate, so any crop shows
+    # exactly which source pixels it came from
+    pixels = bytes(value for y in range(100) for x in range(200) for value in (x, y * 2, 0))
+    image = QImage(pixels, 200, 100, 200 * 3, QImage.Format_RGB888)
+    path = str(tmp_path / "photo.png")
+    image.save(path)
+    return path
+
+
+def test_crop_box_stays_inside_the_image(app, gradient_image):
+    dialog = main.CropDialog(gradient_image)
+    # The box starts as a 50 px square at (75, 25); drag it well past the bottom-right corner
+    dialog.crop_box.setPos(QPointF(500, 500))
+    rect = dialog.crop_box.mapRectToScene(dialog.crop_box.rect())
+    assert (rect.x(), rect.y(), rect.width(), rect.height()) == (150, 50, 50, 50)
+    dialog.crop_box.setPos(QPointF(-500, -500))
+    assert dialog.crop_box.mapRectToScene(dialog.crop_box.rect()).topLeft() == QPointF(0, 0)
+
+
+def test_cropped_photo_is_an_undistorted_square(app, gradient_image):
+    dialog = main.CropDialog(gradient_image)
+    dialog.crop_box.setPos(QPointF(110, 0))
+    image = dialog.get_cropped_pixmap().toImage()
+    assert (image.width(), image.height()) == (main.PROFILE_PHOTO_SIZE, main.PROFILE_PHOTO_SIZE)
+    # The crop covers x 150-199 and y 25-74, scaled the same in both directions
+    assert abs(image.pixelColor(0, 128).red() - 150) <= 2
+    assert abs(image.pixelColor(255, 128).red() - 199) <= 2
+    assert abs(image.pixelColor(128, 0).green() - 50) <= 4
+    assert abs(image.pixelColor(128, 255).green() - 148) <= 4
@@ -0,0 +1,98 @@
+import io
+import time
+
+import pytest
+
+from barrie import gamelog
+
+TIMESTAMP = 1700000000000
+CLOCK = time.strftime("%H:%M:%S", time.localtime(TIMESTAMP / 1000))
+
+
+def decode(lines):
+    decoder = gamelog.Log4jXmlDecoder()
+    return [out for line in lines for out in decoder.feed(line)]
+
+
+def test_single_line_event():
+    assert decode([
+        f'<log4j:Event logger="fb" timestamp="{TIMESTAMP}" level="INFO" thread="Render thread">',
+        "  <log4j:Message><![CDATA[Setting user: Steve]]></log4j:Message>",
+        "</log4j:Event>",
+    ]) == [f"[{CLOCK}] [Render thread/INFO]: Setting user: Steve"]
+
+
+def test_event_split_across_reads():
+    # The start tag and a multi-line CDATA message each arrive over several reads
+    assert decode([
+        f'<log4j:Event logger="net.minecraft.client.Minecraft" timestamp="{TIMESTAMP}"',
+        '    level="WARN" thread="Worker-Main-1">',
+        "<log4j:Message><![CDATA[Failed to load texture",
+        "  first detail",
+        "  last detail]]></log4j:Message>",
+        "</log4j:Event>",
+    ]) == [f"[{CLOCK}] [Worker-Main-1/WARN]: Failed to load texture", "  first detail", "  last detail"]
+
+
+def test_cdata_keeps_markup_and_throwables():
+    assert decode([
+        f'<log4j:Event logger="x" timestamp="{TIMESTAMP}" level="ERROR" thread="main">',
+        "<log4j:Message><![CDATA[<b>not a tag</b> & friends]]></log4j:Message>",
+        "<log4j:Throwable><![CDATA[java.lang.IllegalStateException: boom",
+        "\tat net.minecraft.Main.main(Main.java:1)",
+        "]]></log4j:Throwable>",
+        "</log4j:Event>",
+    ]) == [
+        f"[{CLOCK}] [main/ERROR]: <b>not a tag</b> & friends",
+        "java.lang.IllegalStateException: boom",
+        "\tat net.minecraft.Main.main(Main.java:1)",
+    ]
+
+
+def test_plain_text_passes_through():
+    lines = ["[12:00:00] [main/INFO]: Loading Minecraft 1.12.2 with Fabric Loader", "Exception in thread \"main\" java.lang.Error"]
+    assert decode(lines + [""]) == lines
+
+
+def run(lines):
+    log = gamelog.GameLog(io.BytesIO("".join(line + "\n" for line in lines).encode()), started_at=time.time())
+    log.start().join(5)
+    return log
+
+
+@pytest.mark.parametrize("line, milestone", [
+    ("[Render thread/INFO]: Sound engine started", "sound_engine"),
+    ("[Render thread/INFO]: Backend library: LWJGL version 3.3.1", "lwjgl"),
+    ("[Server thread/INFO]: Steve joined the game", "world"),
+    ("[Render thread/INFO]: Connecting to play.example.net, 25565", "world"),
+    ("---- Minecraft Crash Report ----", "crash"),
+])
+def test_milestones(line, milestone):
+    assert milestone in run([line]).milestones
+
+
+def test_main_menu_and_world_from_xml_output():
+    events = []
+    lines = []
+    for message, thread in (("Setting user: Steve", "main"), ("Sound engine started", "Render thread"), ("Steve joined the game", "Server thread")):
+        lines += [
+            f'<log4j:Event logger="x" timestamp="{TIMESTAMP}" level="INFO" thread="{thread}">',
+            f"<log4j:Message><![CDATA[{message}]]></log4j:Message>",
+            "</log4j:Event>",
+        ]
+    log = gamelog.GameLog(io.BytesIO("".join(line + "\n" for line in lines).encode()))
+    log.subscribe(lambda event, value: events.append(value[0]) if event == "milestone" else None)
+    log.start().join(5)
+
+    assert events == ["setting_user", "sound_engine", "world"]
+    assert log.time_to_main_menu() == log.milestones["sound_engine"]
+    assert log.lines_since(0)[1][1] == f"[{CLOCK}] [Render thread/INFO]: Sound engine started"
+
+
+def test_ring_buffer_is_bounded():
+    log = gamelog.GameLog(io.BytesIO(b"".join(b"line %d\n" % n for n in range(100))), max_lines=10)
+    log.start().join(5)
+    total, lines = log.lines_since(95)
+    assert total == 100
+    assert lines == [f"line {n}" for n in range(95, 100)]
+    assert log.lines_since(0)[1][0] == "line 90"
@@ -0,0 +1,140 @@
+import os
+import json
+import hashlib
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+from barrie import hashcache, installer, versions
+
+
+@pytest.fixture(autouse=True)
+def isolated_hash_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(hashcache, "_cache", hashcache.HashCache(str(tmp_path / "hash_cache.sqlite")))
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    def refresh_manifest(*args, **kwargs):
+        raise ConnectionError("offline")
+
+    monkeypatch.setattr(versions, "refresh_manifest", refresh_manifest)
+    monkeypatch.setattr(installer, "download_file", refresh_manifest)
+
+
+def write_version(mc_dir, version_id, data):
+    version_dir = mc_dir / "versions" / version_id
+    version_dir.mkdir(parents=True)
+    path = version_dir / f"{version_id}.json"
+    path.write_text(json.dumps(data))
+    return path
+
+
+def test_installed_version_json_loads_offline(tmp_path, monkeypatch, offline):
+    monkeypatch.setattr(versions, "load_manifest_cache", lambda: None)
+    write_version(tmp_path, "1.20.1", {"id": "1.20.1", "libraries": []})
+    assert installer.load_version_json("1.20.1", str(tmp_path)) == {"id": "1.20.1", "libraries": []}
+    assert installer.verify_version("1.20.1", str(tmp_path)) == []
+
+
+def test_installed_version_json_matching_the_manifest_skips_the_network(tmp_path, monkeypatch, offline):
+    path = write_version(tmp_path, "1.20.1", {"id": "1.20.1"})
+    entry = {"id": "1.20.1", "url": "https://example.invalid/1.20.1.json", "sha1": installer.sha1_of(str(path))}
+    monkeypatch.setattr(versions, "load_manifest_cache", lambda: {"versions": [entry]})
+    assert installer.load_version_json("1.20.1", str(tmp_path)) == {"id": "1.20.1"}
+
+
+def test_version_json_with_another_hash_is_fetched_again(tmp_path, monkeypatch, offline):
+    write_version(tmp_path, "1.20.1", {"id": "1.20.1"})
+    entry = {"id": "1.20.1", "url": "https://example.invalid/1.20.1.json", "sha1": "0" * 40}
+    monkeypatch.setattr(versions, "load_manifest_cache", lambda: {"versions": [entry]})
+    with pytest.raises(ConnectionError):
+        installer.load_version_json("1.20.1", str(tmp_path))
+
+
+def test_missing_version_json_is_unknown_offline(tmp_path, monkeypatch):
+    monkeypatch.setattr(versions, "load_manifest_cache", lambda: {"versions": []})
+    monkeypatch.setattr(versions, "refresh_manifest", lambda cache: ({"versions": []}, False))
+    with pytest.raises(installer.InstallError):
+        installer.load_version_json("9.9", str(tmp_path))
+    assert not os.path.exists(tmp_path / "versions" / "9.9")
+
+
+@pytest.fixture
+def runtime_server(monkeypatch):
+    # Mojang's Java runtime manifests for one tiny runtime, served locally
+    java = b"#!/bin/sh\n"
+    release = b"JAVA_VERSION=21\n"
+    routes = {}
+    requests = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            requests.append(self.path)
+            body = routes.get(self.path)
+            self.send_response(200 if body is not None else 404)
+            self.send_header("Content-Length", str(len(body or b"")))
+            self.end_headers()
+            self.wfile.write(body or b"")
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+
+    def raw(path, content):
+        return {"raw": {"url": url + path, "sha1": hashlib.sha1(content).hexdigest(), "size": len(content)}}
+
+    files = {
+        "bin": {"type": "directory"},
+        "bin/java": {"type": "file", "executable": True, "downloads": raw("/java", java)},
+        "release": {"type": "file", "executable": False, "downloads": raw("/release", release)},
+        "legal/java": {"type": "link", "target": "../bin"},
+    }
+    builds = {"java-runtime-delta": [{"manifest": {"url": url + "/manifest.json"}, "version": {"name": "21.0.3"}}]}
+    routes.update({
+        "/all.json": json.dumps({installer.jvm_platform(): builds}).encode(),
+        "/manifest.json": json.dumps({"files": files}).encode(),
+        "/java": java,
+        "/release": release,
+    })
+    monkeypatch.setattr(installer, "JVM_MANIFEST_URL", url + "/all.json")
+    server.requests = requests
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_runtime_is_installed_in_the_official_layout(tmp_path, runtime_server):
+    installer.install_runtime("java-runtime-delta", str(tmp_path))
+    runtime_dir = tmp_path / "runtime" / "java-runtime-delta" / installer.jvm_platform()
+    java = runtime_dir / "java-runtime-delta" / "bin" / "java"
+    assert java.read_bytes() == b"#!/bin/sh\n"
+    assert os.access(java, os.X_OK)
+    assert (runtime_dir / ".version").read_text() == "21.0.3"
+    listed = [line.split(" /#// ")[0] for line in (runtime_dir / "java-runtime-delta.sha1").read_text().splitlines()]
+    assert sorted(listed) == ["bin/java", "release"]
+    assert installer.runtime_installed("java-runtime-delta", str(tmp_path))
+
+
+def test_intact_runtime_is_not_fetched_again(tmp_path, runtime_server):
+    installer.install_runtime("java-runtime-delta", str(tmp_path))
+    fetched = len(runtime_server.requests)
+    installer.install_runtime("java-runtime-delta", str(tmp_path))
+    assert len(runtime_server.requests) == fetched
+
+
+def test_damaged_runtime_is_repaired(tmp_path, runtime_server):
+    installer.install_runtime("java-runtime-delta", str(tmp_path))
+    release = tmp_path / "runtime" / "java-runtime-delta" / installer.jvm_platform() / "java-runtime-delta" / "release"
+    release.write_bytes(b"JAVA_VERSION=8\n")
+    assert not installer.runtime_installed("java-runtime-delta", str(tmp_path))
+
+    runtime_server.requests.clear()
+    installer.install_runtime("java-runtime-delta", str(tmp_path))
+    assert release.read_bytes() == b"JAVA_VERSION=21\n"
+    assert "/release" in runtime_server.requests and "/java" not in runtime_server.requests
@@ -0,0 +1,45 @@
+import os
+
+from barrie import java
+
+
+def add_runtime(mc_dir, component, version):
+    # A runtime in the layout Mojang's launcher and the installer use
+    home = os.path.join(mc_dir, "runtime", component, "linux", component)
+    executable = java.java_executable(home)
+    os.makedirs(os.path.dirname(executable))
+    with open(executable, "w") as f:
+        f.write("")
+    with open(os.path.join(home, "release"), "w") as f:
+        f.write(f'JAVA_VERSION="{version}"\n')
+    return home
+
+
+def homes(registry, mc_dir):
+    return sorted(runtime.home for runtime in registry.runtimes() if runtime.home.startswith(mc_dir))
+
+
+def test_runtime_installed_during_the_session_is_found(tmp_path):
+    mc_dir = str(tmp_path / "mc")
+    registry = java.JavaRegistry(mc_dir, cache_path=str(tmp_path / "java_runtimes.json"))
+    add_runtime(mc_dir, "jre-legacy", "1.8.0_51")
+    assert len(homes(registry, mc_dir)) == 1
+    assert registry.select(21) is None or not registry.select(21).home.startswith(mc_dir)
+
+    delta = add_runtime(mc_dir, "java-runtime-delta", "21.0.3")
+    assert delta in homes(registry, mc_dir)
+    assert registry.select(21).home == delta
+
+
+def test_unchanged_folders_are_not_probed_again(tmp_path, monkeypatch):
+    mc_dir = str(tmp_path / "mc")
+    add_runtime(mc_dir, "java-runtime-delta", "21.0.3")
+    registry = java.JavaRegistry(mc_dir, cache_path=str(tmp_path / "java_runtimes.json"))
+    registry.runtimes()
+
+    probed = []
+    monkeypatch.setattr(java, "probe", lambda home: probed.append(home))
+    registry.runtimes()
+    # A second registry finds the scan in the cache file
+    java.JavaRegistry(mc_dir, cache_path=str(tmp_path / "java_runtimes.json")).runtimes()
+    assert probed == []
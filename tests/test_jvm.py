@@ -0,0 +1,127 @@
+import json
+
+import pytest
+
+from barrie import jvm
+
+
+def test_heap_flags_come_first():
+    args = jvm.build_jvm_args(4096, "none")
+    assert args == ["-Xmx4096M", "-Xms1024M"]
+
+
+def test_g1_preset():
+    assert jvm.build_jvm_args(4096, "g1") == ["-Xmx4096M", "-Xms1024M"] + jvm.G1_FLAGS
+
+
+def test_aikar_preset_switches_generation_sizing_at_12_gb():
+    small = jvm.build_jvm_args(8192, "aikar")
+    large = jvm.build_jvm_args(12 * 1024, "aikar")
+    assert small == ["-Xmx8192M", "-Xms2048M"] + jvm.AIKAR_FLAGS + jvm.AIKAR_SMALL_HEAP
+    assert large == ["-Xmx12288M", "-Xms3072M"] + jvm.AIKAR_FLAGS + jvm.AIKAR_LARGE_HEAP
+
+
+@pytest.mark.parametrize("java_major, expected", [
+    (8, jvm.G1_FLAGS),
+    (16, jvm.G1_FLAGS),
+    (17, ["-XX:+UseZGC"]),
+    (21, ["-XX:+UseZGC", "-XX:+ZGenerational"]),
+    (22, ["-XX:+UseZGC", "-XX:+ZGenerational"]),
+    (23, ["-XX:+UseZGC"]),
+])
+def test_zgc_flags_follow_the_java_version(java_major, expected):
+    assert jvm.build_jvm_args(4096, "zgc", java_major)[2:] == expected
+
+
+def test_user_flags_go_last():
+    args = jvm.build_jvm_args(2048, "g1", extra=["-Dfml.ignorePatchDiscrepancies=true", "-XX:+UseStringDeduplication"])
+    assert args[-2:] == ["-Dfml.ignorePatchDiscrepancies=true", "-XX:+UseStringDeduplication"]
+    assert args[2:-2] == jvm.G1_FLAGS
+
+
+def test_user_flag_replaces_the_preset_setting():
+    args = jvm.build_jvm_args(2048, "g1", extra=["-XX:MaxGCPauseMillis=100", "-XX:-UnlockExperimentalVMOptions"])
+    assert "-XX:MaxGCPauseMillis=50" not in args
+    assert "-XX:+UnlockExperimentalVMOptions" not in args
+    assert args[-2:] == ["-XX:MaxGCPauseMillis=100", "-XX:-UnlockExperimentalVMOptions"]
+
+
+def test_locking_experimental_options_drops_the_presets_experimental_settings():
+    for preset in ("g1", "aikar"):
+        args = jvm.build_jvm_args(4096, preset, extra=["-XX:-UnlockExperimentalVMOptions"])
+        assert "-XX:+UnlockExperimentalVMOptions" not in args
+        assert not [arg for arg in args if jvm.flag_key(arg) in jvm.EXPERIMENTAL_FLAGS], preset
+        assert "-XX:+UseG1GC" in args and args[-1] == "-XX:-UnlockExperimentalVMOptions"
+    # Unlocking again afterwards leaves the preset whole
+    args = jvm.build_jvm_args(4096, "g1", extra=["-XX:-UnlockExperimentalVMOptions", "-XX:+UnlockExperimentalVMOptions"])
+    assert args == ["-Xmx4096M", "-Xms1024M"] + jvm.G1_FLAGS
+
+
+def test_unlocks_come_before_the_options_they_unlock():
+    args = jvm.build_jvm_args(2048, "none", extra=["-XX:G1NewSizePercent=30", "-XX:+PrintFlagsFinal", "-XX:+UnlockDiagnosticVMOptions", "-XX:+UnlockExperimentalVMOptions"])
+    assert args == [
+        "-Xmx2048M", "-Xms512M", "-XX:+UnlockDiagnosticVMOptions", "-XX:+UnlockExperimentalVMOptions",
+        "-XX:G1NewSizePercent=30", "-XX:+PrintFlagsFinal"
+    ]
+
+
+@pytest.mark.parametrize("heap_mb, expected", [(1024, 512), (2048, 512), (4096, 1024), (16384, 4096)])
+def test_initial_heap_is_a_quarter_of_the_maximum(heap_mb, expected):
+    assert jvm.build_jvm_args(heap_mb, "none") == [f"-Xmx{heap_mb}M", f"-Xms{expected}M"]
+
+
+def test_user_heap_flags_are_ignored():
+    assert jvm.build_jvm_args(2048, "none", extra=["-Xmx8G", "-Xms1G"]) == ["-Xmx2048M", "-Xms512M"]
+
+
+def test_user_collector_replaces_the_whole_preset():
+    args = jvm.build_jvm_args(4096, "aikar", extra=["-XX:+UseShenandoahGC"])
+    assert args == ["-Xmx4096M", "-Xms1024M", "-XX:+UseShenandoahGC"]
+
+
+def test_every_setting_appears_once_at_its_last_value():
+    args = jvm.build_jvm_args(2048, "none", extra=["-Dkey=a", "-XX:+AlwaysPreTouch", "-Dkey=b", "-XX:+AlwaysPreTouch"])
+    assert args == ["-Xmx2048M", "-Xms512M", "-Dkey=b", "-XX:+AlwaysPreTouch"]
+
+
+def test_presets_have_no_duplicate_settings():
+    for preset in jvm.PRESET_LABELS:
+        for heap_mb in (4096, 16384):
+            keys = [jvm.flag_key(arg) for arg in jvm.build_jvm_args(heap_mb, preset, 21)]
+            assert len(keys) == len(set(keys)), preset
+
+
+@pytest.mark.parametrize("total_mb, mod_count, expected", [
+    (4096, 0, 2048),
+    (16384, 0, 2048),
+    (16384, 100, 5632),
+    (65536, 1000, 8192),
+    (2048, 0, 1024),
+])
+def test_recommended_heap(total_mb, mod_count, expected):
+    assert jvm.recommended_heap_mb(total_mb, mod_count) == expected
+
+
+def write_version(mc_dir, version_id, data):
+    version_dir = mc_dir / "versions" / version_id
+    version_dir.mkdir(parents=True)
+    (version_dir / f"{version_id}.json").write_text(json.dumps(dict(data, id=version_id)))
+
+
+def test_launch_arguments_size_the_heap_from_mods(tmp_path):
+    write_version(tmp_path, "1.20.1", {"javaVersion": {"majorVersion": 17}})
+    write_version(tmp_path, "fabric-1.20.1", {"inheritsFrom": "1.20.1"})
+    mods_dir = tmp_path / "mods" / "fabric-1.20.1"
+    mods_dir.mkdir(parents=True)
+    for index in range(64):
+        (mods_dir / f"mod{index}.jar").write_bytes(b"")
+    args = jvm.launch_arguments(str(tmp_path), "fabric-1.20.1", preset="zgc", mods_dir=str(mods_dir), total_mb=32768)
+    # 2048 + 64 * 32 MB, and Java 17 from the parent version allows ZGC
+    assert args == ["-Xmx4096M", "-Xms1024M", "-XX:+UseZGC"]
+
+
+def test_launch_arguments_cap_a_manual_heap(tmp_path):
+    write_version(tmp_path, "1.8.9", {})
+    args = jvm.launch_arguments(str(tmp_path), "1.8.9", heap_mb=16384, preset="zgc", total_mb=8192)
+    # Three quarters of 8 GB, and Java 8 falls back to G1
+    assert args == ["-Xmx6144M", "-Xms1536M"] + jvm.G1_FLAGS
@@ -0,0 +1,266 @@
+import os
+import json
+import hashlib
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+from barrie import hashcache, installer, modrinth
+
+
+@pytest.fixture(autouse=True)
+def isolated_hash_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(hashcache, "_cache", hashcache.HashCache(str(tmp_path / "hash_cache.sqlite")))
+
+
+@pytest.fixture
+def api():
+    # A stand-in for the Modrinth API. routes maps a path to (status, body); JSON bodies get
+    # an ETag and answer 304 to a matching If-None-Match. Every request is recorded.
+    routes = {}
+    requests = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _answer(self, body=None):
+            requests.append({"method": self.command, "path": self.path, "headers": dict(self.headers), "body": body})
+            status, payload = routes.get(self.path, (404, b""))
+            if not isinstance(payload, bytes):
+                payload = json.dumps(payload).encode("utf-8")
+            etag = '"%s"' % hashlib.sha1(payload).hexdigest()
+            if status == 200 and self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_response(status)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            self._answer()
+
+        def do_POST(self):
+            self._answer(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.url = f"http://127.0.0.1:{server.server_port}"
+    server.routes = routes
+    server.requests = requests
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(api, tmp_path):
+    return modrinth.ModrinthClient(base_url=api.url, cache_dir=str(tmp_path / "cache"))
+
+
+def test_fresh_response_is_served_from_cache(api, client, tmp_path):
+    api.routes["/project/sodium"] = (200, {"id": modrinth.SODIUM})
+    assert client.project("sodium") == {"id": modrinth.SODIUM}
+    assert client.project("sodium") == {"id": modrinth.SODIUM}
+    # A new client finds the response on disk
+    other = modrinth.ModrinthClient(base_url=api.url, cache_dir=str(tmp_path / "cache"))
+    assert other.project("sodium") == {"id": modrinth.SODIUM}
+    assert len(api.requests) == 1
+
+
+def test_expired_response_is_revalidated(api, client):
+    api.routes["/project/sodium/version"] = (200, [{"id": "a"}])
+    assert client.get_json("/project/sodium/version", ttl=0) == [{"id": "a"}]
+    assert client.get_json("/project/sodium/version", ttl=0) == [{"id": "a"}]
+    assert "If-None-Match" in api.requests[1]["headers"]
+
+    api.routes["/project/sodium/version"] = (200, [{"id": "b"}])
+    assert client.get_json("/project/sodium/version", ttl=0) == [{"id": "b"}]
+    assert len(api.requests) == 3
+
+
+def test_unknown_project_raises(api, client):
+    with pytest.raises(modrinth.ModrinthError):
+        client.project("missing")
+
+
+def test_downloaded_file_is_verified_and_kept(api, client, tmp_path):
+    content = b"jar contents"
+    api.routes["/sodium.jar"] = (200, content)
+    file = {"filename": "sodium.jar", "url": api.url + "/sodium.jar", "hashes": {"sha512": hashlib.sha512(content).hexdigest()}}
+    blob = client.fetch_file(file)
+    with open(blob, "rb") as f:
+        assert f.read() == content
+    assert client.fetch_file(file) == blob
+    assert len(api.requests) == 1
+
+
+def test_checksum_mismatch_leaves_nothing_behind(api, client, tmp_path):
+    api.routes["/sodium.jar"] = (200, b"tampered")
+    file = {"filename": "sodium.jar", "url": api.url + "/sodium.jar", "hashes": {"sha512": hashlib.sha512(b"jar contents").hexdigest()}}
+    with pytest.raises(modrinth.ModrinthError):
+        client.fetch_file(file)
+    leftovers = [name for _, _, names in os.walk(tmp_path / "cache") for name in names]
+    assert leftovers == []
+
+
+def test_concurrent_cache_writes_do_not_clobber_each_other(tmp_path):
+    path = str(tmp_path / "api" / "entry.json")
+    payloads = [{"writer": n, "data": "x" * 10000} for n in range(16)]
+    barrier = threading.Barrier(len(payloads))
+    errors = []
+
+    def write(payload):
+        barrier.wait()
+        try:
+            modrinth._write_json(path, payload)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(payload,)) for payload in payloads]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    with open(path) as f:
+        assert json.load(f) in payloads
+    assert os.listdir(tmp_path / "api") == ["entry.json"]
+
+
+def write_jar(mods_dir, name, content):
+    os.makedirs(mods_dir, exist_ok=True)
+    path = os.path.join(mods_dir, name)
+    with open(path, "wb") as f:
+        f.write(content)
+    return path
+
+
+def build(version_id, content):
+    file = {"filename": f"{version_id}.jar", "primary": True, "hashes": {"sha1": hashlib.sha1(content).hexdigest()}}
+    return {"id": version_id, "files": [file]}
+
+
+def test_check_updates_asks_once_for_every_jar(api, client, tmp_path):
+    mods_dir = str(tmp_path / "mods")
+    old = write_jar(mods_dir, "sodium-old.jar", b"sodium 0.5")
+    current = write_jar(mods_dir, "lithium.jar", b"lithium 0.12")
+    unknown = write_jar(mods_dir, "private.jar", b"not on modrinth")
+    api.routes["/version_files/update"] = (200, {
+        installer.sha1_of(old): build("sodium-0.6", b"sodium 0.6"),
+        installer.sha1_of(current): build("lithium-0.12", b"lithium 0.12"),
+    })
+
+    updates, missing = client.check_updates(mods_dir, "1.21.1", "quilt")
+
+    assert [(update.path, update.version["id"]) for update in updates] == [(old, "sodium-0.6")]
+    assert missing == [unknown]
+    assert len(api.requests) == 1
+    request = api.requests[0]
+    assert request["method"] == "POST"
+    assert request["body"] == {
+        "hashes": sorted(installer.sha1_of(path) for path in (old, current, unknown)),
+        "algorithm": "sha1",
+        "loaders": ["quilt", "fabric"],
+        "game_versions": ["1.21.1"],
+    }
+
+
+def test_check_updates_without_jars_skips_the_request(api, client, tmp_path):
+    assert client.check_updates(str(tmp_path / "mods"), "1.21.1", "fabric") == ([], [])
+    assert api.requests == []
+
+
+def version(api, version_id, project_id, requires=(), pins=(), incompatible=(), loaders=("fabric",), date="2024-06-01"):
+    # A Modrinth version for Minecraft 1.21.1 whose jar the mock API serves
+    content = f"{version_id} jar".encode()
+    api.routes[f"/files/{version_id}.jar"] = (200, content)
+    dependencies = [{"project_id": dependency, "dependency_type": "required"} for dependency in requires]
+    dependencies += [{"project_id": project, "version_id": pinned, "dependency_type": "required"} for project, pinned in pins]
+    dependencies += [{"project_id": dependency, "dependency_type": "incompatible"} for dependency in incompatible]
+    data = {
+        "id": version_id, "project_id": project_id, "name": version_id, "version_type": "release",
+        "game_versions": ["1.21.1"], "loaders": list(loaders), "date_published": date, "dependencies": dependencies,
+        "files": [{
+            "filename": f"{version_id}.jar", "primary": True, "url": f"{api.url}/files/{version_id}.jar",
+            "hashes": {"sha1": hashlib.sha1(content).hexdigest(), "sha512": hashlib.sha512(content).hexdigest()},
+        }],
+    }
+    api.routes[f"/version/{version_id}"] = (200, data)
+    return data
+
+
+def publish(api, project_id, *versions):
+    api.routes[f"/project/{project_id}"] = (200, {"id": project_id, "title": project_id.title()})
+    api.routes[f"/project/{project_id}/version"] = (200, list(versions))
+
+
+def summary(plan):
+    return [(mod.project_id, mod.version["id"], mod.required_by) for mod in plan]
+
+
+def test_plan_follows_dependencies_transitively(api, client):
+    publish(api, "a", version(api, "a1", "a", requires=["b"]))
+    publish(api, "b", version(api, "b1", "b", requires=["c"]))
+    publish(api, "c", version(api, "c1", "c"))
+    assert summary(client.plan(["a"], "1.21.1", "fabric")) == [("a", "a1", None), ("b", "b1", "a1"), ("c", "c1", "b1")]
+
+
+def test_pinned_dependency_drops_what_the_replaced_version_needed(api, client):
+    publish(api, "a", version(api, "a1", "a", requires=["c"]))
+    publish(api, "b", version(api, "b1", "b", pins=[("c", "c_old")]))
+    publish(api, "c", version(api, "c_new", "c", requires=["d"], date="2024-06-01"), version(api, "c_old", "c", date="2024-01-01"))
+    publish(api, "d", version(api, "d1", "d"))
+
+    plan = summary(client.plan(["a", "b"], "1.21.1", "fabric"))
+
+    assert plan == [("a", "a1", None), ("b", "b1", None), ("c", "c_old", "a1")]
+
+
+def test_conflicting_pins_are_an_error(api, client):
+    publish(api, "a", version(api, "a1", "a", pins=[("c", "c_old")]))
+    publish(api, "b", version(api, "b1", "b", pins=[("c", "c_new")]))
+    publish(api, "c", version(api, "c_new", "c"), version(api, "c_old", "c", date="2024-01-01"))
+    with pytest.raises(modrinth.ModrinthError, match="different versions of c"):
+        client.plan(["a", "b"], "1.21.1", "fabric")
+
+
+def test_dependency_without_a_build_for_the_loader_is_an_error(api, client):
+    publish(api, "a", version(api, "a1", "a", requires=["b"], loaders=("fabric", "forge")))
+    publish(api, "b", version(api, "b1", "b", loaders=("fabric",)))
+    assert summary(client.plan(["a"], "1.21.1", "quilt")) == [("a", "a1", None), ("b", "b1", "a1")]
+    with pytest.raises(modrinth.ModrinthError, match=r"No Forge build of B .*required by a1"):
+        client.plan(["a"], "1.21.1", "forge")
+
+
+def test_incompatible_mods_are_an_error(api, client):
+    publish(api, "a", version(api, "a1", "a", incompatible=["b"]))
+    publish(api, "b", version(api, "b1", "b"))
+    with pytest.raises(modrinth.ModrinthError, match="incompatible"):
+        client.plan(["a", "b"], "1.21.1", "fabric")
+
+
+def test_installed_dependencies_are_kept_unless_pinned_elsewhere(api, client, tmp_path):
+    mods_dir = str(tmp_path / "mods")
+    installed = write_jar(mods_dir, "c.jar", b"c_new jar")
+    c_new = version(api, "c_new", "c")
+    publish(api, "a", version(api, "a1", "a", requires=["c"]))
+    publish(api, "b", version(api, "b1", "b", pins=[("c", "c_old")]))
+    publish(api, "c", c_new, version(api, "c_old", "c", date="2024-01-01"))
+    api.routes["/version_files"] = (200, {installer.sha1_of(installed): c_new})
+
+    assert summary(client.plan(["a"], "1.21.1", "fabric", mods_dir)) == [("a", "a1", None)]
+
+    plan = client.plan(["b"], "1.21.1", "fabric", mods_dir)
+    assert summary(plan) == [("b", "b1", None), ("c", "c_old", "b1")]
+    assert plan[1].replaces == installed
+
+    paths = client.install_plan(plan, mods_dir)
+    assert sorted(os.listdir(mods_dir)) == ["b1.jar", "c_old.jar"]
+    assert paths == [os.path.join(mods_dir, "b1.jar"), os.path.join(mods_dir, "c_old.jar")]
@@ -0,0 +1,193 @@
+import io
+import os
+import json
+import zipfile
+
+import pytest
+
+from barrie import mods
+
+
+@pytest.mark.parametrize("spec, version, expected", [
+    # a bare trailing "-" is the lowest pre-release of that version, as in Fabric's semver
+    (">1.20-", "1.20", True),
+    (">1.20-", "1.20-", False),
+    (">=1.20-", "1.20-rc.1", True),
+    ("<1.20", "1.20-", True),
+    (">=1.20", "1.20-rc.1", False),
+    # pre-release identifiers compare numerically, then alphabetically
+    (">1.20-beta.2", "1.20-beta.10", True),
+    (">1.20-alpha", "1.20-beta", True),
+    ("<1.20-rc", "1.20-beta", True),
+    # build metadata is ignored
+    ("=1.20.1", "1.20.1+build.5", True),
+])
+def test_pre_release_ordering(spec, version, expected):
+    assert mods.version_matches(spec, version) is expected
+
+
+@pytest.mark.parametrize("spec, version, expected", [
+    (">=1.20 <1.21", "1.20.1", True),
+    (">=1.20 <1.21", "1.21", False),
+    ("1.20.x", "1.20.4", True),
+    ("1.20.x", "1.21", False),
+    ("~1.20.1", "1.20.6", True),
+    ("~1.20.1", "1.21", False),
+    ("^1.20.1", "1.21", True),
+    ("1.19.4 || >=1.20", "1.19.4", True),
+    ("*", "1.8.9", True),
+    ("[47,)", "47.1.0", True),
+    ("[1.20,1.20.2)", "1.20.2", False),
+    ("[1.20,1.20.2]", "1.20.2", True),
+])
+def test_predicates_and_maven_ranges(spec, version, expected):
+    assert mods.version_matches(spec, version) is expected
+
+
+def make_jar(path, members, compression=zipfile.ZIP_DEFLATED):
+    # members maps archive names to str/bytes content, or to a dict for a nested jar
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression) as archive:
+        for name, content in members.items():
+            if isinstance(content, dict):
+                content = make_jar(None, content)
+            archive.writestr(name, content)
+    if path is None:
+        return buffer.getvalue()
+    with open(path, "wb") as f:
+        f.write(buffer.getvalue())
+    return str(path)
+
+
+def test_fabric_mod_with_nested_modules(tmp_path, monkeypatch):
+    fabric_json = json.dumps({
+        "id": "fabric-api", "name": "Fabric API", "version": "0.92.0+1.20.1",
+        "depends": {"fabricloader": ">=0.14", "minecraft": ["1.20", "1.20.1"]},
+        "provides": ["fabric"],
+        "jars": [{"file": "META-INF/jars/fabric-rendering-v1.jar"}, {"file": "META-INF/jars/missing.jar"}],
+    })
+    path = make_jar(tmp_path / "fabric-api.jar", {
+        # Raw control characters inside strings, as published mods have them
+        "fabric.mod.json": fabric_json.replace("Fabric API", "Fabric\tAPI"),
+        "META-INF/jars/fabric-rendering-v1.jar": {"fabric.mod.json": json.dumps({"id": "fabric-rendering-v1", "provides": ["rendering"]})},
+    })
+    # Nested jars are streamed rather than read into memory whole
+    read = zipfile.ZipFile.read
+    reads = []
+    monkeypatch.setattr(zipfile.ZipFile, "read", lambda self, name, pwd=None: reads.append(name) or read(self, name, pwd))
+
+    info = mods.read_mod(path)
+
+    assert info["id"] == "fabric-api"
+    assert info["name"] == "Fabric\tAPI"
+    assert info["loader"] == "fabric"
+    assert info["minecraft"] == "1.20 || 1.20.1"
+    assert info["depends"] == {"fabricloader": ">=0.14", "minecraft": "1.20 || 1.20.1"}
+    assert info["provides"] == ["fabric", "fabric-rendering-v1", "rendering"]
+    assert "META-INF/jars/fabric-rendering-v1.jar" not in reads
+
+
+def test_quilt_mod(tmp_path):
+    quilt_json = json.dumps({"quilt_loader": {
+        "id": "qsl", "version": "6.1.0", "metadata": {"name": "Quilt Standard Libraries"},
+        "depends": ["quilt_loader", {"id": "minecraft", "versions": ">=1.20"}, {"id": "sodium", "optional": True}],
+        "provides": ["quilted_fabric_api", {"id": "fabric-api"}],
+    }})
+    info = mods.read_mod(make_jar(tmp_path / "qsl.jar", {"quilt.mod.json": quilt_json, "fabric.mod.json": "{}"}))
+    assert info == {
+        "id": "qsl", "name": "Quilt Standard Libraries", "version": "6.1.0", "loader": "quilt",
+        "minecraft": ">=1.20", "depends": {"quilt_loader": "*", "minecraft": ">=1.20"},
+        "provides": ["quilted_fabric_api", "fabric-api"],
+    }
+
+
+FORGE_TOML = """
+modLoader = "javafml"
+loaderVersion = "[47,)"
+# A comment
+[[mods]]
+modId = "examplemod"
+version = "${file.jarVersion}"
+displayName = "Example Mod" # trailing comment
+description = '''
+An example.
+modId = "not-a-mod"
+'''
+[[mods]]
+modId = "examplemod_core"
+[[dependencies.examplemod]]
+    modId = "forge"
+    mandatory = true
+    versionRange = "[47,)"
+[[dependencies.examplemod]]
+    modId = "jei"
+    mandatory = false
+[[dependencies.examplemod]]
+    modId = "minecraft"
+    mandatory = true
+    versionRange = "[1.20.1,1.21)"
+"""
+
+
+def test_forge_mods_toml(tmp_path):
+    path = make_jar(tmp_path / "example.jar", {
+        "META-INF/mods.toml": FORGE_TOML,
+        "META-INF/MANIFEST.MF": "Manifest-Version: 1.0\nImplementation-Version: 2.4.1\n",
+    })
+    info = mods.read_mod(path)
+    assert info == {
+        "id": "examplemod", "name": "Example Mod", "version": "2.4.1", "loader": "forge",
+        "minecraft": "[1.20.1,1.21)", "depends": {"forge": "[47,)", "minecraft": "[1.20.1,1.21)"},
+        "provides": ["examplemod_core"],
+    }
+
+
+def test_neoforge_mods_toml(tmp_path):
+    toml = FORGE_TOML.replace("mandatory = true", 'type = "required"').replace("mandatory = false", 'type = "optional"')
+    info = mods.read_mod(make_jar(tmp_path / "example.jar", {"META-INF/neoforge.mods.toml": toml, "META-INF/mods.toml": ""}))
+    assert info["loader"] == "neoforge"
+    assert info["version"] == "${file.jarVersion}"
+    assert info["depends"] == {"forge": "[47,)", "minecraft": "[1.20.1,1.21)"}
+
+
+def test_jar_without_metadata(tmp_path):
+    assert mods.read_mod(make_jar(tmp_path / "library.jar", {"com/example/Library.class": b"\xca\xfe\xba\xbe"})) is None
+
+
+def test_toml_subset_parser():
+    data = mods.parse_toml_subset(FORGE_TOML)
+    assert data["modLoader"] == "javafml"
+    assert [mod["modId"] for mod in data["mods"]] == ["examplemod", "examplemod_core"]
+    assert data["mods"][0]["displayName"] == "Example Mod"
+    assert data["mods"][0]["description"] == 'An example.\nmodId = "not-a-mod"\n'
+    assert [dependency["modId"] for dependency in data["dependencies"]["examplemod"]] == ["forge", "jei", "minecraft"]
+    assert data["dependencies"]["examplemod"][1]["mandatory"] is False
+    # The subset parser gives the same answers as tomllib on what mods.toml uses
+    tomllib = pytest.importorskip("tomllib")
+    assert data == tomllib.loads(FORGE_TOML)
+
+
+def test_index_reuses_entries_while_size_and_mtime_hold(tmp_path, monkeypatch):
+    mods_dir = tmp_path / "mods"
+    mods_dir.mkdir()
+    path = make_jar(mods_dir / "a.jar", {"fabric.mod.json": json.dumps({"id": "a", "version": "1.0"})})
+    make_jar(mods_dir / "b.jar", {"fabric.mod.json": json.dumps({"id": "b", "version": "1.0"})})
+    cache_path = str(tmp_path / "mod_index.json")
+    read_mod = mods.read_mod
+    parsed = []
+    monkeypatch.setattr(mods, "read_mod", lambda path: parsed.append(os.path.basename(path)) or read_mod(path))
+
+    index = mods.ModIndex(cache_path)
+    assert [mod.id for mod in index.scan(str(mods_dir))] == ["a", "b"]
+    assert sorted(parsed) == ["a.jar", "b.jar"]
+
+    parsed.clear()
+    index.scan(str(mods_dir))
+    # A new index reads the entries back from its cache file
+    mods.ModIndex(cache_path).scan(str(mods_dir))
+    assert parsed == []
+
+    make_jar(path, {"fabric.mod.json": json.dumps({"id": "a", "version": "1.1-longer"})})
+    os.remove(mods_dir / "b.jar")
+    assert [(mod.id, mod.version) for mod in index.scan(str(mods_dir))] == [("a", "1.1-longer")]
+    assert parsed == ["a.jar"]
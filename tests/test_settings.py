@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+from barrie import settings as settings_module
+from barrie.settings import Settings
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "settings.json")
+
+
+def write(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+
+def read(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def test_unknown_keys_survive_a_save(path):
+    write(path, {"username": "Steve", "theme": "dark", "future": {"nested": [1, 2]}})
+    settings = Settings(path)
+    settings.username = "Alex"
+    settings.flush()
+    assert read(path) == {"username": "Alex", "theme": "dark", "future": {"nested": [1, 2]}, "schema": settings_module.SCHEMA_VERSION}
+
+
+def test_play_keeps_the_ram_setting(path):
+    write(path, {"username": "Steve", "ram_mb": 6144, "gc_preset": "zgc"})
+    settings = Settings(path)
+    # What the Play button saves
+    settings.update(username="Alex", version_id="1.20.1")
+    settings.flush()
+    saved = read(path)
+    assert saved["ram_mb"] == 6144
+    assert saved["gc_preset"] == "zgc"
+    assert Settings(path).ram_mb == 6144
+
+
+def test_writes_are_debounced(path, monkeypatch):
+    settings = Settings(path, debounce=60)
+    writes = []
+    flush = settings.flush
+    monkeypatch.setattr(settings, "flush", lambda: writes.append(1) or flush())
+    for value in range(10):
+        settings.set("ram_mb", 1024 + value)
+    settings.flush_if_pending()
+    settings.flush_if_pending()
+    assert writes == [1]
+    assert read(path)["ram_mb"] == 1033
+
+
+def test_failed_write_leaves_the_old_file(path, monkeypatch):
+    write(path, {"username": "Steve", "ram_mb": 4096})
+    settings = Settings(path)
+    settings.set("username", "Alex")
+
+    def dump(data, f, **kwargs):
+        f.write('{"username": "Al')
+        raise OSError("disk full")
+
+    monkeypatch.setattr(settings_module.json, "dump", dump)
+    with pytest.raises(OSError):
+        settings.flush()
+    monkeypatch.undo()
+    assert read(path) == {"username": "Steve", "ram_mb": 4096}
+
+
+def test_unreadable_file_falls_back_to_defaults(path):
+    with open(path, "w") as f:
+        f.write("{not json")
+    settings = Settings(path)
+    assert settings.ram_mb == settings_module.DEFAULTS["ram_mb"]
+    assert settings.username == ""
+    assert settings.gc_preset == "g1"
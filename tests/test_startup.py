@@ -0,0 +1,98 @@
+import os
+import sys
+import time
+import threading
+import subprocess
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Builds the main window with every startup download pointed at STUB_URL and prints how long
+# construction plus the first event pass took, then stays up until stdin closes so the
+# downloads can reach the server. os._exit skips teardown of the stuck downloads.
+COLD_START = """
+import os, sys, time
+import main
+from barrie import assets, versions
+from PySide6.QtWidgets import QApplication
+
+stub = os.environ["STUB_URL"]
+assets.DEFAULT_ASSETS = {name: f"{stub}/{name}" for name in assets.DEFAULT_ASSETS}
+versions.VERSION_API = stub + "/version_manifest_v2.json"
+app = QApplication([])
+started = time.perf_counter()
+window = main.BarrieLauncher()
+window.show()
+app.processEvents()
+print(round((time.perf_counter() - started) * 1000))
+sys.stdout.flush()
+sys.stdin.read()
+os._exit(0)
+"""
+
+
+@pytest.fixture
+def hanging_server():
+    # Accepts every request and never answers until the test is over
+    release = threading.Event()
+    requests = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            requests.append(self.path)
+            release.wait(60)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.requests = requests
+    yield server
+    release.set()
+    server.shutdown()
+    server.server_close()
+
+
+def launcher_env(home):
+    env = dict(os.environ, HOME=str(home), QT_QPA_PLATFORM="offscreen", PYTHONPATH=ROOT)
+    env.pop("APPDATA", None)
+    return env
+
+
+def test_cold_start_does_not_wait_for_downloads(tmp_path, hanging_server):
+    env = launcher_env(tmp_path)
+    env["STUB_URL"] = f"http://127.0.0.1:{hanging_server.server_address[1]}"
+    process = subprocess.Popen(
+        [sys.executable, "-c", COLD_START], cwd=ROOT, env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True
+    )
+    try:
+        line = process.stdout.readline()
+        deadline = time.monotonic() + 30
+        while len(hanging_server.requests) < 6 and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        process.stdin.close()
+        process.wait(timeout=30)
+    assert process.returncode == 0
+    # The five icons and the version manifest were all requested and are still hanging
+    assert len(hanging_server.requests) == 6
+    # The old startup waited up to 10 s per icon before building the window
+    assert int(line) < 5000
+
+
+@pytest.mark.parametrize("run", range(3))
+def test_startup_within_budget(tmp_path, run):
+    # The budget mode itself: measures the startup users get, manifest refresh and icon
+    # downloads included, exits 0 once the window is painted within the budget, and must not
+    # crash on the way out while those downloads are still running (it used to, about half
+    # the time)
+    result = subprocess.run(
+        [sys.executable, os.path.join(ROOT, "main.py"), "--startup-budget-ms", "5000"],
+        cwd=ROOT, env=launcher_env(tmp_path), capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "Startup timings (ms):" in result.stdout
@@ -0,0 +1,141 @@
+import os
+import json
+
+import pytest
+
+from barrie import hashcache, installer, instances, launch, store, versions
+
+
+@pytest.fixture(autouse=True)
+def isolated_hash_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(hashcache, "_cache", hashcache.HashCache(str(tmp_path / "hash_cache.sqlite")))
+
+
+@pytest.fixture
+def no_reflinks(monkeypatch):
+    # Filesystems like NTFS and ext4 cannot clone, which leaves hardlinks or copies
+    monkeypatch.setattr(store, "reflink", lambda src, dst: False)
+
+
+def write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def replace(path, data):
+    # How installer.download_file rewrites a file: a new file renamed over the old one
+    write(path + ".part", data)
+    os.replace(path + ".part", path)
+
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def bytes_used(root):
+    # Size of every distinct file under root; links to one inode count once
+    seen = {}
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            stat = os.stat(os.path.join(dirpath, name))
+            seen[(stat.st_dev, stat.st_ino)] = stat.st_size
+    return sum(seen.values())
+
+
+def test_shared_file_is_kept_once(tmp_path, no_reflinks):
+    mc_dir = str(tmp_path / "mc")
+    src = os.path.join(mc_dir, "libraries", "lib.jar")
+    write(src, b"x" * 4096)
+    shared = store.get_store(mc_dir)
+
+    shared.share(src, os.path.join(mc_dir, "instances", "a", "libraries", "lib.jar"), installer.sha1_of(src))
+    shared.share(src, os.path.join(mc_dir, "instances", "b", "libraries", "lib.jar"), installer.sha1_of(src))
+
+    assert bytes_used(mc_dir) == 4096
+
+
+def test_redownloaded_file_is_linked_back_to_its_object(tmp_path, no_reflinks):
+    src = str(tmp_path / "mc" / "libraries" / "lib.jar")
+    write(src, b"library")
+    shared = store.Store(str(tmp_path / "mc" / "store"))
+    digest = shared.add(src)
+
+    replace(src, b"library")
+    assert shared.add(src, digest) == digest
+    assert os.path.samefile(src, shared.object_path(digest))
+    assert bytes_used(tmp_path / "mc") == len(b"library")
+
+
+def test_forge_jar_shares_the_client_jar(tmp_path, no_reflinks):
+    mc_dir = str(tmp_path / "mc")
+    vanilla_jar = os.path.join(mc_dir, "versions", "1.7.10", "1.7.10.jar")
+    write(vanilla_jar, b"c" * 8192)
+    forge_id = "1.7.10-Forge10.13.4.1614-1.7.10"
+
+    launch.fix_forge_missing_jar(mc_dir, forge_id)
+
+    assert read(os.path.join(mc_dir, "versions", forge_id, f"{forge_id}.jar")) == b"c" * 8192
+    assert bytes_used(mc_dir) == 8192
+
+
+def test_replaced_source_leaves_the_store_and_instances_alone(tmp_path):
+    src = str(tmp_path / "mc" / "libraries" / "lib.jar")
+    dst = str(tmp_path / "instance" / "libraries" / "lib.jar")
+    write(src, b"original")
+    shared = store.Store(str(tmp_path / "store"))
+    digest = installer.sha1_of(src)
+
+    shared.share(src, dst, digest)
+    replace(src, b"rewritten")
+
+    assert read(shared.object_path(digest)) == b"original"
+    assert read(dst) == b"original"
+
+
+def test_files_without_a_declared_hash_get_a_copy_of_their_own(tmp_path):
+    src = str(tmp_path / "mc" / "versions" / "1.0" / "1.0.json")
+    dst = str(tmp_path / "instance" / "versions" / "1.0" / "1.0.json")
+    write(src, b"{}")
+    shared = store.Store(str(tmp_path / "store"))
+
+    assert shared.share(src, dst) in ("reflink", "copy")
+    write(dst, b'{"id": "changed"}')
+    assert read(src) == b"{}"
+    assert shared.usage() == (0, 0)
+
+
+def test_corrupt_object_is_replaced_when_reused(tmp_path):
+    src = str(tmp_path / "lib.jar")
+    write(src, b"library")
+    shared = store.Store(str(tmp_path / "store"))
+    digest = shared.add(src)
+
+    replace(shared.object_path(digest), b"damaged object")
+    assert not shared.intact(digest)
+    assert shared.add(src, digest) == digest
+    assert read(shared.object_path(digest)) == b"library"
+
+
+def test_declared_hash_mismatch_is_rejected_without_leftovers(tmp_path):
+    src = str(tmp_path / "lib.jar")
+    write(src, b"library")
+    shared = store.Store(str(tmp_path / "store"))
+
+    with pytest.raises(installer.InstallError):
+        shared.add(src, "0" * 40)
+    assert shared.usage() == (0, 0)
+
+
+def test_instance_survives_the_shared_install_being_rewritten(tmp_path, monkeypatch):
+    monkeypatch.setattr(versions, "load_manifest_cache", lambda: None)
+    mc_dir = str(tmp_path / "mc")
+    version_json = os.path.join(mc_dir, "versions", "1.0", "1.0.json")
+    write(version_json, json.dumps({"id": "1.0", "libraries": []}).encode())
+
+    instance, _ = instances.create_instance("test", "1.0", mc_dir)
+    write(version_json, json.dumps({"id": "1.0", "libraries": [], "rewritten": True}).encode())
+
+    with open(os.path.join(instance.path, "versions", "1.0", "1.0.json")) as f:
+        assert json.load(f) == {"id": "1.0", "libraries": []}
@@ -0,0 +1,84 @@
+import os
+
+from barrie import sync
+
+
+def write(root, rel, content, mtime_ns=None):
+    path = os.path.join(root, rel)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    return path
+
+
+def tree(root):
+    result = {}
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            with open(path) as f:
+                result[os.path.relpath(path, root).replace(os.sep, "/")] = f.read()
+    return result
+
+
+def test_mirror_and_unchanged_rerun(tmp_path):
+    src, dst = str(tmp_path / "src"), str(tmp_path / "dst")
+    write(src, "latest.log", "started")
+    write(src, "config/sodium.json", "{}")
+
+    assert sync.sync_tree(src, dst)["copied"] == 2
+    assert tree(dst) == tree(src)
+    assert sync.sync_tree(src, dst) == {"copied": 0, "deleted": 0, "unchanged": 2, "bytes": 0}
+
+
+def test_files_deleted_in_the_source_are_removed(tmp_path):
+    src, dst = str(tmp_path / "src"), str(tmp_path / "dst")
+    write(src, "latest.log", "started")
+    write(src, "old/2024-01-01.log", "old")
+    sync.sync_tree(src, dst)
+
+    os.remove(os.path.join(src, "old", "2024-01-01.log"))
+    os.rmdir(os.path.join(src, "old"))
+    write(dst, "stray.txt", "only in the copy")
+
+    stats = sync.sync_tree(src, dst)
+    assert stats["deleted"] == 2
+    assert tree(dst) == {"latest.log": "started"}
+    assert not os.path.exists(os.path.join(dst, "old"))
+
+
+def test_changes_are_found_by_size_and_mtime(tmp_path):
+    src, dst = str(tmp_path / "src"), str(tmp_path / "dst")
+    write(src, "size.log", "short", mtime_ns=10**18)
+    write(src, "mtime.log", "aaaa", mtime_ns=10**18)
+    sync.sync_tree(src, dst)
+
+    write(src, "size.log", "much longer", mtime_ns=10**18)
+    write(src, "mtime.log", "bbbb", mtime_ns=10**18 + 10**9)
+    stats = sync.sync_tree(src, dst)
+    assert (stats["copied"], stats["unchanged"]) == (2, 0)
+    assert tree(dst) == {"size.log": "much longer", "mtime.log": "bbbb"}
+
+
+def test_same_size_and_mtime_needs_use_hash(tmp_path):
+    src, dst = str(tmp_path / "src"), str(tmp_path / "dst")
+    write(src, "options.txt", "fov:70", mtime_ns=10**18)
+    sync.sync_tree(src, dst)
+    # Rewritten with the same length and the old mtime restored
+    write(src, "options.txt", "fov:90", mtime_ns=10**18)
+
+    assert sync.sync_tree(src, dst)["unchanged"] == 1
+    assert tree(dst) == {"options.txt": "fov:70"}
+    stats = sync.sync_tree(src, dst, use_hash=True)
+    assert stats["copied"] == 1
+    assert tree(dst) == {"options.txt": "fov:90"}
+
+
+def test_launcher_data_skips_missing_folders(tmp_path):
+    mc_dir, launcher_dir = str(tmp_path / "mc"), str(tmp_path / "launcher")
+    write(mc_dir, "logs/latest.log", "started")
+    results = sync.sync_launcher_data(mc_dir, launcher_dir)
+    assert list(results) == ["logs"]
+    assert tree(launcher_dir) == {"logs/latest.log": "started"}
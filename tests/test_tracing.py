@@ -0,0 +1,70 @@
+import sys
+import json
+import subprocess
+
+import pytest
+
+from barrie import tracing
+from barrie.errors import LaunchCancelled
+
+
+def read_records(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.fixture
+def trace(tmp_path):
+    return tracing.Trace("launch", path=str(tmp_path / "traces.jsonl"), version="1.20.1")
+
+
+def test_finish_writes_the_trace_then_its_spans(trace):
+    with trace.span("install"):
+        pass
+    trace.event("first_log_line")
+    trace.finish("ok")
+    root, install, first_line = read_records(trace.path)
+    assert root["kind"] == "trace" and root["status"] == "ok" and root["attrs"] == {"version": "1.20.1"}
+    assert (install["name"], install["status"], install["trace"]) == ("install", "ok", trace.id)
+    assert (first_line["kind"], first_line["trace"]) == ("event", trace.id)
+
+
+def test_cancelled_span(trace):
+    class Stopped(LaunchCancelled):
+        pass
+
+    for error in (LaunchCancelled(), Stopped()):
+        with pytest.raises(LaunchCancelled):
+            with trace.span("install"):
+                raise error
+    with pytest.raises(RuntimeError):
+        with trace.span("spawn"):
+            raise RuntimeError("no java")
+    assert [record["status"] for record in trace.spans] == ["cancelled", "cancelled", "error"]
+    assert trace.spans[2]["error"] == "RuntimeError: no java"
+
+
+def test_span_closing_after_finish_is_appended(trace):
+    with trace.span("skin_fetch"):
+        trace.finish("ok")
+    records = read_records(trace.path)
+    assert [record["kind"] for record in records] == ["trace", "span"]
+    assert records[1]["name"] == "skin_fetch" and records[1]["late"] is True and records[1]["trace"] == trace.id
+
+
+def test_finish_only_writes_once(trace):
+    trace.finish("ok")
+    trace.finish("error")
+    assert len(read_records(trace.path)) == 1
+
+
+def test_helpers_accept_no_trace():
+    with tracing.span(None, "install") as record:
+        assert record is None
+    tracing.event(None, "exit")
+
+
+def test_importing_tracing_leaves_the_launch_stack_unloaded():
+    code = "import sys, barrie.tracing; print(sorted(m for m in ('barrie.launch', 'barrie.installer', 'barrie.store') if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
@@ -0,0 +1,80 @@
+import os
+import json
+
+import pytest
+
+from barrie import version_index
+
+
+@pytest.mark.parametrize("data, edition", [
+    ({"id": "1.20.1", "mainClass": "net.minecraft.client.main.Main", "libraries": [{"name": "com.mojang:brigadier:1.1.8"}]}, "vanilla"),
+    ({"mainClass": "net.fabricmc.loader.impl.launch.knot.KnotClient"}, "fabric"),
+    ({"mainClass": "net.minecraft.launchwrapper.Launch", "libraries": [{"name": "net.fabricmc:fabric-loader:0.15.11"}]}, "fabric"),
+    ({"mainClass": "org.quiltmc.loader.impl.launch.knot.KnotClient"}, "quilt"),
+    # Quilt pulls in Fabric's libraries too; Quilt wins
+    ({"mainClass": "net.fabricmc.loader.launch.knot.KnotClient",
+      "libraries": [{"name": "net.fabricmc:intermediary:1.20.1"}, {"name": "org.quiltmc:quilt-loader:0.26.0"}]}, "quilt"),
+    ({"mainClass": "cpw.mods.bootstraplauncher.BootstrapLauncher", "libraries": [{"name": "net.neoforged.fancymodloader:loader:4.0.24"}]}, "neoforge"),
+    ({"mainClass": "cpw.mods.bootstraplauncher.BootstrapLauncher",
+      "arguments": {"game": ["--launchTarget", "forgeclient", "--fml.neoForgeVersion", "20.4.237"]}}, "neoforge"),
+    ({"mainClass": "cpw.mods.bootstraplauncher.BootstrapLauncher", "libraries": [{"name": "net.minecraftforge:fmlloader:1.20.1-47.2.0"}]}, "forge"),
+    ({"mainClass": "net.minecraft.launchwrapper.Launch",
+      "minecraftArguments": "--tweakClass cpw.mods.fml.common.launcher.FMLTweaker"}, "forge"),
+    ({"mainClass": "net.minecraftforge.bootstrap.ForgeBootstrap"}, "forge"),
+])
+def test_classify(data, edition):
+    assert version_index.classify(data) == edition
+
+
+def write_profile(mc_dir, version_id, **data):
+    version_dir = os.path.join(mc_dir, "versions", version_id)
+    os.makedirs(version_dir)
+    with open(os.path.join(version_dir, f"{version_id}.json"), "w") as f:
+        json.dump(dict(data, id=version_id), f)
+
+
+@pytest.fixture
+def index(tmp_path):
+    return version_index.VersionIndex(str(tmp_path / "mc"), cache_path=str(tmp_path / "version_index.json"))
+
+
+def test_missing_versions_directory_is_empty(index):
+    assert index.versions() == []
+    assert index.versions("fabric") == []
+    assert index.get("1.20.1") is None
+
+
+def test_folder_names_do_not_decide_the_edition(index):
+    write_profile(index.mc_dir, "my-forge-pack", mainClass="net.minecraft.client.main.Main")
+    write_profile(index.mc_dir, "Fabulously Optimized", inheritsFrom="1.20.1", mainClass="net.fabricmc.loader.impl.launch.knot.KnotClient")
+    assert index.get("my-forge-pack").edition == "vanilla"
+    assert index.get("Fabulously Optimized").edition == "fabric"
+
+
+def test_profiles_inherit_edition_and_base_version(index):
+    write_profile(index.mc_dir, "1.20.1", mainClass="net.minecraft.client.main.Main")
+    write_profile(index.mc_dir, "fabric-loader-0.15.11-1.20.1", inheritsFrom="1.20.1", mainClass="net.fabricmc.loader.impl.launch.knot.KnotClient")
+    write_profile(index.mc_dir, "1.20.1-OptiFine_HD_U_I6", inheritsFrom="fabric-loader-0.15.11-1.20.1", libraries=[{"name": "optifine:OptiFine:1.20.1_HD_U_I6"}])
+
+    optifine = index.get("1.20.1-OptiFine_HD_U_I6")
+    assert (optifine.edition, optifine.base_version, optifine.inherits_from) == ("fabric", "1.20.1", "fabric-loader-0.15.11-1.20.1")
+    assert [v.id for v in index.versions("fabric", base_version="1.20.1")] == ["1.20.1-OptiFine_HD_U_I6", "fabric-loader-0.15.11-1.20.1"]
+    assert [v.id for v in index.versions("vanilla")] == ["1.20.1"]
+
+
+def test_inheriting_from_a_missing_or_looping_parent(index):
+    write_profile(index.mc_dir, "orphan", inheritsFrom="1.8.9", mainClass="net.minecraft.launchwrapper.Launch")
+    write_profile(index.mc_dir, "a", inheritsFrom="b")
+    write_profile(index.mc_dir, "b", inheritsFrom="a")
+    assert index.get("orphan").base_version == "1.8.9"
+    assert index.get("a").edition == "vanilla"
+
+
+def test_new_and_changed_profiles_are_picked_up(index, tmp_path):
+    write_profile(index.mc_dir, "1.20.1", mainClass="net.minecraft.client.main.Main")
+    assert [v.id for v in index.versions()] == ["1.20.1"]
+    write_profile(index.mc_dir, "1.20.1-forge-47.2.0", inheritsFrom="1.20.1", libraries=[{"name": "net.minecraftforge:forge:1.20.1-47.2.0"}])
+    assert [v.id for v in index.versions("forge")] == ["1.20.1-forge-47.2.0"]
+    # A new index starts from the cache file and still sees both
+    fresh = version_index.VersionIndex(index.mc_dir, cache_path=str(tmp_path / "version_index.json"))
+    assert [v.id for v in fresh.versions()] == ["1.20.1", "1.20.1-forge-47.2.0"]